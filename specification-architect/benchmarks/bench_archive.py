@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark for validating spec directories straight from a zip archive.
+Packs many small generated specs into one archive, then times validating
+every one of them by extracting the archive to a temporary directory
+first versus reading members in place, and fails if any result differs.
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from spec_generator import SpecSize, generate_spec
+from validate_specifications import discover_spec_dirs, validate_dir
+
+COMPARED = ("total", "covered", "missing", "coverage", "valid", "errors")
+
+
+def validate_all(root):
+    results = [validate_dir(location) for location in discover_spec_dirs(root)]
+    return [tuple(entry[key] for key in COMPARED) for entry in results], len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark validating specs inside a zip archive")
+    parser.add_argument("--specs", type=int, default=500, help="Spec directories in the archive")
+    parser.add_argument("--requirements", type=int, default=10, help="Requirements per spec")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "source"
+        for i in range(args.specs):
+            generate_spec(source / f"spec{i:05d}", SpecSize.scaled(args.requirements, seed=i))
+        archive = tmp / "specs.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as out:
+            for path in sorted(source.rglob("*.md")):
+                out.write(path, path.relative_to(source).as_posix())
+        shutil.rmtree(source)
+        size_mb = archive.stat().st_size / 1e6
+
+        start = time.perf_counter()
+        extracted = tmp / "extracted"
+        with zipfile.ZipFile(archive) as bundle:
+            bundle.extractall(extracted)
+        expected, count = validate_all(extracted)
+        extract_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual, archived = validate_all(archive)
+        archive_seconds = time.perf_counter() - start
+
+    same = expected == actual and count == archived == args.specs
+    print(f"{args.specs} specs, {size_mb:.1f} MB archive")
+    print(f"extract then validate:  {extract_seconds:.2f}s")
+    print(f"validate in archive:    {archive_seconds:.2f}s ({extract_seconds / archive_seconds:.2f}x)")
+    print(f"Results: {'identical' if same else 'MISMATCH'}")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
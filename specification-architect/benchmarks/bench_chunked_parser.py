@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for chunked parallel parsing of requirements.md.
+Writes one large generated requirements document, times the serial
+`requirement_rows` parse, then `parse_requirements_chunked` with 1, 2, 4 ...
+up to --max-workers processes (one chunk per worker), and fails if any
+worker count gives rows that differ from the serial parse.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from chunked_parser import parse_requirements_chunked
+from spec_generator import SpecSize, write_requirements
+from spec_parser import requirement_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunked parallel requirements parsing")
+    parser.add_argument("--requirements", type=int, default=50000, help="Requirements in the generated file")
+    parser.add_argument("--criteria", type=int, default=5, help="Acceptance criteria per requirement")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker count to time")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per worker count (best is kept)")
+    args = parser.parse_args()
+
+    counts, workers = [], 1
+    while workers < args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.max_workers)
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "requirements.md"
+        write_requirements(path, SpecSize(requirements=args.requirements, criteria=args.criteria), random.Random(0))
+        size_mb = path.stat().st_size / 1e6
+
+        def best(fn):
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                value = fn()
+                times.append(time.perf_counter() - start)
+            return min(times), value
+
+        serial, expected = best(lambda: requirement_rows(path.read_bytes().decode('utf-8')))
+        print(f"{size_mb:.1f} MB, {len(expected)} rows on {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'chunks':>7} {'time':>10} {'speedup':>8}  result")
+        print(f"{'serial':>8} {1:>7} {serial * 1000:>8.0f}ms {1.0:>7.2f}x  -")
+        for n in counts:
+            seconds, parsed = best(lambda: parse_requirements_chunked(path, n, min_chunk_bytes=1))
+            same = parsed.rows == expected
+            mismatches += not same
+            print(f"{n:>8} {parsed.chunks:>7} {seconds * 1000:>8.0f}ms {serial / seconds:>7.2f}x  "
+                  f"{'identical' if same else 'MISMATCH'}")
+
+    print(f"Chunked parse: {'OK' if not mismatches else f'{mismatches} MISMATCHES'}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
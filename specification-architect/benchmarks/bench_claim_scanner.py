@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Adversarial benchmark for the uncited-claim scanner.
+Times scan_claims on inputs built to make a backtracking sentence regex blow
+up (long unterminated tables, digit runs and URL lists) at doubling sizes,
+and fails if runtime per character grows faster than linearly.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from spec_parser import parse_research, scan_claims
+
+# The pattern scan_claims replaced; only run on the smallest input with --legacy
+LEGACY_CLAIM = re.compile(r'[^.!?]*\d+(?:\.\d+)?%?[^.!?]*\.|[^.!?]*?(excellent|proven|ideal|best|optimal)[^.!?]*\.')
+
+CASES = {
+    # Table rows full of numbers and no sentence terminator at all
+    "table": lambda n: ("| 1 | value 2 | best 3 |\n" * (n // 24 + 1))[:n],
+    # One huge digit run closed by `!`, so no `.`-terminated sentence exists
+    "digits": lambda n: "1" * (n - 1) + "!",
+    # Browsed Sources style URL list where every dot is a candidate terminator
+    "urls": lambda n: ("- [1] https://example.org/a/b?id=42 optimal\n" * (n // 44 + 1))[:n],
+    # Alternating decimals that never close a sentence
+    "decimals": lambda n: ("1.2 " * (n // 4 + 1))[:n],
+}
+
+
+def best_of(runs: int, fn) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the uncited-claim scanner on adversarial input")
+    parser.add_argument("--sizes", default="50000,100000,200000,400000", help="Comma-separated input sizes in characters")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per size (best is kept)")
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="Allowed growth of per-character time from smallest to largest size")
+    parser.add_argument("--legacy", type=int, default=0, metavar="CHARS",
+                        help="Also time the old regex on inputs of this many characters")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    rows = []
+    for size in sizes:
+        timings = {}
+        for name, build in CASES.items():
+            text = build(size)
+            timings[name] = best_of(args.runs, lambda: (sum(1 for _ in scan_claims(text)), parse_research(text)))
+        rows.append((size, timings))
+
+    names = list(CASES)
+    print(f"{'characters':>12} " + " ".join(f"{n:>12}" for n in names))
+    for size, timings in rows:
+        print(f"{size:>12} " + " ".join(f"{timings[n] * 1000:>9.1f} ms" for n in names))
+
+    if args.legacy:
+        for name, build in CASES.items():
+            text = build(args.legacy)
+            elapsed = best_of(1, lambda: LEGACY_CLAIM.findall(text))
+            print(f"legacy regex, {name}, {args.legacy} characters: {elapsed * 1000:.1f} ms")
+
+    failed = False
+    (small, first), (large, last) = rows[0], rows[-1]
+    for name in names:
+        ratio = (last[name] / large) / (first[name] / small)
+        status = "OK" if ratio <= args.max_ratio else "NON-LINEAR"
+        failed |= ratio > args.max_ratio
+        print(f"{name}: per-character time x{ratio:.2f} from {small} to {large} characters [{status}]")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for near-duplicate and conflicting acceptance-criteria detection.
+Writes a requirements document of randomly worded EARS criteria, plants
+restatements (one word swapped) and conflicts (a number changed or a NOT
+added) of some of them under the same component, then times parsing plus
+`find_similar_criteria` and fails if a planted pair is missed or flagged
+with the wrong kind.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from criteria_similarity import DEFAULT_THRESHOLD, find_similar_criteria
+from spec_parser import Criterion, requirement_rows, tokens_from_rows
+
+WORDS = ("record order invoice payment account session token queue event batch report user "
+         "message file request response cache index ledger schedule alert audit export import "
+         "quota limit retry timeout window shard replica snapshot backup policy role tenant").split()
+VERBS = ("persist store reject notify publish archive encrypt validate compress forward "
+         "acknowledge retry schedule expire index replicate").split()
+
+
+def sentence(rng: random.Random, component: str):
+    words = rng.sample(WORDS, 6)
+    return (f"WHEN a {words[0]} {words[1]} arrives for the {words[2]}, THE **{component}** SHALL "
+            f"{rng.choice(VERBS)} the {words[3]} {words[4]} within {rng.randrange(1, 500)} ms "
+            f"and {rng.choice(VERBS)} the {words[5]}")
+
+
+def write_criteria(total: int, planted: int, seed: int = 0):
+    """requirements.md text, and the planted (original number, copy number, conflict) triples."""
+    rng = random.Random(seed)
+    components = [f"Component{i}" for i in range(max(1, total // 200))]
+    texts, pairs = [], []
+    for _ in range(total - planted):
+        texts.append(sentence(rng, rng.choice(components)))
+    for i, original in enumerate(rng.sample(range(total - planted), planted)):
+        text = texts[original]
+        conflict = i % 2 == 1
+        if conflict and i % 4 == 1:
+            copy = text.replace(" within ", " within 1", 1)
+        elif conflict:
+            copy = text.replace(" SHALL ", " SHALL NOT ", 1)
+        else:
+            copy = text.replace(" arrives ", " is received ", 1)
+        texts.append(copy)
+        pairs.append((original, len(texts) - 1, conflict))
+    lines, numbers = ["# Requirements Document", ""], []
+    per_requirement = 5
+    for r in range(0, len(texts), per_requirement):
+        lines += [f"### Requirement {r // per_requirement + 1}: Generated", "", "#### Acceptance Criteria", ""]
+        for c, text in enumerate(texts[r:r + per_requirement], 1):
+            lines.append(f"{c}. {text}.")
+            numbers.append(f"{r // per_requirement + 1}.{c}")
+        lines.append("")
+    return "\n".join(lines), [(numbers[a], numbers[b], conflict) for a, b, conflict in pairs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate acceptance-criteria detection")
+    parser.add_argument("--criteria", type=int, default=50000, help="Acceptance criteria in the document")
+    parser.add_argument("--planted", type=int, default=500, help="Planted restatements and conflicts")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Similarity threshold")
+    args = parser.parse_args()
+
+    text, pairs = write_criteria(args.criteria, args.planted)
+    start = time.perf_counter()
+    criteria = [t for t in tokens_from_rows(requirement_rows(text)) if isinstance(t, Criterion)]
+    parsed = time.perf_counter()
+    clusters = find_similar_criteria(criteria, args.threshold)
+    done = time.perf_counter()
+
+    cluster_of = {cid: cluster for cluster in clusters for cid in cluster.criteria}
+    missed = [(a, b) for a, b, _ in pairs if cluster_of.get(a) is None or cluster_of.get(a) is not cluster_of.get(b)]
+    wrong = [(a, b) for a, b, conflict in pairs if (a, b) not in missed and cluster_of[a].conflict != conflict]
+    print(f"{len(criteria)} criteria, {len(pairs)} planted pairs, threshold {args.threshold}")
+    print(f"parse:    {parsed - start:.2f}s")
+    print(f"detect:   {done - parsed:.2f}s ({len(criteria) / (done - parsed):,.0f} criteria/s)")
+    print(f"clusters: {len(clusters)} ({sum(c.conflict for c in clusters)} conflicting)")
+    print(f"recall:   {len(pairs) - len(missed)}/{len(pairs)}, wrong kind: {len(wrong)}")
+    ok = not missed and not wrong
+    print(f"Similarity detection: {'OK' if ok else 'FAILED'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the single-pass requirements tokenizer.
+Times both validators' requirements parsing on generated files of doubling
+size and fails if runtime per criterion grows faster than linearly.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from spec_parser import parse_requirements_file
+from traceability_validator import TraceabilityValidator
+from validate_specifications import Validator
+
+
+def write_requirements(path: Path, requirements: int, criteria: int = 4):
+    """Write a requirements.md with the given number of requirements."""
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("# Requirements Document\n\n## Requirements\n")
+        for r in range(1, requirements + 1):
+            out.write(f"\n### Requirement {r}: Generated Requirement {r}\n")
+            out.write(f"**Description**: Generated requirement number {r}.\n\n")
+            out.write("#### Acceptance Criteria\n")
+            for c in range(1, criteria + 1):
+                out.write(f"{c}. WHEN event {r}-{c} occurs, THE **Component{r % 7}** "
+                          f"SHALL handle it within {c * 10} milliseconds.\n")
+
+
+def best_of(runs: int, fn) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the requirements tokenizer")
+    parser.add_argument("--sizes", default="625,1250,2500,5000", help="Comma-separated requirement counts")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per size (best is kept)")
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="Allowed growth of per-criterion time from smallest to largest size")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for size in sizes:
+            write_requirements(tmp / "requirements.md", size)
+            timings = {
+                "tokenizer": best_of(args.runs, lambda: sum(1 for _ in parse_requirements_file(tmp / "requirements.md"))),
+                "Validator": best_of(args.runs, lambda: Validator(str(tmp))._extract_requirements()),
+                "TraceabilityValidator": best_of(args.runs, lambda: TraceabilityValidator(str(tmp)).parse_requirements("requirements.md")),
+            }
+            rows.append((size, timings))
+
+    names = list(rows[0][1])
+    print(f"{'requirements':>12} " + " ".join(f"{n:>22}" for n in names))
+    for size, timings in rows:
+        print(f"{size:>12} " + " ".join(f"{timings[n] * 1000:>19.1f} ms" for n in names))
+
+    failed = False
+    (small, first), (large, last) = rows[0], rows[-1]
+    for name in names:
+        ratio = (last[name] / large) / (first[name] / small)
+        status = "OK" if ratio <= args.max_ratio else "NON-LINEAR"
+        failed |= ratio > args.max_ratio
+        print(f"{name}: per-requirement time x{ratio:.2f} from {small} to {large} requirements [{status}]")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+End-to-end check and benchmark of the Browsed Sources verifier against a
+local http.server stand-in (no internet access needed). Verifies status
+classification (redirects, HEAD refused, 404, 429, 5xx), that slow sources
+are checked concurrently, that keep-alive connections are reused, that the
+per-host rate limit spaces requests, and that a repeated run with a fresh
+cache makes no requests except for the transient 429 and 5xx answers.
+Exits 1 if any check fails.
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from source_verifier import SourceCache, SourceVerifier
+from traceability_validator import TraceabilityValidator
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay: float):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = []  # (monotonic time, method, path)
+        self.connections = 0
+
+    def url(self, path: str, host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{self.server_address[1]}{path}"
+
+    def reset(self):
+        with self.lock:
+            self.requests.clear()
+            self.connections = 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, head: bool):
+        with self.server.lock:
+            self.server.requests.append((time.monotonic(), self.command, self.path))
+        kind = self.path.split("/")[1]
+        headers, body = {}, b""
+        if kind == "ok":
+            status = 200
+        elif kind == "slow":
+            time.sleep(self.server.delay)
+            status = 200
+        elif kind == "redirect":
+            status, headers = 301, {"Location": "/ok" + self.path[len("/redirect"):]}
+        elif kind == "nohead":
+            status, body = (405, b"") if head else (200, b"x" * 1024)
+        elif kind == "limited":
+            status, headers = 429, {"Retry-After": "1"}
+        elif kind == "error":
+            status = 500
+        else:
+            status = 404
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._answer(True)
+
+    def do_GET(self):
+        self._answer(False)
+
+
+RESEARCH = """# Research
+
+## 1. Findings
+
+| Technology | Rationale |
+|---|---|
+| **Alpha** | Chosen for its API [cite:1] |
+| **Beta** | Mature tooling [cite:2] |
+
+## 3. Browsed Sources
+- [1] {ok}
+- [2] {missing}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the source verifier against a local HTTP server")
+    parser.add_argument("--sources", type=int, default=32, help="Slow sources for the concurrency check")
+    parser.add_argument("--delay", type=float, default=0.2, help="Seconds each slow source takes to answer")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server = StandIn(args.delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    failures = []
+
+    def check(name, passed, detail):
+        print(f"{name:<24} {detail} [{'OK' if passed else 'FAILED'}]")
+        if not passed:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        expected = {server.url("/ok/1"): (True, 200), server.url("/redirect/2"): (True, 200),
+                    server.url("/nohead/3"): (True, 200), server.url("/missing/4"): (False, 404),
+                    server.url("/limited/5"): (False, 429), server.url("/error/6"): (False, 500),
+                    "ftp://example.invalid/x": (False, None)}
+        results = SourceVerifier(SourceCache(), rate=0).verify(expected)
+        wrong = [url for url, (ok, status) in expected.items()
+                 if (results[url]["ok"], results[url]["status"]) != (ok, status)]
+        check("classification", not wrong, f"{len(expected) - len(wrong)}/{len(expected)} as expected")
+
+        urls = [server.url(f"/slow/{i}", host) for i in range(args.sources)
+                for host in ("127.0.0.1", "localhost")][:args.sources]
+        server.reset()
+        start = time.perf_counter()
+        SourceVerifier(SourceCache(), workers=args.workers, rate=0).verify(urls)
+        seconds = time.perf_counter() - start
+        serial = args.sources * args.delay
+        check("concurrency", seconds < serial / 2,
+              f"{args.sources} x {args.delay:.2f}s sources in {seconds:.2f}s (serial {serial:.2f}s)")
+        check("keep-alive", server.connections <= args.workers * 2,
+              f"{len(server.requests)} requests over {server.connections} connections")
+
+        rate = 10.0
+        server.reset()
+        SourceVerifier(SourceCache(), workers=4, rate=rate).verify(server.url(f"/ok/{i}") for i in range(10))
+        times = sorted(t for t, _, _ in server.requests)
+        gap = min(b - a for a, b in zip(times, times[1:]))
+        check("per-host rate limit", gap >= 0.8 / rate, f"min gap {gap * 1000:.0f}ms at {rate:.0f}/s")
+
+        cache_file = tmp / "source-checks.json"
+        urls = [server.url(f"/ok/{i}") for i in range(20)] + [server.url("/error/1"), server.url("/limited/1")]
+        SourceVerifier(SourceCache(cache_file), rate=0).verify(urls)
+        server.reset()
+        again = SourceVerifier(SourceCache(cache_file), rate=0)
+        again.verify(urls)
+        check("cache", len(server.requests) == 2 and again.cache_hits == 20,
+              f"repeat run: {len(server.requests)} requests (the 5xx and 429), {again.cache_hits} cached")
+        server.reset()
+        SourceVerifier(SourceCache(cache_file, ttl=0), rate=0).verify(urls)
+        check("cache expiry", len(server.requests) == len(urls), f"ttl 0: {len(server.requests)} requests")
+
+        (tmp / "research.md").write_text(RESEARCH.format(ok=server.url("/ok/1"), missing=server.url("/missing/2")),
+                                         encoding="utf-8")
+        validator = TraceabilityValidator(str(tmp), source_verifier=SourceVerifier(SourceCache(), rate=0))
+        research = validator.validate_research_evidence("research.md")
+        check("research validation", research["unreachable_sources"] == ["2"] and not research["valid"],
+              f"unreachable sources {research['unreachable_sources']}")
+
+    server.shutdown()
+    print("Source verifier: " + ("OK" if not failures else f"{len(failures)} FAILED"))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the SQLite traceability index across many spec directories.
+Generates specs whose tasks leave some criteria uncovered, times a cold
+export, an unchanged re-export and a re-export after one spec changes, then
+times "uncovered criteria of component X across all specs" as an index
+query against re-validating every directory, failing if the answers differ.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from spec_generator import SpecSize, generate_spec
+from spec_index import SpecIndex, location_key
+from spec_parser import Criterion, requirement_rows, tokens_from_rows
+from validate_specifications import discover_spec_dirs, export_index, validate_dir
+
+
+def revalidate(root, component):
+    """The pre-index answer: validate every directory, then pick the component's missing criteria."""
+    found = set()
+    for location in discover_spec_dirs(root):
+        missing = set(validate_dir(location)["missing"])
+        text = (Path(location) / "requirements.md").read_text(encoding="utf-8")
+        for token in tokens_from_rows(requirement_rows(text)):
+            if isinstance(token, Criterion) and token.component == component and token.id in missing:
+                found.add((location_key(location), token.id))
+    return found
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return time.perf_counter() - start, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite traceability index")
+    parser.add_argument("--specs", type=int, default=300, help="Spec directories")
+    parser.add_argument("--requirements", type=int, default=20, help="Requirements per spec")
+    parser.add_argument("--queries", type=int, default=20, help="Query repetitions (median is reported)")
+    args = parser.parse_args()
+
+    component = "Component0001"
+    with tempfile.TemporaryDirectory() as tmp:
+        root, db = Path(tmp) / "specs", Path(tmp) / "specs.db"
+        for i in range(args.specs):
+            generate_spec(root / f"project{i:04d}",
+                          SpecSize.scaled(args.requirements, tasks=args.requirements * 3 // 4, seed=i))
+
+        cold, _ = timed(lambda: export_index(db, root, batch=True, quiet=True))
+        warm, _ = timed(lambda: export_index(db, root, batch=True, quiet=True))
+        with open(root / "project0000" / "tasks.md", "a", encoding="utf-8") as out:
+            out.write("- [ ] 999. Late task\n  - _Requirements: 1.1, 1.2, 1.3, 1.4_\n")
+        changed, _ = timed(lambda: export_index(db, root, batch=True, quiet=True))
+
+        index = SpecIndex(db)
+        times = []
+        for _ in range(args.queries):
+            seconds, rows = timed(lambda: index.criteria(component=component, uncovered=True))
+            times.append(seconds)
+        text_seconds, matches = timed(lambda: index.criteria(match="publishes AND subscribers", uncovered=True))
+        index.close()
+        query = sorted(times)[len(times) // 2]
+        baseline, expected = timed(lambda: revalidate(root, component))
+
+    actual = {(row["location"], row["criterion"]) for row in rows}
+    same = actual == expected
+    print(f"{args.specs} specs x {args.requirements} requirements")
+    print(f"export, cold:            {cold:.2f}s")
+    print(f"export, unchanged:       {warm:.2f}s")
+    print(f"export, one changed:     {changed:.2f}s")
+    print(f"uncovered {component}: {query * 1000:.1f}ms from the index, {baseline:.2f}s re-validating "
+          f"({len(actual)} criteria)")
+    print(f"full-text query:         {text_seconds * 1000:.1f}ms ({len(matches)} criteria)")
+    print(f"Results: {'identical' if same else 'MISMATCH'}")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
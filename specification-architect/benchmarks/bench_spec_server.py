@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for spec_server.py.
+Opens a generated spec through the stdio client stub, applies a seeded
+sequence of editor-style edits (typing, retagging tasks, adding and deleting
+criteria, requirement headings and component rows), and times each edit
+until the server's `spec/coverage` notification. At checkpoints the edited
+text is written out and validated from scratch with Validator; any
+difference from the server's verdict fails the run. Finally it sends
+malformed notifications and frames, and opens a spec whose research.md is
+not UTF-8; the run fails unless the server still answers after each.
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from spec_client import SpecClient, SpecClientError
+from spec_generator import SpecSize, generate_spec
+from validate_specifications import Validator, validate_dir
+
+DOCUMENTS = ("blueprint.md", "requirements.md", "tasks.md")
+COMPARED = ("total", "covered", "missing", "coverage", "valid", "errors")
+
+
+class EditingSession:
+    """Client-side copy of the open documents, kept in step with the edits sent."""
+
+    def __init__(self, client: SpecClient, spec_dir: Path, rng: random.Random):
+        self.client = client
+        self.dir = spec_dir
+        self.rng = rng
+        self.lines = {}
+        self.version = 1
+        for name in DOCUMENTS:
+            text = (spec_dir / name).read_text(encoding="utf-8")
+            self.lines[name] = text.split("\n")
+            client.open(spec_dir / name, text)
+            client.wait_for("spec/coverage")
+
+    def send(self, name, start, end, text):
+        lines = self.lines[name]
+        head = lines[start[0]][:start[1]]
+        tail = lines[end[0]][end[1]:]
+        lines[start[0]:end[0] + 1] = (head + text + tail).split("\n")
+        self.version += 1
+        began = time.perf_counter()
+        self.client.change(self.dir / name, self.version, list(start), list(end), text)
+        self.client.wait_for("spec/coverage")
+        return time.perf_counter() - began
+
+    def _pick(self, name, needle):
+        found = [i for i, line in enumerate(self.lines[name]) if needle in line]
+        return self.rng.choice(found) if found else None
+
+    def random_edit(self):
+        rng, kind = self.rng, self.rng.randrange(7)
+        if kind == 0:  # type a character inside a criterion
+            i = self._pick("requirements.md", " SHALL ")
+            if i is not None:
+                column = self.lines["requirements.md"][i].index(" SHALL ")
+                return "type", self.send("requirements.md", (i, column), (i, column), "x")
+        elif kind == 1:  # retarget one reference in a tag
+            i = self._pick("tasks.md", "_Requirements:")
+            if i is not None:
+                line = self.lines["tasks.md"][i]
+                start = line.index(":") + 2
+                end = line.find(",", start)
+                end = len(line) - 1 if end < 0 else end
+                ref = rng.choice(["99.9", f"{rng.randrange(1, 40)}.{rng.randrange(1, 5)}"])
+                return "retag", self.send("tasks.md", (i, start), (i, end), ref)
+        elif kind == 2:  # delete a tag line
+            i = self._pick("tasks.md", "_Requirements:")
+            if i is not None:
+                return "untag", self.send("tasks.md", (i, 0), (i + 1, 0), "")
+        elif kind == 3:  # add a criterion
+            i = self._pick("requirements.md", "#### Acceptance Criteria")
+            if i is not None:
+                return "add criterion", self.send("requirements.md", (i + 1, 0), (i + 1, 0),
+                                                  "9. WHEN typed, THE **Component0001** SHALL react.\n")
+        elif kind == 4:  # delete a requirement heading, merging two sections
+            i = self._pick("requirements.md", "### Requirement ")
+            if i is not None:
+                return "drop heading", self.send("requirements.md", (i, 0), (i + 1, 0), "")
+        elif kind == 5:  # paste a new requirement section
+            i = self._pick("requirements.md", "### Requirement ")
+            if i is not None:
+                n = rng.randrange(1, 60)
+                text = (f"### Requirement {n}: Pasted\n#### Acceptance Criteria\n"
+                        f"1. WHEN pasted, THE **Component0002** SHALL appear.\n\n")
+                return "paste section", self.send("requirements.md", (i, 0), (i, 0), text)
+        else:  # remove a component row
+            i = self._pick("blueprint.md", "| **")
+            if i is not None:
+                return "drop component", self.send("blueprint.md", (i, 0), (i + 1, 0), "")
+        return self.random_edit()
+
+    def write(self, out_dir: Path):
+        for name, lines in self.lines.items():
+            (out_dir / name).write_text("\n".join(lines), encoding="utf-8")
+
+
+def malformed_inputs(client: SpecClient, spec_dir: Path, tmp: Path):
+    """Send input the server must survive; returns the labels of those after which it stopped answering."""
+    broken = tmp / "undecodable"
+    shutil.copytree(spec_dir, broken)
+    (broken / "research.md").write_bytes(b"# Research\n\xff\xfe not UTF-8\n")
+    uri = (spec_dir / "tasks.md").resolve().as_uri()
+    cases = (
+        ("didOpen without text", lambda: client.notify("textDocument/didOpen", {"textDocument": {"uri": uri}})),
+        ("didChange without contentChanges",
+         lambda: client.notify("textDocument/didChange", {"textDocument": {"uri": uri, "version": 0}})),
+        ("notification with list params", lambda: client.notify("textDocument/didClose", [])),
+        ("invalid JSON body", lambda: client.writer.write(b"Content-Length: 5\r\n\r\n{oops")),
+        ("non-UTF-8 body", lambda: client.writer.write(b"Content-Length: 2\r\n\r\n\xff\xfe")),
+        ("research.md not UTF-8", lambda: client.open(broken / "tasks.md")),
+    )
+    dead = []
+    for label, send in cases:
+        send()
+        client.writer.flush()
+        try:
+            client.validate(broken)
+        except SpecClientError as e:
+            dead.append(f"{label} ({e})")
+            break
+    return dead
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark edit-to-diagnostics latency of spec_server.py")
+    parser.add_argument("--requirements", type=int, default=400, help="Requirements in the generated spec")
+    parser.add_argument("--edits", type=int, default=200, help="Edits to apply")
+    parser.add_argument("--check-every", type=int, default=50, help="Compare with a full validation every N edits")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        spec_dir = generate_spec(tmp / "spec", SpecSize.scaled(args.requirements, seed=args.seed))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Validator(str(spec_dir)).validate()
+        full_seconds = time.perf_counter() - start
+
+        client = SpecClient()
+        client.initialize()
+        session = EditingSession(client, spec_dir, random.Random(args.seed))
+        timings = {}
+        mismatches = 0
+        for n in range(1, args.edits + 1):
+            kind, seconds = session.random_edit()
+            timings.setdefault(kind, []).append(seconds)
+            if n % args.check_every == 0 or n == args.edits:
+                check_dir = tmp / f"check{n}"
+                check_dir.mkdir()
+                session.write(check_dir)
+                served = client.validate(spec_dir)
+                expected = validate_dir(check_dir)
+                if any(served[key] != expected[key] for key in COMPARED):
+                    mismatches += 1
+                    print(f"MISMATCH after {n} edits: server {[served[k] for k in COMPARED]} "
+                          f"!= full {[expected[k] for k in COMPARED]}")
+        dead = malformed_inputs(client, spec_dir, tmp)
+        if not dead:
+            client.shutdown()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    every = [s for values in timings.values() for s in values]
+    print(f"Full in-process validation: {full_seconds * 1000:.1f} ms")
+    print(f"{'edit':<16} {'count':>6} {'p50':>10} {'p95':>10} {'max':>10}")
+    for kind, values in sorted(timings.items()) + [("all", every)]:
+        values = sorted(values)
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(f"{kind:<16} {len(values):>6} {statistics.median(values) * 1000:>8.2f}ms "
+              f"{p95 * 1000:>8.2f}ms {values[-1] * 1000:>8.2f}ms")
+    print(f"Verdicts compared with full validation: {'OK' if not mismatches else f'{mismatches} MISMATCHES'}")
+    print(f"Malformed input: {'survived' if not dead else 'server stopped after ' + dead[0]}")
+    sys.exit(1 if mismatches or dead else 0)
+
+
+if __name__ == "__main__":
+    main()
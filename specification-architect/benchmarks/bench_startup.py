@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the validator as a pre-commit hook runs it.
+Times process start to exit of `python validate_specifications.py` and of the
+zipapp built by scripts/build_zipapp.py on a small generated spec, next to a
+bare interpreter for reference, and fails if either median exceeds the
+budget. Each command runs once untimed first so bytecode caches are written;
+every timed run is still a fresh process. Output and exit codes of the script
+and the zipapp must match on a passing and a failing spec.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from build_zipapp import build
+from spec_generator import SpecSize, generate_spec
+
+DEFAULT_BUDGET_MS = 100.0
+
+
+def run(command, env=None):
+    start = time.perf_counter()
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env)
+    return time.perf_counter() - start, completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark validator cold-start-to-exit time")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per command")
+    parser.add_argument("--requirements", type=int, default=5, help="Requirements in the generated spec")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Allowed median start-to-exit time of the script and the zipapp "
+                             f"(default {DEFAULT_BUDGET_MS:.0f} ms)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        passing = generate_spec(tmp / "passing", SpecSize.scaled(args.requirements))
+        # Fewer tasks than requirements leaves criteria uncovered
+        failing = generate_spec(tmp / "failing", SpecSize.scaled(args.requirements, tasks=1))
+        zipapp = build(tmp / "validate_specifications.pyz")
+        script = [sys.executable, str(ROOT / "validate_specifications.py")]
+        archive = [sys.executable, str(zipapp)]
+
+        # A fixed string hash seed keeps anything listed in set order comparable between runs
+        env = {**os.environ, "PYTHONHASHSEED": "0"}
+        mismatches = 0
+        for spec in (passing, failing):
+            for options in ([], ["--json"]):
+                _, expected = run(script + ["--path", str(spec)] + options, env)
+                _, actual = run(archive + ["--path", str(spec)] + options, env)
+                if (expected.returncode, expected.stdout) != (actual.returncode, actual.stdout):
+                    mismatches += 1
+                    print(f"MISMATCH on {spec.name} {' '.join(options)}: exit {expected.returncode} "
+                          f"vs {actual.returncode}")
+
+        commands = (("python -c pass", [sys.executable, "-c", "pass"], False),
+                    ("validate_specifications.py", script + ["--path", str(passing)], True),
+                    ("zipapp", archive + ["--path", str(passing)], True))
+        rows = []
+        for label, command, budgeted in commands:
+            run(command)
+            times = sorted(run(command)[0] for _ in range(args.runs))
+            rows.append((label, statistics.median(times), times[0], times[-1], budgeted))
+
+    print(f"{'command':<28} {'median':>10} {'min':>10} {'max':>10}")
+    over = 0
+    for label, median, low, high, budgeted in rows:
+        failed = budgeted and median * 1000 > args.budget_ms
+        over += failed
+        print(f"{label:<28} {median * 1000:>8.1f}ms {low * 1000:>8.1f}ms {high * 1000:>8.1f}ms"
+              f"{' [OVER BUDGET]' if failed else ''}")
+    print(f"Budget {args.budget_ms:.0f} ms: {'OK' if not over else 'FAILED'}; "
+          f"script and zipapp results: {'identical' if not mismatches else f'{mismatches} MISMATCHES'}")
+    sys.exit(1 if over or mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the streaming tasks.md tokenizer.
+Writes task plans of doubling size, then checks that tokenizing them keeps
+peak memory flat (bounded by the largest task, not the file) and that
+runtime per task stays linear.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from spec_parser import tokenize_tasks
+
+
+def write_tasks(path: Path, tasks: int, subtasks: int = 6, refs: int = 6):
+    """Write a tasks.md with the given number of top-level tasks."""
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("# Implementation Plan\n\n## Phase 1: Generated Work\n")
+        for t in range(1, tasks + 1):
+            out.write(f"- [ ] {t}. Implement generated task {t}\n")
+            for s in range(1, subtasks + 1):
+                out.write(f"  - [ ] {t}.{s} Generated subtask {s} of task {t}\n")
+            out.write(f"  - _Requirements: {', '.join(f'{t}.{r}' for r in range(1, refs + 1))}_\n\n")
+
+
+def scan(path: Path) -> int:
+    with open(path, encoding="utf-8") as handle:
+        return sum(len(task.references) for task in tokenize_tasks(handle))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming tasks tokenizer")
+    parser.add_argument("--sizes", default="25000,50000,100000,200000", help="Comma-separated task counts")
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="Allowed growth of per-task time and of peak memory from smallest to largest size")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.md"
+        for size in sizes:
+            write_tasks(path, size)
+            start = time.perf_counter()
+            scan(path)
+            seconds = time.perf_counter() - start
+            tracemalloc.start()
+            scan(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append((size, path.stat().st_size, seconds, peak))
+
+    print(f"{'tasks':>10} {'file MB':>10} {'time':>12} {'peak KiB':>10}")
+    for size, nbytes, seconds, peak in rows:
+        print(f"{size:>10} {nbytes / 1e6:>10.1f} {seconds * 1000:>9.1f} ms {peak // 1024:>10}")
+
+    (small, _, first_time, first_peak), (large, _, last_time, last_peak) = rows[0], rows[-1]
+    time_ratio = (last_time / large) / (first_time / small)
+    peak_ratio = last_peak / first_peak
+    failed = time_ratio > args.max_ratio or peak_ratio > args.max_ratio
+    print(f"per-task time x{time_ratio:.2f}, peak memory x{peak_ratio:.2f} from {small} to {large} tasks "
+          f"[{'FAILED' if failed else 'OK'}]")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Phase benchmark for Validator and TraceabilityValidator.
+Generates synthetic specs at increasing sizes, times the parse, index,
+validate and render phases, records each phase's peak memory, and compares
+timings, memory and validation results against a stored baseline.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from spec_generator import SpecSize, generate_spec
+from traceability_index import TraceabilityIndex
+from traceability_validator import TraceabilityValidator
+from validate_specifications import Validator
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+PHASES = ("parse", "index", "validate", "render")
+
+
+def run_phases(spec_dir: Path):
+    """Return (phase, callable) pairs, each building on the previous phase, and the outcome dict they fill."""
+    tv = TraceabilityValidator(str(spec_dir))
+    v = Validator(str(spec_dir))
+    outcome = {}
+
+    def parse():
+        tv.parse_requirements("requirements.md")
+        tv.parse_tasks("tasks.md")
+        v._extract_components()
+        v._extract_requirements()
+        v._extract_tasks()
+
+    def index():
+        tv._index = TraceabilityIndex(tv.requirements, tv.tasks)
+        v._calculate()
+
+    def validate():
+        summary, missing, invalid = tv.validate_traceability()
+        research = tv.validate_research_evidence("research.md")
+        outcome.update(total_criteria=summary["total_criteria"],
+                       covered_criteria=summary["covered_criteria"],
+                       missing=len(missing), invalid=len(invalid),
+                       uncited_claims=len(research["uncited_claims"]),
+                       research_valid=research["valid"],
+                       validator_total=v.result.total,
+                       validator_valid=v.result.valid)
+
+    def render():
+        # Full validation.md render, including its own parse of the documents
+        outcome["report_chars"] = sum(len(chunk) for chunk in tv.iter_validation_report(
+            "requirements.md", "tasks.md", "research.md"))
+
+    return [("parse", parse), ("index", index), ("validate", validate), ("render", render)], outcome
+
+
+def measure(spec_dir: Path, runs: int):
+    """Best-of-`runs` seconds and peak KiB per phase, plus the validation outcome."""
+    seconds = {phase: float("inf") for phase in PHASES}
+    for _ in range(runs):
+        timed, outcome = run_phases(spec_dir)
+        for phase, fn in timed:
+            start = time.perf_counter()
+            fn()
+            seconds[phase] = min(seconds[phase], time.perf_counter() - start)
+
+    # Memory is traced in a separate run so tracing overhead does not skew timings.
+    # The last timed run stays alive meanwhile: the strings it interned are then
+    # looked up rather than re-inserted, so a resize of the interpreter's intern
+    # table is not charged to whichever phase happens to trigger it
+    peak_kib = {}
+    phases, _ = run_phases(spec_dir)
+    for phase, fn in phases:
+        tracemalloc.start()
+        fn()
+        peak_kib[phase] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    del timed
+
+    return {
+        "phases": {phase: {"seconds": round(seconds[phase], 6), "peak_kib": peak_kib[phase]}
+                   for phase in PHASES},
+        "results": outcome,
+    }
+
+
+def compare(current, baseline, time_tolerance: float, memory_tolerance: float, min_seconds: float):
+    """Return regression messages for sizes present in both runs."""
+    problems = []
+    for key, entry in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if entry["results"] != base["results"]:
+            problems.append(f"{key}: results changed from {base['results']} to {entry['results']}")
+        for phase in PHASES:
+            now, then = entry["phases"][phase], base["phases"][phase]
+            limit = max(then["seconds"] * time_tolerance, min_seconds)
+            if now["seconds"] > limit:
+                problems.append(f"{key} {phase}: {now['seconds'] * 1000:.1f} ms exceeds "
+                                f"{limit * 1000:.1f} ms (baseline {then['seconds'] * 1000:.1f} ms)")
+            if now["peak_kib"] > max(then["peak_kib"] * memory_tolerance, 64):
+                problems.append(f"{key} {phase}: peak {now['peak_kib']} KiB exceeds "
+                                f"baseline {then['peak_kib']} KiB x{memory_tolerance}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark both validators on generated specs")
+    parser.add_argument("--sizes", default="100,400,1600", help="Comma-separated requirement counts")
+    parser.add_argument("--criteria", type=int, default=None, help="Acceptance criteria per requirement")
+    parser.add_argument("--components", type=int, default=None, help="Blueprint components")
+    parser.add_argument("--tasks", type=int, default=None, help="Tasks (default: one per requirement)")
+    parser.add_argument("--refs-per-task", type=int, default=None, help="Criterion references per task")
+    parser.add_argument("--sources", type=int, default=None, help="Research sources")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per size (best is kept)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--time-tolerance", type=float, default=2.0, help="Allowed slowdown factor per phase")
+    parser.add_argument("--memory-tolerance", type=float, default=1.25, help="Allowed peak memory growth factor")
+    # Single-digit-millisecond phases swing by 2x with scheduler noise alone, so
+    # their timings are not gated; the larger sizes catch a real slowdown
+    parser.add_argument("--min-seconds", type=float, default=0.025,
+                        help="Phases faster than this never count as time regressions (default 25 ms)")
+    parser.add_argument("--json", action="store_true", help="Print the measurements as JSON")
+    args = parser.parse_args()
+
+    current = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for requirements in (int(s) for s in args.sizes.split(",")):
+            size = SpecSize.scaled(requirements, criteria=args.criteria, components=args.components,
+                                   tasks=args.tasks, refs_per_task=args.refs_per_task, sources=args.sources)
+            spec_dir = generate_spec(Path(tmp) / str(requirements), size)
+            key = ",".join(f"{name}={value}" for name, value in vars(size).items())
+            current[key] = measure(spec_dir, args.runs)
+
+    if args.json:
+        print(json.dumps(current, indent=2))
+    else:
+        print(f"{'size':<92} " + " ".join(f"{p:>16}" for p in PHASES))
+        for key, entry in current.items():
+            cells = (f"{entry['phases'][p]['seconds'] * 1000:7.1f}ms/{entry['phases'][p]['peak_kib']:>5}K"
+                     for p in PHASES)
+            print(f"{key:<92} " + " ".join(f"{c:>16}" for c in cells))
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Saved baseline: {baseline_path}")
+        sys.exit(0)
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one")
+        sys.exit(0)
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    problems = compare(current, baseline, args.time_tolerance, args.memory_tolerance, args.min_seconds)
+    compared = sum(1 for key in current if key in baseline)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    print(f"Compared {compared} of {len(current)} sizes against {baseline_path}: "
+          f"{'FAILED' if problems else 'OK'}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
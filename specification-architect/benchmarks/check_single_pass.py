@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Self-check that one validator invocation reads and parses each input once.
+Runs validate_specifications.py and scripts/traceability_validator.py
+in-process on a generated spec held in a git repository, counting opens of
+each spec document and calls of its parser. Every output format is run
+plainly and with each of these options (one at a time):
+
+  validate_specifications.py  --duplicates, --generate-validation,
+                              --export-index (a new database each run),
+                              --since HEAD~1 (an empty commit, so every
+                              document changed), --parse-workers 2,
+                              --profile --trace-file
+  traceability_validator.py   --verify-sources (a stub verifier that makes no
+                              requests), --profile --trace-file
+
+Without a parse cache every document read must be opened and parsed exactly
+once; with a warm --cache-dir it is opened once (to hash it) and never
+parsed. --since applies the git diff with its own line scans, so it must
+open each document it reads once and never call a parser. --batch is not
+covered. Fails listing every invocation that broke
+this.
+
+It also checks what the formats report for specs with a known flaw. A
+blueprint without components or a tasks.md without requirement tags stops
+validation early, and json, ndjson and junit must all give that reason. A
+research.md with too few citations only warns, so its JUnit research suite
+passes and carries the warning in <system-out>.
+"""
+
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+from itertools import count
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import spec_parser
+import validate_specifications
+# Imported before any parser is patched, so none binds a counting wrapper of an earlier run
+import chunked_parser, criteria_similarity, incremental, result_writers  # noqa: E401,F401
+import source_verifier, spec_index, traceability_validator  # noqa: E401,F401
+from spec_generator import SpecSize, generate_spec
+
+DOCUMENTS = ("blueprint.md", "requirements.md", "design.md", "tasks.md", "research.md")
+# Early exits: (copy name, document, marker of the lines removed from it, reason reported)
+EARLY_EXITS = (
+    ("no-components", "blueprint.md", "| **", "No components found"),
+    ("no-tags", "tasks.md", "_Requirements:", "No requirement tags found"),
+)
+# Parser -> the document it parses
+PARSERS = {
+    "parse_components": "blueprint.md",
+    "requirement_rows": "requirements.md",
+    "design_rows": "design.md",
+    "parse_task_model": "tasks.md",
+    "parse_task_model_file": "tasks.md",
+    "parse_task_references": "tasks.md",
+    "parse_task_references_file": "tasks.md",
+    "parse_research": "research.md",
+}
+FORMATS = ("text", "json", "ndjson", "junit")
+# Names the --export-index database of each run, so every export parses
+EXPORTS = count()
+
+
+class StubVerifier:
+    """Stands in for source_verifier.SourceVerifier: every URL resolves and no request is made."""
+
+    def __init__(self, *args, **kwargs):
+        self.requests = 0
+        self.cache_hits = 0
+
+    def verify(self, urls):
+        return {url: {"url": url, "ok": True, "status": 200, "error": None, "checked": 0.0, "cached": False}
+                for url in urls}
+
+
+class Counting:
+    """Patch open() and the spec parsers to count opens and parses per document."""
+
+    def __init__(self, spec_dir: Path):
+        self.inputs = {str(spec_dir / name): name for name in DOCUMENTS}
+        self.opens, self.parses = Counter(), Counter()
+        self.patched = []
+
+    def __enter__(self):
+        real_open = io.open
+
+        def counting_open(file, *args, **kwargs):
+            name = self.inputs.get(str(file))
+            if name:
+                self.opens[name] += 1
+            return real_open(file, *args, **kwargs)
+
+        self._patch(builtins, "open", counting_open)
+        self._patch(io, "open", counting_open)
+        for parser, document in PARSERS.items():
+            original = getattr(spec_parser, parser)
+            wrapper = self._counter(original, document)
+            # Callers import the parsers by name, so patch every module holding one
+            for module in list(sys.modules.values()):
+                if getattr(module, parser, None) is original:
+                    self._patch(module, parser, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for target, name, original in reversed(self.patched):
+            setattr(target, name, original)
+
+    def _counter(self, parse, document):
+        def counted(*args, **kwargs):
+            self.parses[document] += 1
+            return parse(*args, **kwargs)
+        return counted
+
+    def _patch(self, target, name, value):
+        self.patched.append((target, name, getattr(target, name)))
+        setattr(target, name, value)
+
+
+def run(argv, main):
+    """Run a CLI in-process with `argv`; returns its stdout and exit code."""
+    saved, out, code = sys.argv, io.StringIO(), 0
+    sys.argv = argv
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            main()
+    except SystemExit as e:
+        code = e.code or 0
+    finally:
+        sys.argv = saved
+    return out.getvalue(), code
+
+
+def traceability():
+    runpy.run_path(str(ROOT / "scripts" / "traceability_validator.py"), run_name="__main__")
+
+
+def invocations(spec_dir: Path, work: Path, cache_dir):
+    cache = ["--cache-dir", str(cache_dir)] if cache_dir else []
+    trace = ["--profile", "--trace-file", str(work / "trace.json")]
+    validate = validate_specifications.main
+    for fmt in FORMATS:
+        for extra in ([], ["--duplicates"], ["--generate-validation"],
+                      ["--export-index", str(work / f"index-{next(EXPORTS)}.db")], ["--since", "HEAD~1"],
+                      ["--parse-workers", "2"], trace):
+            yield (["validate_specifications.py", "--path", str(spec_dir), "--format", fmt] + extra + cache,
+                   validate)
+        for extra in ([], ["--verify-sources", "--source-cache", str(work / "source-checks.json")], trace):
+            yield (["traceability_validator.py", "--path", str(spec_dir), "--research", "research.md",
+                    "--format", fmt] + extra + cache, traceability)
+
+
+def check(spec_dir: Path, work: Path, cache_dir=None):
+    """Invocations run and problems found; with `cache_dir` the cache is warmed first."""
+    problems = []
+    if cache_dir:
+        for argv, main in invocations(spec_dir, work, cache_dir):
+            run(argv, main)
+    runs = 0
+    for argv, main in invocations(spec_dir, work, cache_dir):
+        runs += 1
+        with Counting(spec_dir) as counts:
+            run(argv, main)
+        label = " ".join(argv[:1] + argv[3:])
+        expected_parses = 0 if cache_dir or "--since" in argv else 1
+        for document in DOCUMENTS:
+            opens, parses = counts.opens[document], counts.parses[document]
+            if opens > 1 or parses > 1 or (opens and parses != expected_parses) or (parses and not opens):
+                problems.append(f"{label}: {document} opened {opens}x, parsed {parses}x")
+        if not counts.opens:
+            problems.append(f"{label}: no document was read")
+    return runs, problems
+
+
+def reported(fmt: str, out: str, reason: str) -> bool:
+    """Whether `out`, written in `fmt`, gives `reason` as what failed the run."""
+    if fmt == "json":
+        return reason in json.loads(out)["errors"]
+    if fmt == "ndjson":
+        return {"event": "error", "message": reason} in map(json.loads, out.splitlines())
+    return reason in (failure.get("message") for failure in ET.fromstring(out).iter("failure"))
+
+
+def check_results(spec_dir: Path, tmp: Path):
+    """Problems with what the formats report for copies of `spec_dir` with a known flaw."""
+    problems = []
+
+    for name, document, marker, reason in EARLY_EXITS:
+        broken = Path(shutil.copytree(spec_dir, tmp / name))
+        text = (broken / document).read_text(encoding='utf-8')
+        (broken / document).write_text("".join(line for line in text.splitlines(keepends=True)
+                                               if marker not in line), encoding='utf-8')
+        for fmt in FORMATS[1:]:
+            out, code = run(["validate_specifications.py", "--path", str(broken), "--format", fmt],
+                            validate_specifications.main)
+            if code != 1 or not reported(fmt, out, reason):
+                problems.append(f"{name}: --format {fmt} should fail with {reason!r}")
+
+    few = Path(shutil.copytree(spec_dir, tmp / "few-citations"))
+    lines = (few / "research.md").read_text(encoding='utf-8').splitlines(keepends=True)
+    del lines[max(i for i, line in enumerate(lines) if "[cite:" in line)]
+    (few / "research.md").write_text("".join(lines), encoding='utf-8')
+    out, _ = run(["traceability_validator.py", "--path", str(few), "--research", "research.md",
+                  "--format", "junit"], traceability)
+    suite = ET.fromstring(out).find("testsuite[@name='research']")
+    if suite.get("failures") != "0" or "Too few citations" not in (suite.findtext("testcase/system-out") or ""):
+        problems.append("too few citations: the junit research suite should pass with the warning in system-out")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that each input is read and parsed once per invocation")
+    parser.add_argument("--requirements", type=int, default=20, help="Requirements in the generated spec")
+    args = parser.parse_args()
+
+    # --verify-sources must not reach the network
+    source_verifier.SourceVerifier = StubVerifier
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        spec_dir = Path(generate_spec(work / "spec", SpecSize.scaled(args.requirements)))
+        results = check_results(spec_dir, work)
+        git = ["git", "-C", str(spec_dir), "-c", "user.name=check", "-c", "user.email=check@localhost"]
+        for command in (["init", "-q"], ["commit", "-q", "--allow-empty", "-m", "empty"], ["add", "."],
+                        ["commit", "-q", "-m", "spec"]):
+            subprocess.run(git + command, check=True)
+        runs, cold = check(spec_dir, work)
+        _, warm = check(spec_dir, work, work / "cache")
+
+    print(f"{runs} invocations without a cache, {runs} with a warm cache")
+    for problem in cold + warm:
+        print(f"  {problem}")
+    print(f"Single pass: {'OK' if not cold and not warm else 'FAILED'}")
+    for problem in results:
+        print(f"  {problem}")
+    print(f"Results: {'OK' if not results else 'FAILED'}")
+    sys.exit(0 if not cold and not warm and not results else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Deterministic generator of synthetic specification sets.
+Writes blueprint.md, requirements.md, design.md, tasks.md and research.md in
+the formats the validators parse, at configurable sizes. The same arguments
+and seed always produce byte-identical files.
+"""
+
+import argparse
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+VERBS = ["receives", "processes", "stores", "publishes", "validates", "schedules"]
+ACTIONS = ["persist the record", "notify subscribers", "reject invalid input",
+           "update the audit log", "refresh the cache", "return a response"]
+CLAIM_WORDS = ["proven", "optimal", "excellent"]
+
+
+@dataclass
+class SpecSize:
+    components: int = 5
+    requirements: int = 10
+    criteria: int = 4
+    tasks: int = 10
+    refs_per_task: int = 4
+    sources: int = 8
+    seed: int = 0
+
+    @classmethod
+    def scaled(cls, requirements: int, **overrides) -> "SpecSize":
+        """A size where the other dimensions grow with the requirement count."""
+        size = cls(components=max(5, requirements // 10), requirements=requirements,
+                   tasks=requirements, sources=max(8, requirements // 25))
+        for name, value in overrides.items():
+            if value is not None:
+                setattr(size, name, value)
+        return size
+
+
+def _component_names(size: SpecSize) -> List[str]:
+    return [f"Component{i:04d}" for i in range(1, size.components + 1)]
+
+
+def write_blueprint(path: Path, size: SpecSize):
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("# Architectural Blueprint\n## 1. Core Objective\nSynthetic benchmark system.\n\n")
+        out.write("## 3. Core System Components\n| Component Name | Responsibility |\n|---|---|\n")
+        for name in _component_names(size):
+            out.write(f"| **{name}** | Generated responsibility of {name} |\n")
+
+
+def write_requirements(path: Path, size: SpecSize, rng: random.Random) -> Dict[str, str]:
+    """Write requirements.md and return every criterion ID, in document order, mapped to its component."""
+    names = _component_names(size)
+    criteria = {}
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("# Requirements Document\n\n## Introduction\nGenerated requirements.\n\n## Requirements\n")
+        for r in range(1, size.requirements + 1):
+            out.write(f"\n### Requirement {r}: Generated Requirement {r}\n")
+            out.write(f"**Description**: Generated requirement number {r}.\n\n")
+            out.write("#### Acceptance Criteria\n")
+            for c in range(1, size.criteria + 1):
+                component = names[rng.randrange(len(names))]
+                out.write(f"{c}. WHEN the system {rng.choice(VERBS)} event {r}-{c}, "
+                          f"THE **{component}** SHALL {rng.choice(ACTIONS)}.\n")
+                criteria[f"{r}.{c}"] = component
+    return criteria
+
+
+def write_design(path: Path, size: SpecSize, criteria: Dict[str, str]):
+    """Write design.md with one method per criterion in the section of the component it names."""
+    owned: Dict[str, List[str]] = {name: [] for name in _component_names(size)}
+    for criterion, component in criteria.items():
+        owned[component].append(criterion)
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("# Design Document\n\n## Component Specifications\n")
+        for name, ids in owned.items():
+            out.write(f"\n### Component: {name}\n**Purpose**: Generated design of {name}\n\n")
+            out.write(f"```python\nclass {name}:\n    \"\"\"\n    Implements: Req {', '.join(ids)}\n    \"\"\"\n")
+            for criterion in ids:
+                out.write(f"\n    def handle_{criterion.replace('.', '_')}(self):\n"
+                          f"        \"\"\"\n        Implements: Req {criterion}\n        \"\"\"\n")
+            out.write("```\n")
+
+
+def write_tasks(path: Path, size: SpecSize, criteria: List[str], rng: random.Random):
+    """Write tasks.md; references walk the criteria cyclically so every one is covered
+    once `tasks * refs_per_task` reaches the criteria count."""
+    names = _component_names(size)
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("# Implementation Plan\n\n## Phase 1: Generated Work\n")
+        cursor = 0
+        for t in range(1, size.tasks + 1):
+            out.write(f"- [ ] {t}. Implement the {names[rng.randrange(len(names))]}\n")
+            for s in range(1, 3):
+                out.write(f"  - [ ] {t}.{s} Generated subtask {s} of task {t}\n")
+            refs = []
+            for _ in range(min(size.refs_per_task, len(criteria))):
+                refs.append(criteria[cursor % len(criteria)])
+                cursor += 1
+            out.write(f"  - _Requirements: {', '.join(refs)}_\n\n")
+
+
+def write_research(path: Path, size: SpecSize, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("# Verifiable Research and Technology Proposal\n\n")
+        out.write("## 2. Technology Rationale\n| Technology | Rationale |\n|---|---|\n")
+        for s in range(1, size.sources + 1):
+            out.write(f"| **Technology{s}** | Technology{s} is a {rng.choice(CLAIM_WORDS)} choice "
+                      f"with {rng.randrange(10, 99)}% adoption [cite:{s}]. |\n")
+        out.write("\n## 3. Browsed Sources\n\n")
+        for s in range(1, size.sources + 1):
+            out.write(f"- [{s}] https://example.org/source/{s} - Generated source {s}\n")
+
+
+def generate_spec(out_dir, size: SpecSize) -> Path:
+    """Write a full specification set for `size` into `out_dir`."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(size.seed)
+    write_blueprint(out_dir / "blueprint.md", size)
+    criteria = write_requirements(out_dir / "requirements.md", size, rng)
+    write_tasks(out_dir / "tasks.md", size, list(criteria), rng)
+    write_research(out_dir / "research.md", size, rng)
+    write_design(out_dir / "design.md", size, criteria)
+    return out_dir
+
+
+def main():
+    defaults = SpecSize()
+    parser = argparse.ArgumentParser(description="Generate a synthetic specification set")
+    parser.add_argument("--out", required=True, help="Directory to write the spec documents into")
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+    args = parser.parse_args()
+
+    size = SpecSize(**{name: getattr(args, name) for name in asdict(defaults)})
+    print(f"Wrote {generate_spec(args.out, size)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Build a self-contained zipapp of validate_specifications.py.
+The archive holds the validator and the script modules it imports, each with
+a bytecode file next to its source, so a cold start neither searches
+scripts/ nor compiles anything. Run it like the script it replaces:
+`python validate_specifications.pyz --path specs`.
+"""
+
+import argparse
+import py_compile
+import shutil
+import sys
+import tempfile
+import zipapp
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = ROOT / "dist" / "validate_specifications.pyz"
+MAIN = "from validate_specifications import main\nmain()\n"
+
+
+def build(output=DEFAULT_OUTPUT, interpreter: str = "/usr/bin/env python3") -> Path:
+    """Write the zipapp to `output` and return its path."""
+    output = Path(output)
+    sources = [ROOT / "validate_specifications.py"]
+    sources += sorted(p for p in (ROOT / "scripts").glob("*.py") if p.name != Path(__file__).name)
+    with tempfile.TemporaryDirectory() as tmp:
+        stage = Path(tmp)
+        for source in sources:
+            shutil.copyfile(source, stage / source.name)
+            # zipimport reads `module.pyc` beside `module.py`; an unchecked-hash pyc
+            # is used as is, and an interpreter with another magic number falls
+            # back to the source
+            py_compile.compile(str(source), cfile=str(stage / (source.stem + ".pyc")), doraise=True,
+                               invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        (stage / "__main__.py").write_text(MAIN, encoding="utf-8")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        zipapp.create_archive(stage, output, interpreter=interpreter)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a self-contained validate_specifications zipapp")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Archive to write")
+    parser.add_argument("--python", default="/usr/bin/env python3", help="Interpreter for the shebang line")
+    args = parser.parse_args()
+    try:
+        path = build(args.output, args.python)
+    except (OSError, py_compile.PyCompileError) as e:
+        print(f"[ERROR] Cannot build zipapp: {e}")
+        sys.exit(1)
+    print(f"[INFO] Wrote: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Chunked parallel parsing of one large requirements.md.
+The file is memory-mapped and cut into byte ranges just before
+`### Requirement N:` lines. Such a heading resets all tokenizer state, so
+each range tokenizes on its own. The ranges are parsed on a process pool and
+their rows concatenated in file order, which gives exactly
+`requirement_rows` of the whole text. Requirement numbers headed more than
+once, within a range or across ranges, are reported alongside the rows.
+"""
+
+import mmap
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain, repeat
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+
+from spec_parser import requirement_rows
+
+BOUNDARY = b'\n### Requirement '
+MIN_CHUNK_BYTES = 4 * 1024 * 1024
+# Line breaks str.splitlines() honours besides \n and \r\n. A range's line
+# numbers can be offset by the \n count before it only when none occur.
+OTHER_BREAKS = (b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e', b'\xc2\x85', b'\xe2\x80\xa8', b'\xe2\x80\xa9')
+
+
+class ChunkedRows(NamedTuple):
+    rows: List[List]
+    duplicates: List[str]  # requirement numbers with more than one heading, in first-seen order
+    chunks: int
+
+
+def split_ranges(data, chunks: int) -> List[Tuple[int, int]]:
+    """About `chunks` equal byte ranges of `data`; each after the first starts at a `### Requirement ` line."""
+    size = len(data)
+    ranges, start = [], 0
+    for i in range(1, chunks):
+        cut = data.find(BOUNDARY, max(start, size * i // chunks))
+        if cut == -1:
+            break
+        ranges.append((start, cut + 1))
+        start = cut + 1
+    ranges.append((start, size))
+    return ranges
+
+
+def _read(path: str, start: int, end: int) -> bytes:
+    with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return data[start:end]
+
+
+def _scan(path: str, start: int, end: int) -> Tuple[int, bool]:
+    """Newlines in the range, and whether \\n (or \\r\\n) is its only kind of line break."""
+    data = _read(path, start, end)
+    plain = data.count(b'\r') == data.count(b'\r\n') and not any(b in data for b in OTHER_BREAKS)
+    return data.count(b'\n'), plain
+
+
+def _parse(path: str, start: int, end: int, first_line: int) -> Tuple[List[List], List[str]]:
+    rows = requirement_rows(_read(path, start, end).decode('utf-8'), first_line)
+    return rows, [row[1] for row in rows if row[0] == "Requirement"]
+
+
+def _duplicates(numbers) -> List[str]:
+    return [number for number, n in Counter(numbers).items() if n > 1]
+
+
+def _serial(path: str) -> ChunkedRows:
+    rows = requirement_rows(Path(path).read_bytes().decode('utf-8'))
+    return ChunkedRows(rows, _duplicates(row[1] for row in rows if row[0] == "Requirement"), 1)
+
+
+def parse_requirements_chunked(path, workers: int = None, min_chunk_bytes: int = MIN_CHUNK_BYTES) -> ChunkedRows:
+    """requirement_rows() of the file at `path`, parsed in up to `workers` chunks on a process pool.
+
+    Files too small to give each worker `min_chunk_bytes`, and files with
+    line breaks other than \\n and \\r\\n, are parsed serially.
+    """
+    path = str(path)
+    workers = max(1, workers or os.cpu_count() or 1)
+    size = os.path.getsize(path)
+    chunks = min(workers, size // max(1, min_chunk_bytes))
+    if chunks > 1:
+        with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ranges = split_ranges(data, chunks)
+    if chunks <= 1 or len(ranges) == 1:
+        return _serial(path)
+
+    starts, ends = zip(*ranges)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        newlines, plain = zip(*pool.map(_scan, repeat(path), starts, ends))
+        if not all(plain):
+            return _serial(path)
+        first_lines = accumulate(chain([1], newlines[:-1]))
+        parts = list(pool.map(_parse, repeat(path), starts, ends, first_lines))
+    rows = list(chain.from_iterable(rows for rows, _ in parts))
+    return ChunkedRows(rows, _duplicates(chain.from_iterable(numbers for _, numbers in parts)), len(parts))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate and conflicting acceptance-criteria detection.
+Each `WHEN ... THE **X** SHALL ...` criterion is reduced to word and
+word-bigram shingles (EARS keywords, the component and boilerplate shared by
+most criteria dropped, numbers normalised to `#`) and a MinHash signature,
+and the signatures are indexed by LSH bands keyed by component. Only criteria
+sharing a band bucket are compared, by exact Jaccard similarity of their
+shingles, so the work grows with the number of criteria rather than pairs.
+Clusters whose members differ in their numbers or in negation are flagged
+as conflicting rather than restating each other.
+"""
+
+import hashlib
+import re
+import struct
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple
+
+from spec_parser import Criterion
+
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_NUM_PERM = 32
+WORD = re.compile(r'[a-z]+|\d+(?:\.\d+)?')
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+NEGATIONS = frozenset(("not", "never", "no", "cannot", "without"))
+# EARS keywords and filler every criterion shares; shingles of them would
+# make unrelated criteria collide in the LSH buckets
+STOPWORDS = frozenset("when while where if then the a an shall and or of to for in on at by with is are be "
+                      "it its this that all any each".split())
+COMMON_FRACTION = 0.5  # shingles in more than this share of the criteria are ignored ...
+COMMON_MIN = 100  # ... once they occur more than this many times
+COMPONENT = re.compile(r'\*\*[^*]*\*\*')
+
+
+class SimilarCluster(NamedTuple):
+    """Criteria of one component whose shingles overlap at least the threshold."""
+    component: str
+    criteria: List[str]  # criterion IDs in document order
+    similarity: float  # lowest Jaccard similarity of the pairs linking the cluster
+    conflict: bool  # members state different numbers or differ in negation
+
+
+def lsh_bands(threshold: float, num_perm: int):
+    """(bands, rows): the most rows per band that still makes a pair at `threshold` a candidate 97% of the time."""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= 0.97:
+            best = (bands, rows)
+    return best
+
+
+class _HashTable(dict):
+    """Shingle -> `num_perm` independent 32-bit hashes from one shake_128 digest, computed once per shingle.
+
+    Tuples rather than arrays: their ints are boxed once, not on every signature.
+    """
+
+    def __init__(self, num_perm: int):
+        super().__init__()
+        self.unpack = struct.Struct(f"<{num_perm}I").unpack
+        self.size = num_perm * 4
+
+    def __missing__(self, shingle: str):
+        hashes = self[shingle] = self.unpack(hashlib.shake_128(shingle.encode()).digest(self.size))
+        return hashes
+
+
+def _shingles(words: List[str]) -> frozenset:
+    # Words as well as bigrams: criteria are short, and with bigrams alone one
+    # swapped word would already cost a dozen-word criterion 30% similarity
+    return frozenset(chain(words, map(" ".join, zip(words, words[1:]))))
+
+
+def find_similar_criteria(criteria: Iterable[Criterion], threshold: float = DEFAULT_THRESHOLD,
+                          num_perm: int = DEFAULT_NUM_PERM) -> List[SimilarCluster]:
+    """Clusters of near-duplicate criteria per component, in document order of their first member.
+
+    Only criteria with a component (an EARS `THE **X** SHALL` clause) are compared.
+    """
+    bands, rows = lsh_bands(threshold, num_perm)
+    ids, components, shingles, facts = [], [], [], []
+    for criterion in criteria:
+        if not criterion.component:
+            continue
+        text = COMPONENT.sub(" ", criterion.text).lower()
+        numbers = NUMBER.findall(text)
+        words = [("#" if word[0].isdigit() else word) for word in WORD.findall(text) if word not in STOPWORDS]
+        ids.append(criterion.id)
+        components.append(criterion.component)
+        shingles.append(_shingles(words))
+        facts.append((tuple(numbers), not NEGATIONS.isdisjoint(words)))
+
+    # Shingles most criteria share are boilerplate: they say nothing about
+    # duplication and would pile unrelated criteria into the same buckets
+    frequency = Counter(chain.from_iterable(shingles))
+    limit = max(COMMON_MIN, len(shingles) * COMMON_FRACTION)
+    common = frozenset(shingle for shingle, n in frequency.items() if n > limit)
+    if common:
+        shingles = [(shingle_set - common) or shingle_set for shingle_set in shingles]
+
+    hashes = _HashTable(num_perm)
+    ceiling = (1 << 32,) * num_perm  # min() needs two columns even for a one-shingle criterion
+    buckets: Dict[tuple, List[int]] = defaultdict(list)
+    for index, (component, shingle_set) in enumerate(zip(components, shingles)):
+        if not shingle_set:
+            continue
+        signature = tuple(map(min, ceiling, *map(hashes.__getitem__, shingle_set)))
+        for band in range(bands):
+            buckets[component, band, signature[band * rows:(band + 1) * rows]].append(index)
+
+    # Verify candidates exactly; within a bucket each member is compared with
+    # the bucket's cluster leaders only, so identical texts stay linear
+    parent = list(range(len(ids)))
+    weakest: Dict[int, float] = {}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        leaders = []
+        for member in members:
+            own = shingles[member]
+            for leader in leaders:
+                other = shingles[leader]
+                similarity = len(own & other) / len(own | other)
+                if similarity >= threshold:
+                    a, b = find(member), find(leader)
+                    low = min(similarity, weakest.get(a, 1.0), weakest.get(b, 1.0))
+                    parent[max(a, b)] = min(a, b)
+                    weakest[min(a, b)] = low
+                    break
+            else:
+                leaders.append(member)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index in range(len(ids)):
+        if parent[index] != index:
+            groups[find(index)].append(index)
+    clusters = []
+    for root in sorted(groups):
+        members = [root] + groups[root]
+        members.sort()
+        clusters.append(SimilarCluster(components[root], [ids[m] for m in members], round(weakest[root], 3),
+                                       len({facts[m] for m in members}) > 1))
+    return clusters
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Git-revision-scoped incremental validation.
+The Validator's view of a spec (requirement section sizes and criteria,
+requirement tag counts, blueprint components and coverage) is kept as a
+snapshot per set of git blob IDs. Validating since a revision loads that
+revision's snapshot, applies the `git diff -U0` hunks to it, re-tokenizes
+only the touched `### Requirement` sections and recomputes coverage only for
+the criteria and references the hunks touch.
+"""
+
+import hashlib
+import itertools
+import re
+import subprocess
+from bisect import bisect_right
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from parse_cache import ParseCache
+from spec_parser import COMPONENT_ROW, REQUIREMENTS_TAG, Criterion, tokenize_requirements
+from traceability_index import CriterionTable
+
+SPEC_DOCUMENTS = ("blueprint.md", "requirements.md", "tasks.md")
+COVERAGE_SETS = ("covered", "missing", "invalid")
+DIFF_HEADER = re.compile(r'diff --git a/(.+) b/(.+)')
+HUNK_HEADER = re.compile(r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+# Reads (1-based start, count) line spans, in ascending order, of a document's new version
+LineReader = Callable[[str, List[Tuple[int, int]]], List[List[str]]]
+
+
+class GitError(RuntimeError):
+    pass
+
+
+class Hunk(NamedTuple):
+    """One `-U0` hunk: old lines [old_start, old_start + old_count) became `added`."""
+    old_start: int
+    old_count: int
+    new_count: int
+    removed: List[str]
+    added: List[str]
+
+    @property
+    def old_end(self) -> int:
+        """Last replaced old line, or the line an insertion follows."""
+        return self.old_start + self.old_count - 1 if self.old_count else self.old_start
+
+    @property
+    def delta(self) -> int:
+        return self.new_count - self.old_count
+
+
+def git(cwd, *args: str) -> bytes:
+    """Run a local git command in `cwd` and return its stdout."""
+    try:
+        done = subprocess.run(["git", *args], cwd=str(cwd), stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, check=True)
+    except FileNotFoundError:
+        raise GitError("git executable not found")
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.decode('utf-8', 'replace').strip() or f"git {args[0]} failed")
+    return done.stdout
+
+
+def blob_ids(spec_dir, ref: str) -> Dict[str, str]:
+    """Blob ID of each spec document present in `ref`'s tree."""
+    try:
+        git(spec_dir, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+    except GitError:
+        raise GitError(f"{ref!r} is not a commit in the repository containing {spec_dir}")
+    ids = {}
+    for line in git(spec_dir, "ls-tree", ref, "--", *SPEC_DOCUMENTS).decode('utf-8').splitlines():
+        meta, _, name = line.partition('\t')
+        ids[Path(name).name] = meta.split()[2]
+    return ids
+
+
+def working_blob_ids(spec_dir) -> Dict[str, str]:
+    """Blob IDs the working-tree spec documents would have if committed."""
+    names = [name for name in SPEC_DOCUMENTS if (Path(spec_dir) / name).exists()]
+    out = git(spec_dir, "hash-object", "--", *names).decode('utf-8').split()
+    return dict(zip(names, out))
+
+
+def diff_hunks(spec_dir, ref: str) -> Dict[str, List[Hunk]]:
+    """Zero-context hunks between `ref` and the working tree, per spec document."""
+    out = git(spec_dir, "diff", "--no-color", "--no-ext-diff", "--no-renames", "--relative",
+              "-U0", ref, "--", *SPEC_DOCUMENTS).decode('utf-8', 'replace')
+    hunks: Dict[str, List[Hunk]] = {}
+    current = None
+    for line in out.split('\n'):
+        header = DIFF_HEADER.match(line)
+        if header:
+            current = hunks.setdefault(Path(header.group(2)).name, [])
+            continue
+        hunk = HUNK_HEADER.match(line)
+        if hunk:
+            old_start, old_count, _, new_count = hunk.groups()
+            current.append(Hunk(int(old_start), 1 if old_count is None else int(old_count),
+                                1 if new_count is None else int(new_count), [], []))
+        elif current and line.startswith('-') and not line.startswith('---'):
+            current[-1].removed.append(line[1:])
+        elif current and line.startswith('+') and not line.startswith('+++'):
+            current[-1].added.append(line[1:])
+    return hunks
+
+
+def text_lines(text: str) -> List[str]:
+    """Lines of `text` split on `\\n` only, the way git counts them."""
+    lines = text.split('\n')
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def requirement_sections(lines: List[str]) -> Tuple[List[int], List[List[str]]]:
+    """Split requirements lines at every heading above level four.
+
+    Returns each section's line count and the IDs of its criteria that name a
+    component, exactly as Validator._extract_requirements collects them.
+    """
+    lengths: List[int] = []
+    criteria: List[List[str]] = []
+    for i, line in enumerate(lines):
+        if i == 0 or (line.startswith('#') and not line.startswith('####')):
+            lengths.append(0)
+            criteria.append([])
+        lengths[-1] += 1
+    starts = list(itertools.accumulate([1] + lengths[:-1]))
+    for token in tokenize_requirements(lines):
+        if isinstance(token, Criterion) and token.component:
+            criteria[bisect_right(starts, token.line) - 1].append(token.id)
+    return lengths, criteria
+
+
+def _line_items(lines: Iterable[str], pattern, split: bool) -> Iterator[str]:
+    for line in lines:
+        for match in pattern.findall(line):
+            if split:
+                yield from (c.strip() for c in match.split(','))
+            else:
+                yield match
+
+
+def _adjust(counts: Dict[str, int], items: Iterable[str], step: int, touched: Set[str]):
+    for item in items:
+        n = counts.get(item, 0) + step
+        if n:
+            counts[item] = n
+        else:
+            del counts[item]
+        touched.add(item)
+
+
+class SpecState:
+    """Everything Validator needs to report coverage, without the document text."""
+
+    def __init__(self, data: Optional[Dict] = None):
+        data = data or {}
+        self.section_lengths: List[int] = data.get("section_lengths", [])
+        self.section_criteria: List[List[str]] = data.get("section_criteria", [])
+        self.criteria: Dict[str, int] = data.get("criteria", {})
+        self.total: int = data.get("total", 0)
+        self.refs: Dict[str, int] = data.get("refs", {})
+        self.range_refs: Set[str] = {ref for ref in self.refs if '-' in ref}
+        self.components: Dict[str, int] = data.get("components", {})
+        self.covered: Set[str] = set(data.get("covered", ()))
+        self.missing: Set[str] = set(data.get("missing", ()))
+        self.invalid: Set[str] = set(data.get("invalid", ()))
+
+    @classmethod
+    def from_texts(cls, texts: Dict[str, str]) -> "SpecState":
+        """Full build: every document is one insertion into an empty state."""
+        lines = {name: text_lines(texts.get(name, "")) for name in SPEC_DOCUMENTS}
+        state = cls()
+        state.apply({name: [Hunk(0, 0, len(doc), [], doc)] for name, doc in lines.items() if doc},
+                    lambda name, spans: [lines[name][start - 1:start - 1 + count] for start, count in spans])
+        return state
+
+    def to_json(self) -> Dict:
+        return {
+            "section_lengths": self.section_lengths,
+            "section_criteria": self.section_criteria,
+            "criteria": self.criteria,
+            "total": self.total,
+            "refs": self.refs,
+            "components": self.components,
+            "covered": sorted(self.covered),
+            "missing": sorted(self.missing),
+            "invalid": sorted(self.invalid),
+        }
+
+    def apply(self, hunks: Dict[str, List[Hunk]], read_lines: LineReader) -> Dict[str, List[str]]:
+        """Apply per-document hunks and refresh coverage.
+
+        Returns the IDs that entered or left the covered, missing and invalid
+        sets, keyed `newly_<set>` and `no_longer_<set>`.
+        """
+        touched: Set[str] = set()
+        for hunk in hunks.get("blueprint.md", ()):
+            _adjust(self.components, _line_items(hunk.removed, COMPONENT_ROW, False), -1, set())
+            _adjust(self.components, _line_items(hunk.added, COMPONENT_ROW, False), 1, set())
+        for hunk in hunks.get("tasks.md", ()):
+            _adjust(self.refs, _line_items(hunk.removed, REQUIREMENTS_TAG, True), -1, touched)
+            _adjust(self.refs, _line_items(hunk.added, REQUIREMENTS_TAG, True), 1, touched)
+        for ref in touched:
+            if '-' in ref:
+                (self.range_refs.add if ref in self.refs else self.range_refs.discard)(ref)
+        if hunks.get("requirements.md"):
+            self._apply_requirements(hunks["requirements.md"], read_lines, touched)
+        return self._refresh(touched)
+
+    def _apply_requirements(self, hunks: List[Hunk], read_lines: LineReader, touched: Set[str]):
+        lengths, criteria = self.section_lengths, self.section_criteria
+        if not lengths:
+            runs = [(0, -1, hunks)]  # empty old document: the whole new file is one run
+        else:
+            starts = list(itertools.accumulate([1] + lengths[:-1]))
+            last = len(lengths) - 1
+            runs = []
+            for hunk in hunks:
+                lo = max(bisect_right(starts, hunk.old_start) - 1, 0)
+                hi = max(bisect_right(starts, hunk.old_end) - 1, 0)
+                # Editing a heading can merge its section into the previous one
+                if hunk.old_count and lo > 0 and starts[lo] >= hunk.old_start:
+                    lo -= 1
+                lo, hi = min(lo, last), min(hi, last)
+                if runs and lo <= runs[-1][1] + 1:
+                    first, end, grouped = runs.pop()
+                    runs.append((first, max(hi, end), grouped + [hunk]))
+                else:
+                    runs.append((lo, hi, [hunk]))
+
+        # Work out every run's span in the new file before replacing any section
+        spans = []
+        shift = 0
+        for first, end, grouped in runs:
+            old_start = starts[first] if lengths else 1
+            old_stop = starts[end] + lengths[end] if lengths else 1
+            run_delta = sum(h.delta for h in grouped)
+            spans.append((first, end, old_start + shift, old_stop - old_start + run_delta))
+            shift += run_delta
+
+        blocks = read_lines("requirements.md", [(start, count) for _, _, start, count in spans])
+        for (first, end, _, _), block in zip(reversed(spans), reversed(blocks)):
+            new_lengths, new_criteria = requirement_sections(block)
+            removed = itertools.chain.from_iterable(criteria[first:end + 1])
+            added = itertools.chain.from_iterable(new_criteria)
+            self.total -= sum(len(ids) for ids in criteria[first:end + 1])
+            self.total += sum(len(ids) for ids in new_criteria)
+            _adjust(self.criteria, removed, -1, touched)
+            _adjust(self.criteria, added, 1, touched)
+            lengths[first:end + 1] = new_lengths
+            criteria[first:end + 1] = new_criteria
+
+    def _refresh(self, touched: Set[str]) -> Dict[str, List[str]]:
+        """Recompute coverage status of the touched IDs only.
+
+        Range references such as `1.1-1.4` depend on document order, so any
+        range in the tags, or one just removed from them, makes this a full
+        recompute from the section lists.
+        """
+        changes = {f"{change}_{key}": [] for change in ("newly", "no_longer") for key in COVERAGE_SETS}
+        if self.range_refs or any('-' in ref for ref in touched):
+            table = CriterionTable(itertools.chain.from_iterable(self.section_criteria))
+            invalid: Dict[str, None] = {}
+            covered = table.mask(self.refs, invalid)
+            for key, now in zip(COVERAGE_SETS, (set(table.select(covered)), set(table.select(table.all & ~covered)),
+                                                set(invalid))):
+                old = getattr(self, key)
+                changes[f"newly_{key}"].extend(now - old)
+                changes[f"no_longer_{key}"].extend(old - now)
+                setattr(self, key, now)
+        else:
+            for item in touched:
+                defined = item in self.criteria
+                referenced = item in self.refs
+                for key, belongs in zip(COVERAGE_SETS, (defined and referenced, defined and not referenced,
+                                                        referenced and not defined)):
+                    members = getattr(self, key)
+                    if belongs and item not in members:
+                        members.add(item)
+                        changes[f"newly_{key}"].append(item)
+                    elif not belongs and item in members:
+                        members.discard(item)
+                        changes[f"no_longer_{key}"].append(item)
+        for items in changes.values():
+            items.sort(key=sort_key)
+        return changes
+
+
+def _working_reader(spec_dir, read: Dict[str, List[str]]) -> LineReader:
+    """Reads spans of working-tree files; those in `read` were already read whole and are sliced."""
+    def read_lines(name: str, spans: List[Tuple[int, int]]) -> List[List[str]]:
+        """One forward pass over the file; lines outside the spans are skipped undecoded."""
+        lines = read.get(name)
+        if lines is not None:
+            return [lines[start - 1:start - 1 + count] for start, count in spans]
+        blocks = []
+        position = 1
+        with open(Path(spec_dir) / name, 'rb') as handle:
+            for start, count in spans:
+                chunk = itertools.islice(handle, start - position, start - position + count)
+                blocks.append([line.decode('utf-8').rstrip('\n') for line in chunk])
+                position = start + count
+        return blocks
+    return read_lines
+
+
+def _state_key(ids: Dict[str, str]) -> str:
+    joined = ",".join(f"{name}={ids.get(name, '-')}" for name in SPEC_DOCUMENTS)
+    return hashlib.sha256(joined.encode('utf-8')).hexdigest()
+
+
+def load_state(spec_dir, ids: Dict[str, str], cache: ParseCache) -> SpecState:
+    """The snapshot for the given document blob IDs, built from git on a cache miss."""
+    data = cache.get("since-state", _state_key(ids))
+    if data is not None:
+        return SpecState(data)
+    with cache.profiler.phase("since snapshot"):
+        texts = {name: git(spec_dir, "cat-file", "blob", blob).decode('utf-8') for name, blob in ids.items()}
+        state = SpecState.from_texts(texts)
+    cache.put("since-state", _state_key(ids), state.to_json())
+    return state
+
+
+def validate_since(spec_dir, ref: str, cache: ParseCache) -> Tuple[SpecState, Dict[str, List[str]]]:
+    """Bring `ref`'s snapshot up to the working tree and report what changed.
+
+    Documents missing from `ref` (including untracked ones) are applied whole.
+    The resulting snapshot is cached under the working tree's blob IDs, so a
+    later run since a commit of this tree starts from it directly.
+    """
+    profile = cache.profiler
+    present = blob_ids(spec_dir, ref)
+    state = load_state(spec_dir, present, cache)
+
+    with profile.phase("since diff"):
+        hunks = diff_hunks(spec_dir, ref)
+        read: Dict[str, List[str]] = {}
+        for name in SPEC_DOCUMENTS:
+            path = Path(spec_dir) / name
+            if name not in present and path.exists():
+                lines = read[name] = text_lines(path.read_text(encoding='utf-8'))
+                hunks[name] = [Hunk(0, 0, len(lines), [], lines)] if lines else []
+
+    with profile.phase("since apply"):
+        changes = state.apply(hunks, _working_reader(spec_dir, read))
+
+    try:
+        cache.put("since-state", _state_key(working_blob_ids(spec_dir)), state.to_json())
+    except GitError:
+        pass
+    return state, changes
+
+
+def sort_key(item: str):
+    """Order criterion IDs and references numerically, e.g. 2.10 after 2.9."""
+    return tuple(int(part) if part.isdigit() else 0 for part in re.split(r'[.-]', item))
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of parsed specification documents.
+Entries are keyed by document kind, parser version and content hash, stored as
+JSON files in a cache directory, and evicted least-recently-used first once
+the directory grows past its size limit.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from profiler import Profiler
+from spec_parser import PARSER_VERSION
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _stamp(path) -> Optional[Tuple[int, int]]:
+    """(mtime, size) of a file; None for an archive member, which cannot change mid-run."""
+    if not isinstance(path, Path):
+        return None
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ParseCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 profiler: Optional[Profiler] = None, memo: bool = False, digests: bool = False):
+        """Cache parses under `cache_dir`; with no directory every load parses afresh
+        (and the hashing and JSON modules are never imported).
+
+        Reads, parses and cache lookups are timed on `profiler` per input file.
+        With `memo`, parsed values are also kept in memory, so within one
+        invocation each document kind is read and parsed once however many
+        validators load it; leave it off where one cache serves many specs.
+        With `digests`, every load hashes the bytes it reads even without a
+        directory, so digest() answers for loaded files without reading them.
+        """
+        self.dir = Path(cache_dir) if cache_dir else None
+        self.max_bytes = max_bytes
+        self.profiler = profiler or Profiler()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+        self._parsed: Optional[Dict[Tuple, Tuple]] = {} if memo else None
+        self.record_digests = digests
+        # str(path) -> (stamp, content hash) of every file hashed so far
+        self._digests: Dict[str, Tuple] = {}
+        # str(path) -> (stamp, bytes) read by digest() ahead of a memo load
+        self._read: Dict[str, Tuple] = {}
+
+    def load(self, path, kind: str, parse: Callable[[str], Any],
+             parse_file: Optional[Callable[[Path], Any]] = None) -> Any:
+        """Return `parse(text)` for the file at `path`, from the cache when unchanged.
+
+        `parse` must return plain JSON types so cached and fresh values compare equal.
+        When `parse_file` is given the file is never read into memory whole: it
+        is hashed in chunks and, on a miss, handed to `parse_file` to stream.
+        `path` may also be a zipfile.Path naming an archive member.
+
+        With `memo`, later loads of an unchanged file (same size and mtime)
+        return the same value, so callers must not mutate it.
+        """
+        if isinstance(path, (str, os.PathLike)):
+            path = Path(path)
+        if self._parsed is None:
+            return self._load(path, kind, parse, parse_file)
+        key = (kind, str(path))
+        stamp = _stamp(path)
+        entry = self._parsed.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = self._parsed[key] = (stamp, self._load(path, kind, parse, parse_file))
+        return entry[1]
+
+    def digest(self, path) -> str:
+        """SHA-256 of the file at `path`, reusing the hash taken when it was loaded.
+
+        With `memo`, a file hashed before it is loaded keeps its bytes until
+        that load, so it is still read only once.
+        """
+        if isinstance(path, (str, os.PathLike)):
+            path = Path(path)
+        stamp = _stamp(path)
+        entry = self._digests.get(str(path))
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        import hashlib
+        with self.profiler.phase("hash", path):
+            if self._parsed is None:
+                from report_writer import file_digest
+                digest = file_digest(path)
+            else:
+                data = path.read_bytes()
+                self._read[str(path)] = (stamp, data)
+                digest = hashlib.sha256(data).hexdigest()
+        self._digests[str(path)] = (stamp, digest)
+        return digest
+
+    def _load(self, path, kind: str, parse: Callable[[str], Any], parse_file: Optional[Callable[[Path], Any]]) -> Any:
+        profile = self.profiler
+        hashing = self.dir is not None or self.record_digests
+        stamp = _stamp(path) if hashing or self._read else None
+        pending = self._read.pop(str(path), None) if self._read else None
+        if pending is not None and pending[0] == stamp:
+            data = pending[1]
+            fresh = lambda: parse(data.decode('utf-8'))
+        elif parse_file is None or (self.dir is None and hashing):
+            # Without a directory a recorded digest needs the bytes, so read them once
+            with profile.phase("read", path):
+                data = path.read_bytes()
+            fresh = lambda: parse(data.decode('utf-8'))
+        else:
+            data = None
+            fresh = lambda: parse_file(path)
+
+        if not hashing:
+            with profile.phase(f"parse {kind}", path):
+                return fresh()
+
+        import hashlib
+        with profile.phase("cache lookup", path):
+            if data is not None:
+                digest = hashlib.sha256(data).hexdigest()
+                self._digests[str(path)] = (stamp, digest)
+            else:
+                digest = self.digest(path)
+            value = self.get(kind, digest)
+        if value is not None:
+            return value
+
+        with profile.phase(f"parse {kind}", path):
+            value = fresh()
+        with profile.phase("cache store", path):
+            self.put(kind, digest, value)
+        return value
+
+    def _entry(self, kind: str, key: str) -> Path:
+        return self.dir / f"{kind}-v{PARSER_VERSION}-{key}.json"
+
+    def get(self, kind: str, key: str) -> Any:
+        """The value stored under `kind` and `key`, or None (counted as a miss)."""
+        if self.dir is None:
+            return None
+        import json
+        entry = self._entry(kind, key)
+        try:
+            with open(entry, encoding='utf-8') as handle:
+                value = json.load(handle)
+            os.utime(entry)  # mark as recently used
+            self.hits += 1
+            return value
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+    def put(self, kind: str, key: str, value: Any):
+        """Store a JSON-serializable value under `kind` and `key`."""
+        if self.dir is None:
+            return
+        try:
+            self._store(self._entry(kind, key), value)
+        except OSError:
+            pass  # an unwritable cache only costs speed
+
+    def _store(self, entry: Path, value: Any):
+        import json
+        import tempfile
+        self.dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding='utf-8') as handle:
+            json.dump(value, handle)
+        size = os.path.getsize(tmp)
+        os.replace(tmp, entry)
+
+        if self._size is None:
+            self._size = sum(e.stat().st_size for e in os.scandir(self.dir) if e.name.endswith(".json"))
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        entries = []
+        for e in os.scandir(self.dir):
+            if e.name.endswith(".json"):
+                try:
+                    stat = e.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, e.path))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # already evicted by a concurrent run
+            self._size -= size
+            self.evictions += 1
+
+    def stats(self) -> str:
+        return f"Parse cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions"
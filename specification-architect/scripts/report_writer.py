@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Atomic, change-aware writer for streamed reports such as validation.md.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file (or a zipfile.Path archive member), read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with (open(path, "rb") if isinstance(path, (str, os.PathLike)) else path.open("rb")) as handle:
+        for block in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_if_changed(path, chunks: Iterable[str]) -> bool:
+    """Stream `chunks` to a temp file beside `path`, then atomically replace it.
+
+    The rendered content is hashed as it is written; if it matches the
+    existing file the temp file is discarded and `path` is left untouched.
+    Returns True when the file was (re)written.
+    """
+    path = Path(path)
+    digest = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                digest.update(data)
+                out.write(data)
+
+        if path.exists():
+            if file_digest(path) == digest.hexdigest():
+                os.remove(tmp)
+                return False
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
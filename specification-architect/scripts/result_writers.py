@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Output formats for validation results.
+Each writer serializes one result from validation_result.py to a text
+stream, using only the result's own hooks, so any format can be chosen
+after validation has run and adding one never touches a validator.
+The serializers are imported by the writers that need them (startup).
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, TextIO
+
+
+def write_text(result, out: TextIO) -> None:
+    """The human-readable report (validation.md for traceability results)."""
+    for chunk in result.text():
+        out.write(chunk)
+
+
+def write_json(result, out: TextIO) -> None:
+    """One JSON document."""
+    import json
+    json.dump(result.to_dict(), out, indent=2)
+    out.write("\n")
+
+
+def write_ndjson(result, out: TextIO) -> None:
+    """One JSON object per line, flushed as it is produced, ending with an {"event": "summary"} record."""
+    import json
+    for record in result.records():
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+
+def write_junit(result, out: TextIO) -> None:
+    """JUnit XML: one test suite per check class, one failing test case per finding.
+
+    Non-fatal findings a passing case carries go to its <system-out>.
+    """
+    from xml.sax.saxutils import escape, quoteattr
+
+    suites: Dict[str, list] = OrderedDict()
+    for classname, name, failure, output in result.test_cases():
+        suites.setdefault(classname, []).append((name, failure, output))
+    failures = sum(failure is not None for cases in suites.values() for _, failure, _ in cases)
+    tests = sum(len(cases) for cases in suites.values())
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(f'<testsuites name={quoteattr(result.spec)} tests="{tests}" failures="{failures}">\n')
+    for classname, cases in suites.items():
+        suite_failures = sum(failure is not None for _, failure, _ in cases)
+        out.write(f'  <testsuite name={quoteattr(classname)} tests="{len(cases)}" failures="{suite_failures}">\n')
+        for name, failure, output in cases:
+            case = f'    <testcase classname={quoteattr(classname)} name={quoteattr(name)}'
+            if failure is None and output is None:
+                out.write(case + '/>\n')
+                continue
+            out.write(case + '>\n')
+            if failure is not None:
+                out.write(f'      <failure message={quoteattr(failure)}>{escape(failure)}</failure>\n')
+            if output is not None:
+                out.write(f'      <system-out>{escape(output)}</system-out>\n')
+            out.write('    </testcase>\n')
+        out.write('  </testsuite>\n')
+    out.write('</testsuites>\n')
+
+
+WRITERS: Dict[str, Callable[..., None]] = {
+    "text": write_text,
+    "json": write_json,
+    "ndjson": write_ndjson,
+    "junit": write_junit,
+}
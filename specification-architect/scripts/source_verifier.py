@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Concurrent, cached verification of Browsed Sources URLs.
+URLs are checked on a bounded thread pool over pooled keep-alive connections
+(one idle list per scheme, host and port), with requests to each host spaced
+by a per-host rate limit. HEAD is tried first and GET when a server refuses
+it; redirects are followed. Results are kept in a JSON cache file and reused
+until they are older than the TTL, so a repeated run requests nothing for
+fresh entries. Network errors, 5xx answers and the transient 408 and 429
+are not cached.
+"""
+
+import http.client
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, zip_longest
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 2.0  # requests per second per host
+DEFAULT_TIMEOUT = 10.0
+MAX_REDIRECTS = 5
+MAX_DRAIN = 64 * 1024  # larger GET bodies close the connection instead of being read
+USER_AGENT = "specification-architect-source-verifier/1"
+CACHE_VERSION = 1
+# Request Timeout and Too Many Requests say nothing lasting about the source
+TRANSIENT_STATUSES = (408, 429)
+
+
+def default_cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "specification-architect" / "source-checks.json"
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate: float = DEFAULT_RATE):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host: str):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port), shared by worker threads."""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def acquire(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        """An idle connection for `key` (reused=True) or a new one."""
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.opened += 1
+        scheme, host, port = key
+        factory = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return factory(host, port, timeout=self.timeout), False
+
+    def release(self, key: Tuple[str, str, int], connection: http.client.HTTPConnection):
+        with self.lock:
+            self.idle.setdefault(key, []).append(connection)
+
+    def close(self):
+        with self.lock:
+            connections = list(chain.from_iterable(self.idle.values()))
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+class SourceCache:
+    """URL -> check result, persisted as JSON; entries expire after `ttl` seconds."""
+
+    def __init__(self, path=None, ttl: float = DEFAULT_TTL):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.entries: Dict[str, Dict] = {}
+        if self.path:
+            import json
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    data = json.load(handle)
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data["entries"]
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass  # a missing or corrupt cache only costs requests
+
+    def fresh(self, url: str, now: float) -> Optional[Dict]:
+        entry = self.entries.get(url)
+        if entry is not None and now - entry["checked"] < self.ttl:
+            return entry
+        return None
+
+    def save(self):
+        if not self.path:
+            return
+        import json
+        import tempfile
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"version": CACHE_VERSION, "entries": self.entries}, handle)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+def _by_host(urls: List[str]) -> List[str]:
+    """Interleave URLs round-robin by host, so rate-limited hosts do not stall every worker."""
+    groups: Dict[str, List[str]] = {}
+    for url in urls:
+        groups.setdefault(urlsplit(url).netloc.lower(), []).append(url)
+    return [url for url in chain.from_iterable(zip_longest(*groups.values())) if url is not None]
+
+
+class SourceVerifier:
+    def __init__(self, cache: Optional[SourceCache] = None, workers: int = DEFAULT_WORKERS,
+                 rate: float = DEFAULT_RATE, timeout: float = DEFAULT_TIMEOUT):
+        """Check URLs on `workers` threads, at most `rate` requests per second per host."""
+        self.cache = cache or SourceCache()
+        self.workers = max(1, workers)
+        self.limiter = HostRateLimiter(rate)
+        self.timeout = timeout
+        self.requests = 0
+        self.cache_hits = 0
+        self._count_lock = threading.Lock()
+
+    def verify(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """Result per distinct URL: {"url", "ok", "status", "error", "checked", "cached"}."""
+        now = time.time()
+        results: Dict[str, Dict] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            entry = self.cache.fresh(url, now)
+            if entry is not None:
+                results[url] = {**entry, "cached": True}
+                self.cache_hits += 1
+            else:
+                pending.append(url)
+        if not pending:
+            return results
+
+        pool = ConnectionPool(self.timeout)
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                for result in executor.map(lambda url: self._check(pool, url), _by_host(pending)):
+                    results[result["url"]] = {**result, "cached": False}
+                    status = result["status"]
+                    if status is not None and status < 500 and status not in TRANSIENT_STATUSES:
+                        self.cache.entries[result["url"]] = result
+        finally:
+            pool.close()
+        self.cache.save()
+        return results
+
+    def _check(self, pool: ConnectionPool, url: str) -> Dict:
+        result = {"url": url, "ok": False, "status": None, "error": None, "checked": time.time()}
+        target = url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                status, location = self._request(pool, "HEAD", target)
+                if status in (403, 405, 501):  # servers that refuse HEAD
+                    status, location = self._request(pool, "GET", target)
+                if 300 <= status < 400 and location:
+                    target = urljoin(target, location)
+                    continue
+                result["status"] = status
+                result["ok"] = 200 <= status < 300
+                if not result["ok"]:
+                    result["error"] = f"HTTP {status}"
+                return result
+            result["error"] = f"more than {MAX_REDIRECTS} redirects"
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            result["error"] = str(e) or type(e).__name__
+        return result
+
+    def _request(self, pool: ConnectionPool, method: str, url: str) -> Tuple[int, Optional[str]]:
+        """Status and Location of one request, on a pooled connection when one is idle."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported URL {url!r}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.limiter.wait(parts.netloc.lower())
+        with self._count_lock:
+            self.requests += 1
+        while True:
+            connection, reused = pool.acquire(key)
+            try:
+                connection.request(method, path, headers={"User-Agent": USER_AGENT})
+                response = connection.getresponse()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if reused:  # the server closed an idle keep-alive connection; retry on a new one
+                    continue
+                raise
+            break
+        if method == "HEAD" or (response.length is not None and response.length <= MAX_DRAIN):
+            response.read()
+            if response.will_close:
+                connection.close()
+            else:
+                pool.release(key, connection)
+        else:
+            connection.close()
+        return response.status, response.getheader("Location")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Spec directories inside zip archives.
+A location such as `bundles.zip/project-a` names the `project-a/` directory
+of bundles.zip, and `bundles.zip` alone names the archive root. Such a
+location resolves to a zipfile.Path, which the validators read like a
+directory: members are streamed out of the archive, never extracted. Each
+archive is opened once per process, so validating thousands of its spec
+directories reads its central directory once.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_archives: Dict[Tuple[int, str], object] = {}  # (pid, archive) -> zipfile.ZipFile
+
+
+def split_location(location) -> Optional[Tuple[Path, str]]:
+    """(archive, directory inside it) when `location` lies in a zip archive, else None."""
+    path = Path(location)
+    for candidate in (path, *path.parents):
+        if candidate.is_file():
+            import zipfile
+            if not zipfile.is_zipfile(candidate):
+                return None
+            inner = path.relative_to(candidate).as_posix()
+            return candidate, "" if inner == "." else inner
+        if candidate.exists():
+            return None
+    return None
+
+
+def _open(archive: Path):
+    # Keyed by pid: forked batch workers must not share the parent's file offset
+    import zipfile
+    key = (os.getpid(), str(archive.resolve()))
+    if key not in _archives:
+        _archives[key] = zipfile.ZipFile(archive)
+    return _archives[key]
+
+
+def spec_path(location):
+    """A pathlib.Path for a spec directory on disk, or a zipfile.Path for one inside an archive."""
+    split = split_location(location)
+    if split is None:
+        return Path(location)
+    import zipfile
+    archive, inner = split
+    return zipfile.Path(_open(archive), at=f"{inner}/" if inner else "")
+
+
+def in_archive(path) -> bool:
+    """Whether a spec_path() result points into an archive."""
+    return not isinstance(path, Path)
+
+
+def archive_spec_dirs(location, names: Iterable[str]) -> List[str]:
+    """Locations of the directories at or below `location` in its archive holding any of `names`.
+
+    Sorted, with hidden directories skipped, like a directory walk.
+    """
+    archive, inner = split_location(location)
+    names = set(names)
+    prefix = f"{inner}/" if inner else ""
+    found = set()
+    for name in _open(archive).namelist():
+        folder, _, base = name.rpartition('/')
+        if base in names and (folder == inner or name.startswith(prefix)) \
+                and not any(part.startswith('.') for part in folder[len(prefix):].split('/')):
+            found.add(folder)
+    return [str(Path(archive, folder)) if folder else str(archive) for folder in sorted(found)]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Minimal client for spec_server.py.
+Spawns the server over stdio or connects to a running one with --port, and
+drives it with LSP messages. Used by hooks to validate against a warm server
+and by benchmarks/bench_spec_server.py as an end-to-end client stub.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from spec_server import path_to_uri, read_message, write_message
+
+SERVER = Path(__file__).resolve().parent / "spec_server.py"
+
+
+class SpecClientError(RuntimeError):
+    pass
+
+
+class SpecClient:
+    def __init__(self, port: Optional[int] = None):
+        """Connect to the server on localhost `port`, or start a private one over stdio."""
+        self.process = None
+        if port is None:
+            self.process = subprocess.Popen([sys.executable, str(SERVER)],
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            self.reader, self.writer = self.process.stdout, self.process.stdin
+        else:
+            self.socket = socket.create_connection(("127.0.0.1", port))
+            self.reader, self.writer = self.socket.makefile('rb'), self.socket.makefile('wb')
+        self.next_id = 0
+        self.notifications = deque()
+
+    def request(self, method: str, params=None):
+        self.next_id += 1
+        write_message(self.writer, {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params})
+        while True:
+            message = self._read()
+            if message.get("id") != self.next_id or "method" in message:
+                self.notifications.append(message)
+                continue
+            if "error" in message:
+                raise SpecClientError(message["error"]["message"])
+            return message.get("result")
+
+    def notify(self, method: str, params=None):
+        write_message(self.writer, {"jsonrpc": "2.0", "method": method, "params": params})
+
+    def wait_for(self, method: str) -> Dict:
+        """Params of the next notification named `method`; earlier ones of other kinds stay queued."""
+        for message in list(self.notifications):
+            if message.get("method") == method:
+                self.notifications.remove(message)
+                return message["params"]
+        while True:
+            message = self._read()
+            if message.get("method") == method:
+                return message["params"]
+            self.notifications.append(message)
+
+    def _read(self) -> Dict:
+        message = read_message(self.reader)
+        if message is None:
+            raise SpecClientError("server closed the connection")
+        return message
+
+    def initialize(self) -> Dict:
+        result = self.request("initialize", {"processId": os.getpid(), "rootUri": None,
+                                             "capabilities": {"general": {"positionEncodings": ["utf-32", "utf-16"]}}})
+        self.notify("initialized", {})
+        return result
+
+    def open(self, path, text: Optional[str] = None):
+        path = Path(path).resolve()
+        text = path.read_text(encoding='utf-8') if text is None else text
+        self.notify("textDocument/didOpen", {"textDocument": {
+            "uri": path_to_uri(path), "languageId": "markdown", "version": 1, "text": text}})
+
+    def change(self, path, version: int, start: List[int], end: List[int], text: str):
+        """Replace the range from (line, character) `start` to `end` with `text`."""
+        self.notify("textDocument/didChange", {
+            "textDocument": {"uri": path_to_uri(path), "version": version},
+            "contentChanges": [{"range": {"start": {"line": start[0], "character": start[1]},
+                                          "end": {"line": end[0], "character": end[1]}},
+                                "text": text}]})
+
+    def close(self, path):
+        self.notify("textDocument/didClose", {"textDocument": {"uri": path_to_uri(path)}})
+
+    def validate(self, spec_dir) -> Dict:
+        return self.request("spec/validate", {"path": str(Path(spec_dir).resolve())})
+
+    def shutdown(self):
+        self.request("shutdown")
+        self.notify("exit")
+        if self.process:
+            self.process.wait(timeout=10)
+        else:
+            self.socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a spec directory through a running spec_server.py")
+    parser.add_argument("--path", default=".", help="Spec directory")
+    parser.add_argument("--port", type=int, default=None, help="Port of a server started with spec_server.py --port")
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    args = parser.parse_args()
+
+    try:
+        client = SpecClient(args.port)
+        client.initialize()
+        result = client.validate(args.path)
+        client.shutdown()
+    except (OSError, SpecClientError) as e:
+        print(f"[ERROR] Validation server unavailable: {e}")
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        status = "PASS" if result["valid"] else "FAIL"
+        detail = "; ".join(result["errors"]) or f"{result['coverage']:.1f}% coverage"
+        print(f"[{status}] {result['path']} ({detail})")
+        for criterion in result["missing"]:
+            print(f"  - {criterion}")
+    sys.exit(0 if result["valid"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+SQLite traceability index across many spec directories.
+Each directory's parsed model (components, requirements, criteria with
+their text and coverage, tasks and the criteria they reach, research
+sources and citations) is stored in one indexed database, with FTS5 over
+criterion text. A directory is re-indexed only when the content hash of its
+documents changes, inside one transaction that replaces all of its rows.
+Questions across projects then become single indexed queries:
+
+    python scripts/spec_index.py specs.db criteria --component NotificationService --uncovered
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from parse_cache import ParseCache
+from spec_archive import spec_path
+from spec_parser import (PARSER_VERSION, Criterion, Requirement, parse_components, parse_research,
+                         parse_task_model, parse_task_model_file, requirement_rows, tokens_from_rows)
+from traceability_index import CriterionTable
+
+# Bump whenever the schema changes; older databases are rebuilt on open
+SCHEMA_VERSION = 1
+INDEXED_DOCUMENTS = ("blueprint.md", "requirements.md", "tasks.md", "research.md")
+# Every table holding per-spec rows, cleared when a spec is re-indexed
+SPEC_TABLES = ("components", "requirements", "criteria", "tasks", "task_references", "links",
+               "sources", "citations")
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE specs (
+    id INTEGER PRIMARY KEY, location TEXT NOT NULL UNIQUE, digest TEXT NOT NULL, indexed_at REAL NOT NULL,
+    total INTEGER NOT NULL, covered INTEGER NOT NULL, coverage REAL NOT NULL);
+CREATE TABLE components (spec_id INTEGER NOT NULL, name TEXT NOT NULL);
+CREATE TABLE requirements (spec_id INTEGER NOT NULL, number TEXT NOT NULL, title TEXT, line INTEGER);
+CREATE TABLE criteria (
+    spec_id INTEGER NOT NULL, id INTEGER PRIMARY KEY, criterion TEXT NOT NULL, requirement TEXT NOT NULL,
+    component TEXT, text TEXT NOT NULL, line INTEGER, in_acceptance INTEGER NOT NULL,
+    covered INTEGER);  -- NULL for criteria naming no component, which coverage does not count
+CREATE TABLE tasks (spec_id INTEGER NOT NULL, task_id TEXT NOT NULL, line INTEGER);
+CREATE TABLE task_references (spec_id INTEGER NOT NULL, task_id TEXT NOT NULL, reference TEXT NOT NULL,
+                              valid INTEGER NOT NULL);
+CREATE TABLE links (spec_id INTEGER NOT NULL, criterion TEXT NOT NULL, task_id TEXT NOT NULL);
+CREATE TABLE sources (spec_id INTEGER NOT NULL, number TEXT NOT NULL, url TEXT NOT NULL);
+CREATE TABLE citations (spec_id INTEGER NOT NULL, number TEXT NOT NULL, valid INTEGER NOT NULL);
+CREATE INDEX components_name ON components (name);
+CREATE INDEX components_spec ON components (spec_id);
+CREATE INDEX requirements_spec ON requirements (spec_id);
+CREATE INDEX criteria_component ON criteria (component, covered);
+CREATE INDEX criteria_spec ON criteria (spec_id, criterion);
+CREATE INDEX tasks_spec ON tasks (spec_id, task_id);
+CREATE INDEX task_references_spec ON task_references (spec_id, task_id);
+CREATE INDEX links_spec ON links (spec_id, criterion);
+CREATE INDEX sources_spec ON sources (spec_id);
+CREATE INDEX sources_url ON sources (url);
+CREATE INDEX citations_spec ON citations (spec_id, number);
+"""
+FTS_SCHEMA = "CREATE VIRTUAL TABLE criteria_fts USING fts5(text, content='criteria', content_rowid='id')"
+
+
+def spec_digest(directory, cache: ParseCache) -> str:
+    """Content hash of a spec directory's documents (and the parser version that reads them).
+
+    Document hashes come from `cache`, which reuses those it took loading them.
+    """
+    digest = hashlib.sha256(f"parser {PARSER_VERSION}\n".encode())
+    for name in INDEXED_DOCUMENTS:
+        path = directory / name
+        if path.exists():
+            digest.update(f"{name} {cache.digest(path)}\n".encode())
+    return digest.hexdigest()
+
+
+class SpecIndex:
+    def __init__(self, path, cache: ParseCache = None):
+        """Open (creating if needed) the index database at `path`; parses go through `cache`."""
+        self.path = str(path)
+        self.cache = cache or ParseCache()
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.updated = 0
+        self.unchanged = 0
+        self.fts = self._open_schema()
+
+    def _open_schema(self) -> bool:
+        db = self.db
+        tables = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "meta" in tables:
+            meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+            if meta.get("schema") == str(SCHEMA_VERSION):
+                return meta.get("fts") == "1"
+        with db:
+            for name in tables:
+                if not name.startswith(("sqlite_", "criteria_fts_")):
+                    db.execute(f'DROP TABLE IF EXISTS "{name}"')
+            db.executescript(SCHEMA)
+            try:
+                db.execute(FTS_SCHEMA)
+                fts = True
+            except sqlite3.OperationalError:  # SQLite built without FTS5: text queries fall back to LIKE
+                fts = False
+            db.executemany("INSERT INTO meta VALUES (?, ?)",
+                           [("schema", str(SCHEMA_VERSION)), ("fts", "1" if fts else "0")])
+        return fts
+
+    def close(self):
+        self.db.close()
+
+    # Export
+
+    def update(self, location) -> bool:
+        """Index the spec directory at `location` (a directory, or one inside a zip archive).
+
+        Returns False without touching the database when its documents are
+        unchanged since they were last indexed.
+        """
+        directory = spec_path(location)
+        key = location_key(location)
+        digest = spec_digest(directory, self.cache)
+        row = self.db.execute("SELECT id, digest FROM specs WHERE location = ?", (key,)).fetchone()
+        if row is not None and row["digest"] == digest:
+            self.unchanged += 1
+            return False
+
+        model = self._parse(directory)
+        with self.db:
+            if row is not None:
+                self._delete(row["id"])
+            cursor = self.db.execute(
+                "INSERT INTO specs (location, digest, indexed_at, total, covered, coverage) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, digest, time.time(), *model.pop("summary")))
+            spec_id = cursor.lastrowid
+            for table, rows in model.items():
+                if rows:
+                    marks = ", ".join("?" * (len(rows[0]) + 1))
+                    self.db.executemany(f"INSERT INTO {table} VALUES ({marks})",
+                                        ((spec_id, *values) for values in rows))
+            if self.fts:
+                self.db.execute("INSERT INTO criteria_fts (rowid, text) SELECT id, text FROM criteria "
+                                "WHERE spec_id = ?", (spec_id,))
+        self.updated += 1
+        return True
+
+    def _parse(self, directory) -> Dict[str, list]:
+        load = self.cache.load
+        blueprint, requirements = directory / "blueprint.md", directory / "requirements.md"
+        tasks_md, research_md = directory / "tasks.md", directory / "research.md"
+        components = load(blueprint, "components", parse_components) if blueprint.exists() else []
+        tokens = tokens_from_rows(load(requirements, "requirements", requirement_rows)) \
+            if requirements.exists() else ()
+        tasks = (load(tasks_md, "task-model", parse_task_model, parse_task_model_file)["tasks"]
+                 if tasks_md.exists() else [])
+        research = load(research_md, "research", parse_research) if research_md.exists() else None
+
+        headers, criteria = [], []
+        for token in tokens:
+            if isinstance(token, Requirement):
+                headers.append((token.number, token.title, token.line))
+            elif isinstance(token, Criterion):
+                criteria.append(token)
+
+        # Coverage as validate_specifications.py counts it: over criteria naming a component
+        table = CriterionTable(c.id for c in criteria if c.component)
+        covered = bytearray(len(table))
+        links, task_rows, reference_rows = [], [], []
+        names = table.names
+        for task in tasks:
+            task_id = task["task_id"]
+            task_rows.append((task_id, task["line"]))
+            for reference in task["requirement_references"]:
+                span = table.resolve(reference)
+                reference_rows.append((task_id, reference, int(span is not None)))
+                if span is not None:
+                    for i in span:
+                        covered[i] = 1
+                    links.extend((names[i], task_id) for i in span)
+        ids = table.ids
+        criterion_rows = [(None, c.id, c.requirement, c.component, c.text, c.line, int(c.in_acceptance),
+                           covered[ids[c.id]] if c.component else None) for c in criteria]
+
+        sources, citations = {}, []
+        if research is not None:
+            sources = research["sources"]
+            citations = [(number, int(number in sources)) for number in research["citations"]]
+
+        total, done = len(table), sum(covered)
+        return {
+            "summary": (total, done, (done / total * 100) if total else 0.0),
+            "components": [(name,) for name in components],
+            "requirements": headers,
+            "criteria": criterion_rows,
+            "tasks": task_rows,
+            "task_references": reference_rows,
+            "links": list(dict.fromkeys(links)),
+            "sources": list(sources.items()),
+            "citations": citations,
+        }
+
+    def _delete(self, spec_id: int):
+        if self.fts:
+            self.db.execute("INSERT INTO criteria_fts (criteria_fts, rowid, text) "
+                            "SELECT 'delete', id, text FROM criteria WHERE spec_id = ?", (spec_id,))
+        for table in SPEC_TABLES:
+            self.db.execute(f"DELETE FROM {table} WHERE spec_id = ?", (spec_id,))
+        self.db.execute("DELETE FROM specs WHERE id = ?", (spec_id,))
+
+    def prune(self, keep: Iterable, under) -> int:
+        """Drop indexed specs below `under` whose location is not in `keep`; returns how many."""
+        keep = {location_key(location) for location in keep}
+        prefix = location_key(under)
+        stale = [row["id"] for row in self.db.execute("SELECT id, location FROM specs")
+                 if row["location"] not in keep
+                 and (row["location"] == prefix or row["location"].startswith(prefix.rstrip("/") + "/"))]
+        with self.db:
+            for spec_id in stale:
+                self._delete(spec_id)
+        return len(stale)
+
+    # Queries
+
+    def specs(self, spec: Optional[str] = None) -> List[sqlite3.Row]:
+        """Indexed spec directories with their coverage, optionally those whose location contains `spec`."""
+        where, params = ("WHERE instr(location, ?) > 0", (spec,)) if spec else ("", ())
+        return self.db.execute(f"SELECT location, total, covered, coverage FROM specs {where} "
+                               "ORDER BY location", params).fetchall()
+
+    def criteria(self, component: Optional[str] = None, uncovered: bool = False, match: Optional[str] = None,
+                 spec: Optional[str] = None, limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """Criteria across all specs, filtered by component, coverage, text and spec location.
+
+        `match` is an FTS5 query (`retry AND timeout`, `"exact phrase"`, `notif*`),
+        or a plain substring when SQLite lacks FTS5.
+        """
+        where, params = [], []
+        source = "criteria c JOIN specs s ON s.id = c.spec_id"
+        if match:
+            if self.fts:
+                source += " JOIN criteria_fts f ON f.rowid = c.id"
+                where.append("criteria_fts MATCH ?")
+            else:
+                where.append("instr(lower(c.text), lower(?)) > 0")
+            params.append(match)
+        if component:
+            where.append("c.component = ?")
+            params.append(component)
+        if uncovered:
+            where.append("c.covered = 0")
+        if spec:
+            where.append("instr(s.location, ?) > 0")
+            params.append(spec)
+        sql = (f"SELECT s.location, c.criterion, c.component, c.covered, c.line, c.text FROM {source}"
+               + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY s.location, c.id")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.db.execute(sql, params).fetchall()
+
+    def tasks_for(self, criterion: str, spec: Optional[str] = None) -> List[sqlite3.Row]:
+        """Tasks implementing `criterion` in every spec (or those whose location contains `spec`)."""
+        sql = ("SELECT s.location, l.criterion, l.task_id FROM links l JOIN specs s ON s.id = l.spec_id "
+               "WHERE l.criterion = ?")
+        params = [criterion]
+        if spec:
+            sql += " AND instr(s.location, ?) > 0"
+            params.append(spec)
+        return self.db.execute(sql + " ORDER BY s.location", params).fetchall()
+
+    def sources(self, url: Optional[str] = None, uncited: bool = False) -> List[sqlite3.Row]:
+        """Research sources across specs, optionally those whose URL contains `url` or that nothing cites."""
+        where, params = [], []
+        if url:
+            where.append("instr(r.url, ?) > 0")
+            params.append(url)
+        if uncited:
+            where.append("NOT EXISTS (SELECT 1 FROM citations c WHERE c.spec_id = r.spec_id AND c.number = r.number)")
+        sql = ("SELECT s.location, r.number, r.url FROM sources r JOIN specs s ON s.id = r.spec_id"
+               + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY s.location, r.rowid")
+        return self.db.execute(sql, params).fetchall()
+
+
+def location_key(location) -> str:
+    """The absolute, normalised form of a spec location used as its key in the index."""
+    return Path(location).resolve().as_posix()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query a traceability index written by validate_specifications.py --export-index")
+    parser.add_argument("db", help="Index database")
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    parser.add_argument("--time", action="store_true", help="Print the query time to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+    specs = commands.add_parser("specs", help="Indexed spec directories and their coverage")
+    specs.add_argument("--spec", help="Only locations containing this text")
+    criteria = commands.add_parser("criteria", help="Acceptance criteria across specs")
+    criteria.add_argument("--component", help="Only criteria of this component")
+    criteria.add_argument("--uncovered", action="store_true", help="Only criteria no task covers")
+    criteria.add_argument("--match", help="Full-text query over criterion text (FTS5 syntax)")
+    criteria.add_argument("--spec", help="Only specs whose location contains this text")
+    criteria.add_argument("--limit", type=int, help="At most this many rows")
+    tasks = commands.add_parser("tasks", help="Tasks implementing a criterion across specs")
+    tasks.add_argument("criterion", help="Criterion ID such as 1.2")
+    tasks.add_argument("--spec", help="Only specs whose location contains this text")
+    sources = commands.add_parser("sources", help="Research sources across specs")
+    sources.add_argument("--url", help="Only URLs containing this text")
+    sources.add_argument("--uncited", action="store_true", help="Only sources no rationale cites")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        parser.error(f"no index at {args.db}; write one with validate_specifications.py --export-index")
+    index = SpecIndex(args.db)
+    start = time.perf_counter()
+    try:
+        if args.command == "specs":
+            rows = index.specs(args.spec)
+        elif args.command == "criteria":
+            rows = index.criteria(args.component, args.uncovered, args.match, args.spec, args.limit)
+        elif args.command == "tasks":
+            rows = index.tasks_for(args.criterion, args.spec)
+        else:
+            rows = index.sources(args.url, args.uncited)
+    except sqlite3.OperationalError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        index.close()
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        import json
+        print(json.dumps([dict(row) for row in rows], indent=2))
+    else:
+        for row in rows:
+            print("\t".join("" if value is None else str(value) for value in row))
+    if args.time:
+        print(f"{len(rows)} rows in {elapsed * 1000:.1f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Single-pass tokenizers for specification architect documents.
+Shared by validate_specifications.py and traceability_validator.py.
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+# Bump whenever a parser's output changes so cached parses are invalidated
+PARSER_VERSION = 4
+
+REQUIREMENT_HEADER = re.compile(r'### Requirement (\d+):[ \t]*(.*)')
+ACCEPTANCE_HEADER = re.compile(r'#### Acceptance Criteria\s*$')
+CRITERION_ITEM = re.compile(r'\s*(\d+)\.\s+(.+)')
+EARS_CLAUSE = re.compile(r'WHEN.*?THE\s+\*\*([A-Za-z0-9_]+)\*\*\s+SHALL', re.DOTALL)
+COMPONENT_ROW = re.compile(r'\|\s*\*\*([A-Za-z0-9_]+)\*\*\s*\|')
+REQUIREMENTS_TAG = re.compile(r'_Requirements:\s*([\d., -]+)_')
+TASK_ITEM = re.compile(r'\s*- \[[ xX]\] (\d+(?:\.\d+)*)\.?(?:\s|$)')
+TASK_REFERENCES = re.compile(r'_Requirements:\s*(.+?)_')
+SOURCES_SECTION = re.compile(r'## 3\. Browsed Sources\n(.*?)(?=\n##|\Z)', re.DOTALL)
+SOURCE_LINE = re.compile(r'- \[(\d+)\] (https?://\S+)')
+RATIONALE_ROW = re.compile(r'\| \*\*(.+?)\*\* \| (.+?) \|', re.DOTALL)
+CITATION = re.compile(r'\[cite:(\d+)\]')
+DESIGN_COMPONENT = re.compile(r'### Component:\s*\[?([A-Za-z0-9_]+)\]?')
+DESIGN_MEMBER = re.compile(r'\s*(?:async\s+)?(?:def|class)\s+([A-Za-z_]\w*)')
+IMPLEMENTS = re.compile(r'Implements:\s*(.+)')
+CRITERION_REF = re.compile(r'\d+\.\d+(?:-\d+\.\d+)?')
+# A sentence ends at `!`, `?` or a `.` that is not a decimal point between two digits
+SENTENCE_END = re.compile(r'[!?]|(?<!\d)\.|\.(?!\d)')
+CLAIM_MARKER = re.compile(r'\d|excellent|proven|ideal|best|optimal')
+
+
+class Requirement(NamedTuple):
+    """A `### Requirement N: Title` header."""
+    number: str
+    title: str
+    line: int
+
+
+class AcceptanceCriteria(NamedTuple):
+    """The `#### Acceptance Criteria` heading of a requirement."""
+    requirement: str
+    line: int
+
+
+class Criterion(NamedTuple):
+    """A numbered acceptance criterion inside a requirement section."""
+    requirement: str
+    number: str
+    text: str
+    component: Optional[str]
+    in_acceptance: bool
+    line: int
+
+    @property
+    def id(self) -> str:
+        return f"{self.requirement}.{self.number}"
+
+
+Token = Union[Requirement, AcceptanceCriteria, Criterion]
+
+
+class DesignComponent(NamedTuple):
+    """A `### Component: Name` section of design.md."""
+    name: str
+    line: int
+
+
+class DesignMethod(NamedTuple):
+    """A class or method of a design section whose docstring lists `Implements: Req x.y`."""
+    component: str
+    name: str
+    references: List[str]
+    line: int
+
+    @property
+    def id(self) -> str:
+        return self.component if self.name == self.component else f"{self.component}.{self.name}"
+
+
+class Task(NamedTuple):
+    """A top-level `- [ ] N.` task and the criteria its `_Requirements:_` tags list."""
+    task_id: str
+    references: List[str]
+    line: int
+
+
+class Claim(NamedTuple):
+    """A sentence stating a number, percentage or strong claim."""
+    text: str
+    line: int
+    column: int
+
+
+def open_text(path):
+    """Open a file, or a zip archive member given as a zipfile.Path, for streaming UTF-8 reads."""
+    if isinstance(path, (str, os.PathLike)):
+        return open(path, encoding='utf-8')
+    return path.open('r', encoding='utf-8')
+
+
+def tokenize_requirements(lines: Iterable[str], first_line: int = 1) -> Iterator[Token]:
+    """Walk requirements.md once, yielding records as each one completes.
+
+    A requirement section runs until the next heading above level four; its
+    acceptance criteria section runs until any following heading. A criterion
+    item spans its numbered line plus any continuation lines, and its
+    `component` is set when the item is a `WHEN ... THE **X** SHALL` clause.
+    `first_line` is the line number of the first line, for parsing a slice.
+    """
+    req_num = None
+    in_acceptance = False
+    item = None  # [number, first-line text, line number, in_acceptance, body lines]
+
+    def close_item():
+        number, text, line, in_ac, body = item
+        ears = EARS_CLAUSE.match(body[0] if len(body) == 1 else "\n".join(body))
+        return Criterion(req_num, number, text, ears.group(1) if ears else None, in_ac, line)
+
+    for line_no, raw in enumerate(lines, first_line):
+        line = raw.rstrip('\r\n')
+
+        if line.startswith('#'):
+            if item:
+                yield close_item()
+                item = None
+            in_acceptance = False
+
+            header = REQUIREMENT_HEADER.match(line)
+            if header:
+                req_num = header.group(1)
+                yield Requirement(req_num, header.group(2).strip(), line_no)
+            elif req_num and ACCEPTANCE_HEADER.match(line):
+                in_acceptance = True
+                yield AcceptanceCriteria(req_num, line_no)
+            elif not line.startswith('####'):
+                req_num = None
+            continue
+
+        if req_num is None:
+            continue
+
+        numbered = CRITERION_ITEM.match(line)
+        if numbered:
+            if item:
+                yield close_item()
+            item = [numbered.group(1), numbered.group(2).strip(), line_no,
+                    in_acceptance, [numbered.group(2)]]
+        elif item:
+            item[4].append(line)
+
+    if item:
+        yield close_item()
+
+
+def parse_requirements_file(path: Union[str, Path]) -> Iterator[Token]:
+    """Tokenize a requirements file, streaming it line by line."""
+    with open_text(path) as handle:
+        yield from tokenize_requirements(handle)
+
+
+TOKEN_TYPES = {cls.__name__: cls for cls in (Requirement, AcceptanceCriteria, Criterion,
+                                             DesignComponent, DesignMethod)}
+
+
+def requirement_rows(text: str, first_line: int = 1) -> List[List]:
+    """Tokenize requirements.md content into JSON-serializable `[type, *fields]` rows."""
+    return [[type(token).__name__, *token] for token in tokenize_requirements(text.splitlines(True), first_line)]
+
+
+def tokens_from_rows(rows: Iterable[List]) -> Iterator[Token]:
+    """Rebuild tokens from `requirement_rows` or `design_rows` output."""
+    for name, *fields in rows:
+        yield TOKEN_TYPES[name](*fields)
+
+
+def tokenize_design(lines: Iterable[str]) -> Iterator[Union[DesignComponent, DesignMethod]]:
+    """Walk design.md once, yielding each component section and implementing member.
+
+    A section runs from `### Component: Name` to the next heading above level
+    four. An `Implements:` line belongs to the closest `def` or `class` above
+    it in the section, or to the component itself when there is none.
+    Headings inside fenced code blocks are ignored.
+    """
+    component = None
+    member = None  # (name, line number) of the latest def/class in the section
+    fenced = False
+    for line_no, raw in enumerate(lines, 1):
+        line = raw.rstrip('\r\n')
+        if line.startswith('```'):
+            fenced = not fenced
+            continue
+
+        if not fenced and line.startswith('#'):
+            header = DESIGN_COMPONENT.match(line)
+            if header:
+                component = header.group(1)
+                yield DesignComponent(component, line_no)
+            elif not line.startswith('####'):
+                component = None
+            member = None
+            continue
+
+        if component is None:
+            continue
+        if 'Implements:' in line:
+            name, at = member or (component, line_no)
+            refs = CRITERION_REF.findall(IMPLEMENTS.search(line).group(1))
+            yield DesignMethod(component, name, [sys.intern(ref) for ref in refs], at)
+        elif 'def' in line or 'class' in line:
+            found = DESIGN_MEMBER.match(line)
+            if found:
+                member = (found.group(1), line_no)
+
+
+def design_rows(text: str) -> List[List]:
+    """Tokenize design.md content into JSON-serializable `[type, *fields]` rows."""
+    return [[type(token).__name__, *token] for token in tokenize_design(text.splitlines())]
+
+
+def parse_components(text: str) -> List[str]:
+    """Component names from the blueprint's `| **Name** |` table rows."""
+    return list(dict.fromkeys(COMPONENT_ROW.findall(text)))
+
+
+def task_references(lines: Iterable[str]) -> List[str]:
+    """Every criterion ID listed in a `_Requirements: ..._` tag, one line at a time."""
+    refs = {}
+    for line in lines:
+        if '_Requirements:' not in line:
+            continue
+        for match in REQUIREMENTS_TAG.findall(line):
+            for c in match.split(','):
+                refs[sys.intern(c.strip())] = None
+    return list(refs)
+
+
+def parse_task_references(text: str) -> List[str]:
+    """`task_references` for tasks.md content."""
+    return task_references(text.splitlines())
+
+
+def parse_task_references_file(path: Union[str, Path]) -> List[str]:
+    """`task_references` for a file, streaming it line by line."""
+    with open_text(path) as handle:
+        return task_references(handle)
+
+
+def tokenize_tasks(lines: Iterable[str]) -> Iterator[Task]:
+    """Walk tasks.md once, yielding each top-level task when it ends.
+
+    A task runs from its `- [ ] N.` line to the next top-level task or
+    heading; `N.M` subtasks and every `_Requirements: ..._` tag in between
+    belong to it, so only the current task's references are held in memory.
+    A task without a tag is yielded with no references rather than borrowing
+    the next task's.
+    """
+    task = None  # [task_id, references, line number]
+    for line_no, line in enumerate(lines, 1):
+        if line.startswith('#'):
+            if task:
+                yield Task(*task)
+                task = None
+            continue
+
+        item = TASK_ITEM.match(line)
+        if item and '.' not in item.group(1):
+            if task:
+                yield Task(*task)
+            task = [item.group(1), [], line_no]
+        elif task and '_Requirements:' in line:
+            for refs in TASK_REFERENCES.findall(line):
+                task[1].extend(sys.intern(ref.strip()) for ref in refs.split(','))
+
+    if task:
+        yield Task(*task)
+
+
+def _task_rows(tasks: Iterable[Task]) -> List[Dict]:
+    return [{"task_id": task.task_id, "requirement_references": task.references, "line": task.line}
+            for task in tasks]
+
+
+def parse_tasks(text: str) -> List[Dict]:
+    """Top-level tasks, their requirement references and line numbers."""
+    return _task_rows(tokenize_tasks(text.splitlines()))
+
+
+def parse_tasks_file(path: Union[str, Path]) -> List[Dict]:
+    """`parse_tasks` for a file, streaming it line by line."""
+    with open_text(path) as handle:
+        return _task_rows(tokenize_tasks(handle))
+
+
+def _task_model(lines: Iterable[str]) -> Dict:
+    references: Dict[str, None] = {}
+
+    def tagged(lines):
+        for line in lines:
+            if '_Requirements:' in line:
+                for match in REQUIREMENTS_TAG.findall(line):
+                    for c in match.split(','):
+                        references[sys.intern(c.strip())] = None
+            yield line
+
+    tasks = _task_rows(tokenize_tasks(tagged(lines)))
+    return {"tasks": tasks, "references": list(references)}
+
+
+def parse_task_model(text: str) -> Dict:
+    """`parse_tasks` and `parse_task_references` of tasks.md in one pass, as {"tasks": ..., "references": ...}."""
+    return _task_model(text.splitlines())
+
+
+def parse_task_model_file(path: Union[str, Path]) -> Dict:
+    """`parse_task_model` for a file, streaming it line by line."""
+    with open_text(path) as handle:
+        return _task_model(handle)
+
+
+def scan_claims(text: str) -> Iterator[Claim]:
+    """Yield factual claims in `text` with their 1-based line and column.
+
+    The text is split into sentences by a single forward scan for sentence
+    terminators; a sentence ending in `.` is a claim when it contains a digit
+    or one of the strong-claim words. Each character is examined a constant
+    number of times, so runtime is linear however long a sentence runs.
+    """
+    start = 0
+    line, line_start, counted = 1, 0, 0
+    for end in SENTENCE_END.finditer(text):
+        stop = end.end()
+        if end.group() == '.' and CLAIM_MARKER.search(text, start, stop):
+            sentence = text[start:stop]
+            offset = start + len(sentence) - len(sentence.lstrip())
+            newlines = text.count('\n', counted, offset)
+            if newlines:
+                line += newlines
+                line_start = text.rindex('\n', counted, offset) + 1
+            counted = offset
+            yield Claim(sentence.strip(), line, offset - line_start + 1)
+        start = stop
+
+
+def parse_research(text: str) -> Dict:
+    """Browsed sources, rationale citations and uncited claims of a research document."""
+    sources_section = SOURCES_SECTION.search(text)
+    sources = {}
+    if sources_section:
+        for line in sources_section.group(1).split('\n'):
+            source = SOURCE_LINE.match(line.strip())
+            if source:
+                sources[source.group(1)] = source.group(2)
+
+    citations = []
+    for technology, rationale in RATIONALE_ROW.findall(text):
+        citations.extend(CITATION.findall(rationale))
+
+    # Sentences with specific numbers, percentages, or strong claims
+    uncited_claims = [list(claim) for claim in scan_claims(text)
+                      if not CITATION.search(claim.text)]
+
+    return {
+        "has_sources_section": sources_section is not None,
+        "sources": sources,
+        "citations": citations,
+        "uncited_claims": uncited_claims,
+    }
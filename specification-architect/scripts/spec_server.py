@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Persistent validation server speaking the Language Server Protocol.
+Every spec directory a client touches is kept in memory as document lines
+plus an incremental SpecState. Each text edit becomes a `-U0`-style hunk,
+so only the touched `### Requirement` sections, requirement tag lines,
+component rows and source lines are re-parsed, and coverage diagnostics are
+republished only for the documents whose findings changed. Serves stdio by
+default, or localhost TCP with --port so hooks can share one warm server.
+"""
+
+import argparse
+import json
+import socketserver
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from incremental import COVERAGE_SETS, SPEC_DOCUMENTS, Hunk, SpecState, sort_key
+from spec_parser import CITATION, REQUIREMENTS_TAG, SOURCE_LINE, Criterion, tokenize_requirements
+
+SERVER_DOCUMENTS = SPEC_DOCUMENTS + ("research.md",)
+SOURCES_HEADER = "## 3. Browsed Sources"
+ERROR = 1  # LSP DiagnosticSeverity.Error
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+# What a handler raises on params of the wrong shape; the message is answered or logged, not fatal
+INVALID_INPUT = (AttributeError, IndexError, KeyError, TypeError, ValueError)
+
+
+def read_message(stream) -> Optional[Dict]:
+    """Read one `Content-Length` framed JSON-RPC message, or None at end of stream.
+
+    Raises ValueError for a malformed header or a body that is not a JSON
+    object; the body is consumed first whenever its length is known, so the
+    next read starts at the next message.
+    """
+    length, error = None, None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            if length is not None or error is not None:
+                break
+            continue
+        try:
+            name, _, value = header.decode('ascii').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+                if length < 0:
+                    raise ValueError(f"negative Content-Length {length}")
+        except ValueError as e:
+            length, error = None, e
+    if length is not None:
+        body = stream.read(length)
+        if len(body) < length:
+            return None
+    if error is not None:
+        raise ValueError(f"malformed header: {error}")
+    message = json.loads(body.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError(f"message is a JSON {type(message).__name__}, not an object")
+    return message
+
+
+def write_message(stream, message: Dict):
+    body = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    stream.write(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+    stream.flush()
+
+
+def path_to_uri(path: Path) -> str:
+    return Path(path).resolve().as_uri()
+
+
+def uri_to_path(uri: str) -> Path:
+    parsed = urlparse(uri)
+    return Path(url2pathname(unquote(parsed.path)))
+
+
+def _to_index(line: str, column: int, utf16: bool) -> int:
+    """Code point index of an LSP character offset (UTF-16 code units unless negotiated otherwise)."""
+    if not utf16 or line.isascii():
+        return column
+    units = 0
+    for i, ch in enumerate(line):
+        if units >= column:
+            return i
+        units += 2 if ord(ch) > 0xFFFF else 1
+    return len(line)
+
+
+def _to_column(line: str, index: int, utf16: bool) -> int:
+    if not utf16 or line.isascii():
+        return index
+    return index + sum(1 for ch in line[:index] if ord(ch) > 0xFFFF)
+
+
+def _merge(total: Dict[str, List[str]], changes: Dict[str, List[str]]):
+    """Fold one edit's coverage changes into `total`; an ID that enters and leaves a set cancels out."""
+    for key in COVERAGE_SETS:
+        newly, gone = total.setdefault(f"newly_{key}", []), total.setdefault(f"no_longer_{key}", [])
+        for item in changes.get(f"newly_{key}", ()):
+            if item in gone:
+                gone.remove(item)
+            else:
+                newly.append(item)
+        for item in changes.get(f"no_longer_{key}", ()):
+            if item in newly:
+                newly.remove(item)
+            else:
+                gone.append(item)
+
+
+class LiveSpec:
+    """In-memory documents and coverage state of one spec directory."""
+
+    def __init__(self, spec_dir: Path):
+        self.dir = spec_dir
+        self.lines: Dict[str, List[str]] = {}
+        self.present: Set[str] = set()
+        self.open: Set[str] = set()
+        self.stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.uris: Dict[str, str] = {}  # URIs as the client spelled them, for publishing
+        self.sources: Counter = Counter()
+        self.citations: Counter = Counter()
+        self.source_sections = 0
+
+        texts = {}
+        for name in SERVER_DOCUMENTS:
+            texts[name] = self._read(name)
+            self.lines[name] = texts[name].split('\n')
+        self.state = SpecState.from_texts(texts)
+        self._count_research(self.lines["research.md"], 1)
+
+    def uri(self, name: str) -> str:
+        return self.uris.get(name) or path_to_uri(self.dir / name)
+
+    def _stamp(self, name: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = (self.dir / name).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self, name: str) -> str:
+        self.stamps[name] = self._stamp(name)
+        try:
+            text = (self.dir / name).read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):  # unreadable documents count as absent
+            self.present.discard(name)
+            return ""
+        self.present.add(name)
+        return text
+
+    def refresh(self) -> Dict[str, List[str]]:
+        """Re-read the documents not open in an editor that changed on disk."""
+        changes: Dict[str, List[str]] = {}
+        for name in SERVER_DOCUMENTS:
+            if name not in self.open and self._stamp(name) != self.stamps.get(name):
+                _merge(changes, self.replace(name, self._read(name)))
+        return changes
+
+    def replace(self, name: str, text: str) -> Dict[str, List[str]]:
+        """Set the whole text of `name`, re-parsing only the lines that differ."""
+        old, new = self.lines[name], text.split('\n')
+        first, limit = 0, min(len(old), len(new))
+        while first < limit and old[first] == new[first]:
+            first += 1
+        last_old, last_new = len(old) - 1, len(new) - 1
+        while last_old >= first and last_new >= first and old[last_old] == new[last_new]:
+            last_old -= 1
+            last_new -= 1
+        if last_old < first and last_new < first:
+            return {}
+        return self.splice(name, first, last_old, new[first:last_new + 1])
+
+    def edit(self, name: str, start: Dict, end: Dict, text: str, utf16: bool) -> Dict[str, List[str]]:
+        """Apply one LSP range edit."""
+        full = self.lines[name]
+        first, last = min(start["line"], len(full) - 1), min(end["line"], len(full) - 1)
+        head = full[first][:_to_index(full[first], start["character"], utf16)]
+        tail = full[last][_to_index(full[last], end["character"], utf16):]
+        return self.splice(name, first, last, (head + text + tail).split('\n'))
+
+    def splice(self, name: str, first: int, last: int, block: List[str]) -> Dict[str, List[str]]:
+        """Replace lines first..last (0-based, inclusive; last = first - 1 inserts) with `block`.
+
+        The document is kept as its `\\n`-split lines, so a trailing newline
+        shows up as a final empty line that git (and SpecState) do not count.
+        """
+        full = self.lines[name]
+        tail = len(full) - 1 - last
+        removed = full[first:last + 1]
+        old_n = len(full) - (full[-1] == "")
+        full[first:last + 1] = block
+        trailing = full[-1] == ""
+        new_n = len(full) - trailing
+        suffix = min(max(tail - trailing, 0), old_n - first, new_n - first)
+        old_count, new_count = old_n - suffix - first, new_n - suffix - first
+        if name == "research.md":
+            self._count_research(removed, -1)
+            self._count_research(block, 1)
+            return {}
+        if not old_count and not new_count:
+            return {}
+        hunk = Hunk(first + 1 if old_count else first, old_count, new_count,
+                    removed[:old_count], full[first:first + new_count])
+        return self.state.apply({name: [hunk]},
+                                lambda _, spans: [full[start - 1:start - 1 + count] for start, count in spans])
+
+    def _count_research(self, lines: List[str], step: int):
+        """Track Browsed Sources headings, source lines and rationale-row citations line by line."""
+        for line in lines:
+            if line.startswith(SOURCES_HEADER):
+                self.source_sections += step
+            source = SOURCE_LINE.match(line.strip())
+            if source:
+                self.sources[source.group(1)] += step
+            if line.startswith('|') and '[cite:' in line:
+                self.citations.update({c: step for c in CITATION.findall(line)})
+
+    @staticmethod
+    def _lines_mentioning(full: List[str], refs: Set[str]) -> List[int]:
+        """Sorted indexes of lines that may contain any of `refs`.
+
+        Each reference is located with str.find over the joined text, so a
+        document with few invalid references is not walked line by line.
+        """
+        text = "\n".join(full)
+        positions = []
+        for ref in filter(None, refs):
+            position = text.find(ref)
+            while position != -1:
+                positions.append(position)
+                position = text.find(ref, position + len(ref))
+        lines = []
+        line, previous = 0, 0
+        for position in sorted(positions):
+            line += text.count('\n', previous, position)
+            previous = position
+            if not lines or lines[-1] != line:
+                lines.append(line)
+        return lines
+
+    def summary(self, missing: bool = True) -> Dict:
+        """The Validator verdict for the in-memory documents, shaped like validate_dir output.
+
+        With `missing` false the sorted list of missing criteria is left out.
+        """
+        state = self.state
+        result = {"path": str(self.dir), "total": 0, "covered": 0, "missing": [], "coverage": 0.0,
+                  "valid": False, "errors": [f"Missing: {name}" for name in SPEC_DOCUMENTS
+                                             if name not in self.present and name not in self.open]}
+        # Same early exits (and reasons) as Validator.validate()
+        if result["errors"]:
+            return result
+        if not state.components:
+            result["errors"].append("No components found")
+            return result
+        result["total"] = state.total
+        if not state.total:
+            result["errors"].append("No acceptance criteria with a component found")
+            return result
+        if not state.refs:
+            result["errors"].append("No requirement tags found")
+            return result
+        result["covered"] = len(state.covered)
+        if missing:
+            result["missing"] = sorted(state.missing, key=sort_key)
+        if state.criteria:
+            result["coverage"] = (len(state.covered) / len(state.criteria)) * 100
+        result["valid"] = result["coverage"] == 100.0
+        return result
+
+    def diagnostics(self, name: str, utf16: bool) -> List[Dict]:
+        full = self.lines[name]
+
+        def diagnostic(line: int, start: int, end: int, message: str) -> Dict:
+            text = full[line] if line < len(full) else ""
+            return {"range": {"start": {"line": line, "character": _to_column(text, start, utf16)},
+                              "end": {"line": line, "character": _to_column(text, end, utf16)}},
+                    "severity": ERROR, "source": "spec-validation", "message": message}
+
+        found = []
+        if name == "blueprint.md" and not self.state.components:
+            found.append(diagnostic(0, 0, 0, "No components found: add `| **ComponentName** | ... |` rows"))
+        elif name == "requirements.md" and self.state.missing:
+            missing, start = self.state.missing, 0
+            for length, ids in zip(self.state.section_lengths, self.state.section_criteria):
+                if not missing.isdisjoint(ids):
+                    for token in tokenize_requirements(full[start:start + length]):
+                        if isinstance(token, Criterion) and token.component and token.id in missing:
+                            line = start + token.line - 1
+                            found.append(diagnostic(line, 0, len(full[line]),
+                                                    f"Criterion {token.id} is not covered by any task"))
+                start += length
+        elif name == "tasks.md" and self.state.invalid:
+            for line in self._lines_mentioning(full, self.state.invalid):
+                text = full[line]
+                for tag in REQUIREMENTS_TAG.finditer(text):
+                    position = tag.start(1)
+                    for part in tag.group(1).split(','):
+                        ref = part.strip()
+                        if ref and ref in self.state.invalid:
+                            column = position + part.index(ref)
+                            found.append(diagnostic(line, column, column + len(ref),
+                                                    f"Reference {ref} does not match any acceptance criterion"))
+                        position += len(part) + 1
+        elif name == "research.md" and "research.md" in self.present | self.open:
+            if self.source_sections <= 0:
+                found.append(diagnostic(0, 0, 0, f"Missing '{SOURCES_HEADER}' section"))
+            elif any(n > 0 and self.sources[c] <= 0 for c, n in self.citations.items()):
+                for line, text in enumerate(full):
+                    if not text.startswith('|') or '[cite:' not in text:
+                        continue
+                    for citation in CITATION.finditer(text):
+                        if self.sources[citation.group(1)] <= 0:
+                            found.append(diagnostic(line, citation.start(), citation.end(),
+                                                    f"Citation {citation.group()} references non-existent source"))
+        return found
+
+
+class Workspace:
+    """Spec directories shared by every connection; `lock` serializes access."""
+
+    def __init__(self):
+        self.specs: Dict[Path, LiveSpec] = {}
+        self.lock = threading.Lock()
+
+    def spec(self, spec_dir) -> LiveSpec:
+        spec_dir = Path(spec_dir).resolve()
+        live = self.specs.get(spec_dir)
+        if live is None:
+            live = self.specs[spec_dir] = LiveSpec(spec_dir)
+        return live
+
+    def document(self, uri: str) -> Tuple[Optional[LiveSpec], str]:
+        """The spec holding `uri` and the document's name, or (None, name) for other files."""
+        path = uri_to_path(uri)
+        if path.name not in SERVER_DOCUMENTS:
+            return None, path.name
+        return self.spec(path.parent), path.name
+
+
+class Session:
+    """One client connection: JSON-RPC dispatch against a shared Workspace."""
+
+    def __init__(self, workspace: Workspace, reader, writer):
+        self.workspace = workspace
+        self.reader = reader
+        self.writer = writer
+        self.utf16 = True
+        self.published: Dict[str, List[Dict]] = {}
+        self.shutdown = False
+        self.exited = False
+
+    def serve(self) -> int:
+        """Handle messages until `exit` or end of stream; returns the LSP exit code."""
+        while not self.exited:
+            try:
+                message = read_message(self.reader)
+            except ValueError as e:
+                print(f"[ERROR] Skipped undecodable message: {e}", file=sys.stderr, flush=True)
+                self.send({"id": None, "error": {"code": PARSE_ERROR, "message": str(e)}})
+                continue
+            if message is None:
+                break
+            with self.workspace.lock:
+                self.dispatch(message)
+        return 0 if self.shutdown else 1
+
+    def send(self, message: Dict):
+        write_message(self.writer, {"jsonrpc": "2.0", **message})
+
+    def dispatch(self, message: Dict):
+        method, params = message.get("method"), message.get("params") or {}
+        handler = (getattr(self, "on_" + method.replace("/", "_").replace("$", "_"), None)
+                   if isinstance(method, str) else None)
+        if "id" not in message:
+            if handler:
+                try:
+                    handler(params)
+                except INVALID_INPUT as e:
+                    # Notifications have no response to carry the error
+                    print(f"[ERROR] {method}: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+            return
+        if handler is None:
+            self.send({"id": message["id"], "error": {"code": METHOD_NOT_FOUND, "message": f"Unknown method {method}"}})
+            return
+        try:
+            result = handler(params)
+        except INVALID_INPUT as e:
+            self.send({"id": message["id"], "error": {"code": INVALID_PARAMS, "message": str(e)}})
+            return
+        self.send({"id": message["id"], "result": result})
+
+    def on_initialize(self, params):
+        offered = ((params.get("capabilities") or {}).get("general") or {}).get("positionEncodings") or []
+        self.utf16 = "utf-32" not in offered
+        return {"capabilities": {"positionEncoding": "utf-16" if self.utf16 else "utf-32",
+                                 "textDocumentSync": {"openClose": True, "change": 2}},
+                "serverInfo": {"name": "spec-validation-server"}}
+
+    def on_shutdown(self, params):
+        self.shutdown = True
+        return None
+
+    def on_exit(self, params):
+        self.exited = True
+
+    def on_textDocument_didOpen(self, params):
+        document = params["textDocument"]
+        uri, text = document["uri"], document["text"]  # both checked before any state changes
+        spec, name = self.workspace.document(uri)
+        if spec is None:
+            return
+        first = not spec.open
+        spec.open.add(name)
+        spec.uris[name] = uri
+        changes = spec.replace(name, text)
+        self.publish(spec, SERVER_DOCUMENTS if first else (name,), changes)
+
+    def on_textDocument_didChange(self, params):
+        spec, name = self.workspace.document(params["textDocument"]["uri"])
+        if spec is None:
+            return
+        changes: Dict[str, List[str]] = {}
+        for change in params["contentChanges"]:
+            if "range" in change:
+                edit = spec.edit(name, change["range"]["start"], change["range"]["end"], change["text"], self.utf16)
+            else:
+                edit = spec.replace(name, change["text"])
+            _merge(changes, edit)
+        self.publish(spec, (name,), changes)
+
+    def on_textDocument_didClose(self, params):
+        uri = params["textDocument"]["uri"]
+        spec, name = self.workspace.document(uri)
+        if spec is None:
+            return
+        spec.open.discard(name)
+        changes = spec.refresh()  # fall back to the saved file
+        self.publish(spec, (), changes)
+        self.published[uri] = []
+        self.send({"method": "textDocument/publishDiagnostics", "params": {"uri": uri, "diagnostics": []}})
+
+    def on_spec_validate(self, params):
+        """Custom request: refresh unopened documents from disk and return the Validator verdict."""
+        spec = self.workspace.spec(params["path"])
+        changes = spec.refresh()
+        if spec.open:
+            self.publish(spec, (), changes)
+        return spec.summary()
+
+    def publish(self, spec: LiveSpec, edited, changes: Dict[str, List[str]]):
+        """Send diagnostics for edited documents and any whose findings the changes affect."""
+        names = set(edited)
+        if any(changes.get(f"{change}_missing") for change in ("newly", "no_longer")):
+            names.add("requirements.md")
+        if any(changes.get(f"{change}_invalid") for change in ("newly", "no_longer")):
+            names.add("tasks.md")
+        for name in SERVER_DOCUMENTS:
+            if name not in names:
+                continue
+            uri = spec.uri(name)
+            found = spec.diagnostics(name, self.utf16)
+            if self.published.get(uri) != found:
+                self.published[uri] = found
+                self.send({"method": "textDocument/publishDiagnostics",
+                           "params": {"uri": uri, "diagnostics": found}})
+        # Diagnostics carry the details; keep per-keystroke traffic small
+        summary = spec.summary(missing=False)
+        del summary["missing"]
+        self.send({"method": "spec/coverage", "params": {**summary, "changes": changes}})
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        Session(self.server.workspace, self.rfile, self.wfile).serve()
+
+
+class TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int, workspace: Optional[Workspace] = None):
+        super().__init__(("127.0.0.1", port), _ConnectionHandler)
+        self.workspace = workspace or Workspace()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve spec validation diagnostics over the Language Server Protocol")
+    parser.add_argument("--port", type=int, default=None,
+                        help="Listen on localhost TCP instead of stdio; every connection shares the parsed specs")
+    args = parser.parse_args()
+
+    if args.port is None:
+        sys.exit(Session(Workspace(), sys.stdin.buffer, sys.stdout.buffer).serve())
+    with TCPServer(args.port) as server:
+        print(f"[INFO] Serving on 127.0.0.1:{server.server_address[1]}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
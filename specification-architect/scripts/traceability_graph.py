@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Multi-hop traceability graph across blueprint, requirements, design and tasks.
+Links component -> criterion (the `THE **Component** SHALL` clause) ->
+design member (`Implements: Req x.y`) -> task (`_Requirements: x.y_`). Every
+document is walked once and all adjacency lists, including the two-hop
+component -> design member and component -> task lists, are built up front,
+so each query returns a stored list in time proportional to its size.
+"""
+
+from itertools import chain
+from typing import Dict, Iterable, List, Union
+
+from spec_parser import Criterion, DesignComponent, DesignMethod, Token
+from traceability_index import CriterionTable
+
+
+def _hop(first: Dict[str, List[str]], second: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Two-hop adjacency: for each key of `first`, the distinct `second` targets of its targets.
+
+    A key with a single middle node shares that node's list instead of copying it.
+    """
+    return {key: second[middle[0]] if len(middle) == 1
+            else list(dict.fromkeys(chain.from_iterable(map(second.__getitem__, middle))))
+            for key, middle in first.items()}
+
+
+class TraceabilityGraph:
+    def __init__(self, components: Iterable[str], requirement_tokens: Iterable[Token],
+                 design_tokens: Iterable[Union[DesignComponent, DesignMethod]], tasks: Iterable[Dict]):
+        """Build the graph from blueprint component names, requirements.md tokens,
+        design.md tokens and task dicts (as returned by parse_tasks)."""
+        self.components: List[str] = list(dict.fromkeys(components))
+        self.component_criteria: Dict[str, List[str]] = {name: [] for name in self.components}
+        self.criterion_component: Dict[str, str] = {}
+        criteria = []
+        for token in requirement_tokens:
+            if isinstance(token, Criterion) and (token.in_acceptance or token.component):
+                criteria.append(token.id)
+                if token.component:
+                    self.criterion_component[token.id] = token.component
+                    self.component_criteria.setdefault(token.component, []).append(token.id)
+        self.table = CriterionTable(criteria)
+        names = self.table.names
+        # Components named by criteria but missing from the blueprint come after its own
+        self.undefined_components: List[str] = list(self.component_criteria)[len(self.components):]
+
+        self.method_component: Dict[str, str] = {}
+        self.design_sections: Dict[str, int] = {}
+        method_ids: Dict[str, List[int]] = {}
+        invalid: Dict[str, None] = {}
+        for token in design_tokens:
+            if isinstance(token, DesignComponent):
+                self.design_sections.setdefault(token.name, token.line)
+            else:
+                self.method_component[token.id] = token.component
+                method_ids.setdefault(token.id, []).extend(self.table.intern(token.references, invalid))
+        self.invalid_design_references: List[str] = list(invalid)
+        self.method_criteria, self.criterion_methods = self._link(method_ids)
+
+        task_ids: Dict[str, List[int]] = {}
+        for task in tasks:
+            task_ids.setdefault(task["task_id"], []).extend(self.table.intern(task["requirement_references"]))
+        self.task_criteria, self.criterion_tasks = self._link(task_ids)
+
+        self.component_methods = _hop(self.component_criteria, self.criterion_methods)
+        self.component_tasks = _hop(self.component_criteria, self.criterion_tasks)
+        self.method_tasks = _hop(self.method_criteria, self.criterion_tasks)
+
+        self.criteria_without_design: List[str] = [c for c in names if not self.criterion_methods[c]]
+        self.criteria_without_tasks: List[str] = [c for c in names if not self.criterion_tasks[c]]
+        # Blueprint components that no acceptance criterion assigns any behaviour to
+        self.orphan_components: List[str] = [c for c in self.components if not self.component_criteria[c]]
+        # Design sections for components the blueprint lacks, or implementing no known criterion
+        implementing = set(map(self.method_component.__getitem__,
+                               (m for m, linked in self.method_criteria.items() if linked)))
+        blueprint = set(self.components)
+        self.orphan_design_sections: List[str] = [name for name in self.design_sections
+                                                  if name not in blueprint or name not in implementing]
+
+    def _link(self, sources: Dict[str, List[int]]):
+        """Forward (source -> criteria) and reverse (criterion -> sources) lists from interned IDs."""
+        names = self.table.names
+        reverse: List[List[str]] = [[] for _ in names]
+        forward = {}
+        for source, ids in sources.items():
+            if len(ids) > 1:
+                ids = list(dict.fromkeys(ids))
+            forward[source] = list(map(names.__getitem__, ids))
+            for i in ids:
+                reverse[i].append(source)
+        return forward, dict(zip(names, reverse))
+
+    def criteria_for_component(self, component: str) -> List[str]:
+        return self.component_criteria.get(component, [])
+
+    def methods_for_component(self, component: str) -> List[str]:
+        """Design members implementing any criterion of `component`."""
+        return self.component_methods.get(component, [])
+
+    def tasks_reaching(self, component: str) -> List[str]:
+        """Tasks covering any criterion of `component`, in first-reached order."""
+        return self.component_tasks.get(component, [])
+
+    def methods_for(self, criterion: str) -> List[str]:
+        return self.criterion_methods.get(criterion, [])
+
+    def tasks_for(self, criterion: str) -> List[str]:
+        return self.criterion_tasks.get(criterion, [])
+
+    def tasks_for_method(self, method: str) -> List[str]:
+        """Tasks covering any criterion the design member implements."""
+        return self.method_tasks.get(method, [])
+
+    def summary(self) -> Dict:
+        return {
+            "components": len(self.components),
+            "criteria": len(self.table),
+            "design_sections": len(self.design_sections),
+            "design_members": len(self.method_criteria),
+            "tasks": len(self.task_criteria),
+            "orphan_components": self.orphan_components,
+            "orphan_design_sections": self.orphan_design_sections,
+            "undefined_components": self.undefined_components,
+            "criteria_without_design": self.criteria_without_design,
+            "criteria_without_tasks": self.criteria_without_tasks,
+            "invalid_design_references": self.invalid_design_references,
+        }
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Inverted index between acceptance criteria and implementation tasks.
+Criterion IDs are interned to dense integers in document order; each task
+keeps the integer IDs it references and coverage is an int bitmask over
+them, so missing is `all & ~covered` rather than a difference of ID sets.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+
+def bitmask(ids: Iterable[int], size: int) -> int:
+    """Int with bit i set for every ID i below `size`."""
+    packed = bytearray((size + 7) // 8)
+    for i in ids:
+        packed[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(packed, "little")
+
+
+class CriterionTable:
+    """Dense integer IDs for criterion strings such as "3.4", in document order."""
+
+    def __init__(self, criteria: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(criteria))
+        self.ids: Dict[str, int] = dict(zip(self.names, range(len(self.names))))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve(self, reference: str) -> Optional[range]:
+        """IDs covered by `reference`, or None if it names no criterion.
+
+        A range reference such as `1.1-1.4` covers every criterion from its
+        first to its last endpoint in document order.
+        """
+        i = self.ids.get(reference)
+        if i is not None:
+            return range(i, i + 1)
+        first, dash, last = reference.partition('-')
+        if dash:
+            start, stop = self.ids.get(first.strip()), self.ids.get(last.strip())
+            if start is not None and stop is not None and start <= stop:
+                return range(start, stop + 1)
+        return None
+
+    def intern(self, references: Iterable[str], invalid: Optional[Dict[str, None]] = None) -> List[int]:
+        """IDs the references cover, ranges expanded; unknown references go into `invalid`."""
+        references = references if isinstance(references, list) else list(references)
+        ids = list(map(self.ids.get, references))
+        if None not in ids:
+            return ids
+        expanded = []
+        for reference, i in zip(references, ids):
+            if i is not None:
+                expanded.append(i)
+                continue
+            span = self.resolve(reference)
+            if span is not None:
+                expanded.extend(span)
+            elif invalid is not None:
+                invalid[reference] = None
+        return expanded
+
+    @property
+    def all(self) -> int:
+        """Bitmask of every ID."""
+        return (1 << len(self.names)) - 1
+
+    def mask(self, references: Iterable[str], invalid: Optional[Dict[str, None]] = None) -> int:
+        """Bitmask of every ID the references cover."""
+        return bitmask(self.intern(references, invalid), len(self.names))
+
+    def select(self, mask: int) -> List[str]:
+        """Names whose bit is set in `mask`, in document order."""
+        packed = mask.to_bytes((len(self.names) + 7) // 8, "little")
+        return [name for i, name in enumerate(self.names) if packed[i >> 3] >> (i & 7) & 1]
+
+
+class TraceabilityIndex:
+    def __init__(self, requirements: Dict, tasks: List[Dict]):
+        """Index `requirements` (as returned by parse_requirements) against `tasks`."""
+        # Document order of every criterion, mapped to its requirement number
+        self.criterion_requirement: Dict[str, str] = {}
+        for req_num, req_data in requirements.items():
+            for ac_ref in req_data["acceptance_criteria"]:
+                self.criterion_requirement[ac_ref] = req_num
+        self.table = CriterionTable(self.criterion_requirement)
+
+        self.task_ids: Dict[str, array] = {}
+        invalid: Dict[str, None] = {}
+        referenced = array('l')
+
+        intern = self.table.intern
+        for task in tasks:
+            ids = intern(task["requirement_references"], invalid)
+            previous = self.task_ids.get(task["task_id"])
+            if previous is not None:
+                ids = list(previous) + ids
+            ids = array('l', dict.fromkeys(ids))
+            referenced.extend(ids)
+            self.task_ids[task["task_id"]] = ids
+
+        self.covered_mask = bitmask(referenced, len(self.table))
+        self.covered_criteria: List[str] = self.table.select(self.covered_mask)
+        self.missing_criteria: List[str] = self.table.select(self.table.all & ~self.covered_mask)
+        self.invalid_references: List[str] = list(invalid)
+        self._criterion_tasks = None
+        self._sets = None
+
+    @property
+    def covered(self) -> frozenset:
+        return self._frozen()[0]
+
+    @property
+    def missing(self) -> frozenset:
+        return self._frozen()[1]
+
+    @property
+    def invalid(self) -> frozenset:
+        return self._frozen()[2]
+
+    def _frozen(self):
+        if self._sets is None:
+            self._sets = (frozenset(self.covered_criteria), frozenset(self.missing_criteria),
+                          frozenset(self.invalid_references))
+        return self._sets
+
+    @property
+    def criterion_tasks(self) -> Dict[str, List[str]]:
+        """Criterion -> implementing task IDs in task order, built on first use."""
+        if self._criterion_tasks is None:
+            lists: List[List[str]] = [[] for _ in range(len(self.table))]
+            for task_id, ids in self.task_ids.items():
+                for i in ids:
+                    lists[i].append(task_id)
+            self._criterion_tasks = dict(zip(self.table.names, lists))
+        return self._criterion_tasks
+
+    @property
+    def all_criteria(self) -> List[str]:
+        """All criteria in document order."""
+        return list(self.table.names)
+
+    def tasks_for(self, criterion: str) -> List[str]:
+        """IDs of tasks implementing `criterion`, in task order."""
+        return self.criterion_tasks.get(criterion, [])
+
+    def criteria_for(self, task_id: str) -> List[str]:
+        """Valid criteria referenced by `task_id`, ranges expanded."""
+        names = self.table.names
+        return [names[i] for i in self.task_ids.get(task_id, ())]
+
+    def is_covered(self, criterion: str) -> bool:
+        i = self.table.ids.get(criterion)
+        return i is not None and self.covered_mask >> i & 1 == 1
+
+    def is_invalid(self, reference: str) -> bool:
+        return reference in self.invalid
+
+    @property
+    def total(self) -> int:
+        return len(self.table)
+
+    @property
+    def coverage_percentage(self) -> float:
+        return (len(self.covered_criteria) / self.total * 100) if self.total else 100
+
+    def rows(self):
+        """Yield (requirement, criterion, task IDs) in document order."""
+        for ac_ref, task_ids in self.criterion_tasks.items():
+            yield self.criterion_requirement[ac_ref], ac_ref, task_ids
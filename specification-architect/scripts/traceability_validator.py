@@ -4,17 +4,40 @@ Traceability validator for specification architect skill.
 Validates that all requirements are covered by implementation tasks.
 """
 
-import re
+import itertools
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterator, List, Tuple, Set
+
+from spec_parser import (AcceptanceCriteria, Claim, Requirement, parse_research, parse_task_model,
+                         parse_task_model_file, requirement_rows, tokens_from_rows)
+from parse_cache import ParseCache
+from profiler import Profiler
+from report_writer import write_if_changed
+from spec_archive import spec_path
+from traceability_index import TraceabilityIndex
+from validation_result import ResearchResult, TraceabilityResult
 
 class TraceabilityValidator:
-    def __init__(self, base_path: str):
-        self.base_path = Path(base_path)
+    def __init__(self, base_path: str, cache: ParseCache = None, source_verifier=None):
+        """With a source_verifier.SourceVerifier, research validation also checks that every source URL resolves."""
+        self.base_path = spec_path(base_path)  # a directory, or one inside a zip archive
+        self.cache = cache or ParseCache()
+        self.source_verifier = source_verifier
+        self.source_checks: Dict[str, Dict] = {}
+        self.profiler = self.cache.profiler
         self.requirements = {}
         self.tasks = []
         self.research_citations = {}
+        self._index = None
+
+    @property
+    def index(self) -> TraceabilityIndex:
+        """Criterion/task index over the parsed documents, built on first use."""
+        if self._index is None:
+            with self.profiler.phase("index"):
+                self._index = TraceabilityIndex(self.requirements, self.tasks)
+        return self._index
 
     def parse_requirements(self, requirements_file: str) -> Dict:
         """Parse requirements.md to extract requirements and acceptance criteria."""
@@ -22,47 +45,25 @@ class TraceabilityValidator:
         if not req_file.exists():
             raise FileNotFoundError(f"Requirements file not found: {requirements_file}")
 
-        content = req_file.read_text(encoding='utf-8')
-
-        # Split content by requirement headers and capture requirement numbers
-        pattern = r'\n### Requirement (\d+): ([^\n]+)'
-        matches = list(re.finditer(pattern, content))
-
         requirements = {}
 
-        for match in matches:
-            req_num = match.group(1).strip()
-            req_title = match.group(2).strip()
-
-            # Find the start and end of this requirement section
-            start_pos = match.start()
-            end_pos = content.find('\n### Requirement', start_pos + 1)
-            if end_pos == -1:
-                end_pos = len(content)
-
-            # Extract this requirement's content
-            section_content = content[start_pos:end_pos]
-
-            # Find acceptance criteria within this section
-            ac_match = re.search(r'#### Acceptance Criteria\n(.*?)(?=\n###|\n##|\Z)', section_content, re.DOTALL)
-            if not ac_match:
-                continue
-
-            ac_text = ac_match.group(1).strip()
-
-            
-            # Parse acceptance criteria
-            requirements[req_num] = {
-                "title": req_title,
-                "acceptance_criteria": {}
-            }
-
-            ac_pattern = r"(\d+)\.\s+(.+)"
-            ac_matches = re.findall(ac_pattern, ac_text)
-            for ac_num, ac_text in ac_matches:
-                requirements[req_num]["acceptance_criteria"][f"{req_num}.{ac_num}"] = ac_text.strip()
+        # Single pass over the file: requirements are only recorded once their
+        # acceptance criteria section is seen
+        for token in tokens_from_rows(self.cache.load(req_file, "requirements", requirement_rows)):
+            if isinstance(token, Requirement):
+                req_title = token.title
+            elif isinstance(token, AcceptanceCriteria):
+                requirements[token.requirement] = {
+                    "title": req_title,
+                    "acceptance_criteria": {}
+                }
+            elif token.in_acceptance:
+                requirements[token.requirement]["acceptance_criteria"][token.id] = token.text
 
         self.requirements = requirements
+        self._index = None
+        self.profiler.count("requirements", len(requirements))
+        self.profiler.count("criteria", sum(len(r["acceptance_criteria"]) for r in requirements.values()))
         return requirements
 
     def parse_tasks(self, tasks_file: str) -> List[Dict]:
@@ -71,60 +72,38 @@ class TraceabilityValidator:
         if not task_file.exists():
             raise FileNotFoundError(f"Tasks file not found: {tasks_file}")
 
-        content = task_file.read_text(encoding='utf-8')
-
-        # Parse tasks and requirement references
-        task_pattern = r"- \[ \] (\d+).+?_Requirements: (.+?)_"
-        matches = re.findall(task_pattern, content, re.MULTILINE | re.DOTALL)
-
-        tasks = []
-        for task_num, req_refs in matches:
-            # Parse requirement references
-            req_refs = [ref.strip() for ref in req_refs.split(",")]
-            tasks.append({
-                "task_id": task_num,
-                "requirement_references": req_refs
-            })
+        # The same parse as validate_specifications' task references, so one cache entry serves both
+        tasks = self.cache.load(task_file, "task-model", parse_task_model, parse_task_model_file)["tasks"]
 
         self.tasks = tasks
+        self._index = None
+        self.profiler.count("tasks", len(tasks))
         return tasks
 
     def validate_traceability(self) -> Tuple[Dict, List[str], List[str]]:
         """Validate that all requirements are covered by tasks."""
-        all_criteria = set()
-        for req_num, req_data in self.requirements.items():
-            for ac_ref in req_data["acceptance_criteria"]:
-                all_criteria.add(ac_ref)
-
-        covered_criteria = set()
-        invalid_references = set()
-
-        for task in self.tasks:
-            for req_ref in task["requirement_references"]:
-                if req_ref in all_criteria:
-                    covered_criteria.add(req_ref)
-                else:
-                    invalid_references.add(req_ref)
-
-        missing_criteria = all_criteria - covered_criteria
-
+        index = self.index
         return {
-            "total_criteria": len(all_criteria),
-            "covered_criteria": len(covered_criteria),
-            "coverage_percentage": (len(covered_criteria) / len(all_criteria) * 100) if all_criteria else 100
-        }, list(missing_criteria), list(invalid_references)
+            "total_criteria": index.total,
+            "covered_criteria": len(index.covered_criteria),
+            "coverage_percentage": index.coverage_percentage
+        }, list(index.missing_criteria), list(index.invalid_references)
 
     def validate_research_evidence(self, research_file: str = "example_research.md") -> Dict:
         """Validate research document for proper citations and evidence."""
         research_path = self.base_path / research_file
         if not research_path.exists():
-            return {"valid": False, "error": f"Research file not found: {research_file}"}
+            error = f"Research file not found: {research_file}"
+            return {"valid": False, "error": error, "citation_errors": [error], "citation_warnings": [],
+                    "missing_sources": [],
+                    "uncited_claims": [], "total_sources": 0, "total_citations": 0}
 
-        content = research_path.read_text(encoding='utf-8')
+        research = self.cache.load(research_path, "research", parse_research)
 
         validation_results = {
             "valid": True,
             "citation_errors": [],
+            "citation_warnings": [],  # the citation errors that do not fail validation
             "missing_sources": [],
             "uncited_claims": [],
             "total_sources": 0,
@@ -132,53 +111,40 @@ class TraceabilityValidator:
         }
 
         # Extract source list (## 3. Browsed Sources section)
-        source_pattern = r'## 3\. Browsed Sources\n(.*?)(?=\n##|\Z)'
-        source_match = re.search(source_pattern, content, re.DOTALL)
-
-        if not source_match:
+        if not research["has_sources_section"]:
             validation_results["valid"] = False
             validation_results["citation_errors"].append("Missing 'Browsed Sources' section")
             return validation_results
 
-        sources_text = source_match.group(1)
-        source_lines = [line.strip() for line in sources_text.split('\n') if line.strip()]
-
-        # Extract source URLs and indices
-        sources = {}
-        for line in source_lines:
-            source_match = re.match(r'- \[(\d+)\] (https?://\S+)', line)
-            if source_match:
-                index = source_match.group(1)
-                url = source_match.group(2)
-                sources[index] = url
-
+        sources = research["sources"]
         validation_results["total_sources"] = len(sources)
 
-        # Check for citations in rationale section
-        rationale_pattern = r'\| \*\*(.+?)\*\* \| (.+?) \|'
-        rationale_matches = re.findall(rationale_pattern, content, re.DOTALL)
-
-        total_citations = 0
-        for technology, rationale in rationale_matches:
-            # Find all citations in rationale
-            citations = re.findall(r'\[cite:(\d+)\]', rationale)
-            total_citations += len(citations)
-
-            # Check each citation has corresponding source
-            for citation in citations:
-                if citation not in sources:
-                    validation_results["citation_errors"].append(f"Citation [cite:{citation}] references non-existent source")
+        # Check each citation in the rationale table has a corresponding source
+        for citation in research["citations"]:
+            if citation not in sources:
+                validation_results["citation_errors"].append(f"Citation [cite:{citation}] references non-existent source")
+                validation_results["valid"] = False
+
+        if self.source_verifier is not None:
+            unchecked = [url for url in sources.values() if url not in self.source_checks]
+            if unchecked:
+                with self.profiler.phase("verify sources", research_path):
+                    self.source_checks.update(self.source_verifier.verify(unchecked))
+            validation_results["unreachable_sources"] = []
+            for number, url in sources.items():
+                check = self.source_checks[url]
+                if not check["ok"]:
+                    validation_results["unreachable_sources"].append(number)
+                    validation_results["citation_errors"].append(f"Source [{number}] {url} is unreachable ({check['error']})")
                     validation_results["valid"] = False
 
+        total_citations = len(research["citations"])
         validation_results["total_citations"] = total_citations
+        self.profiler.count("sources", len(sources))
+        self.profiler.count("citations", total_citations)
 
-        # Check for factual claims without citations (simplified detection)
-        # Look for sentences with specific numbers, percentages, or strong claims
-        factual_claims = re.findall(r'[^.!?]*\d+(?:\.\d+)?%?[^.!?]*\.|[^.!?]*?(excellent|proven|ideal|best|optimal)[^.!?]*\.', content)
-
-        for claim in factual_claims:
-            if not re.search(r'\[cite:\d+\]', claim):
-                validation_results["uncited_claims"].append(claim.strip())
+        # Factual claims without citations (simplified detection), with their positions
+        validation_results["uncited_claims"] = [Claim(*claim) for claim in research["uncited_claims"]]
 
         # Validate that we have both sources and citations
         if len(sources) == 0:
@@ -191,150 +157,124 @@ class TraceabilityValidator:
 
         # Check citation to source ratio (should have reasonable coverage)
         if total_citations < len(sources):
-            validation_results["citation_errors"].append(f"Too few citations ({total_citations}) for number of sources ({len(sources)})")
+            warning = f"Too few citations ({total_citations}) for number of sources ({len(sources)})"
+            validation_results["citation_errors"].append(warning)
+            validation_results["citation_warnings"].append(warning)
 
         return validation_results
 
+    def validate(self, requirements_file: str = "requirements.md", tasks_file: str = "tasks.md",
+                 research_file: str = "example_research.md") -> TraceabilityResult:
+        """Parse the documents and run every check once; all report formats render the returned result."""
+        profile = self.profiler
+        with profile.phase("requirements"):
+            self.parse_requirements(requirements_file)
+        with profile.phase("tasks"):
+            self.parse_tasks(tasks_file)
+
+        with profile.phase("coverage"):
+            index = self.index
+            matrix = tuple((req_num, ac_ref, tuple(task_ids)) for req_num, ac_ref, task_ids in index.rows())
+            _, missing, invalid = self.validate_traceability()
+        with profile.phase("research"):
+            research = ResearchResult.from_dict(research_file, self.validate_research_evidence(research_file))
+        return TraceabilityResult(str(self.base_path), matrix, index.total, tuple(index.covered_criteria),
+                                  tuple(missing), tuple(invalid), index.coverage_percentage, research)
+
     def generate_validation_report(self, requirements_file: str = "requirements.md",
                                  tasks_file: str = "tasks.md",
                                  research_file: str = "example_research.md") -> str:
         """Generate a complete validation report."""
-
-        self.parse_requirements(requirements_file)
-        self.parse_tasks(tasks_file)
-
-        validation_result, missing, invalid = self.validate_traceability()
-        research_validation = self.validate_research_evidence(research_file)
-
-        report = f"""# Validation Report
-
-## 1. Requirements to Tasks Traceability Matrix
-
-| Requirement | Acceptance Criterion | Implementing Task(s) | Status |
-|---|---|---|---|"""
-
-        # Generate traceability matrix
-        for req_num, req_data in self.requirements.items():
-            for ac_ref, ac_text in req_data["acceptance_criteria"].items():
-                # Find tasks implementing this criterion
-                implementing_tasks = []
-                for task in self.tasks:
-                    if ac_ref in task["requirement_references"]:
-                        implementing_tasks.append(f"Task {task['task_id']}")
-
-                status = "Covered" if implementing_tasks else "Missing"
-                tasks_str = ", ".join(implementing_tasks) if implementing_tasks else "None"
-
-                report += f"\n| {req_num} | {ac_ref} | {tasks_str} | {status} |"
-
-        report += f"""
-
-## 2. Coverage Analysis
-
-### Summary
-- **Total Acceptance Criteria**: {validation_result['total_criteria']}
-- **Criteria Covered by Tasks**: {validation_result['covered_criteria']}
-- **Coverage Percentage**: {validation_result['coverage_percentage']:.1f}%
-
-### Detailed Status
-- **Covered Criteria**: {[ref for ref in self._get_all_criteria() if ref in self._get_covered_criteria()]}
-- **Missing Criteria**: {missing if missing else 'None'}
-- **Invalid References**: {invalid if invalid else 'None'}
-
-## 3. Research Evidence Validation
-
-### Summary
-- **Total Sources**: {research_validation['total_sources']}
-- **Total Citations**: {research_validation['total_citations']}
-- **Research Validation**: {'PASSED' if research_validation['valid'] else 'FAILED'}
-
-### Evidence Quality
-- **Citation Errors**: {len(research_validation['citation_errors'])}
-- **Uncited Claims**: {len(research_validation['uncited_claims'])}
-"""
-
-        if research_validation['citation_errors']:
-            report += "\n#### Citation Issues:\n"
-            for error in research_validation['citation_errors']:
-                report += f"- {error}\n"
-
-        if research_validation['uncited_claims']:
-            report += "\n#### Uncited Factual Claims:\n"
-            for claim in research_validation['uncited_claims'][:5]:  # Limit to first 5
-                report += f"- {claim}\n"
-            if len(research_validation['uncited_claims']) > 5:
-                report += f"- ... and {len(research_validation['uncited_claims']) - 5} more\n"
-
-        report += """
-
-## 4. Final Validation
-"""
-
-        requirements_valid = validation_result['coverage_percentage'] == 100 and not invalid
-        research_valid = research_validation['valid']
-
-        if requirements_valid and research_valid:
-            report += f"[PASS] **VALIDATION PASSED**\n\nAll {validation_result['total_criteria']} acceptance criteria are fully traced to implementation tasks AND all research claims are properly cited with verifiable sources. The plan is validated and ready for execution."
-        elif not requirements_valid and research_valid:
-            report += f"[FAIL] **VALIDATION FAILED** - Requirements Issues\n\n{len(missing)} criteria not covered, {len(invalid)} invalid references. Research evidence is properly cited, but requirements traceability needs attention."
-        elif requirements_valid and not research_valid:
-            report += f"[FAIL] **VALIDATION FAILED** - Research Evidence Issues\n\nRequirements traceability is complete, but research evidence has {len(research_validation['citation_errors'])} citation errors and {len(research_validation['uncited_claims'])} uncited claims. This violates the evidence-based protocol and prevents professional use."
-        else:
-            report += f"[FAIL] **VALIDATION FAILED** - Multiple Issues\n\nRequirements: {len(missing)} criteria not covered, {len(invalid)} invalid references. Research: {len(research_validation['citation_errors'])} citation errors, {len(research_validation['uncited_claims'])} uncited claims."
-
-        return report
+        return "".join(self.iter_validation_report(requirements_file, tasks_file, research_file))
+
+    def write_validation_report(self, output_file: str = "validation.md",
+                                requirements_file: str = "requirements.md",
+                                tasks_file: str = "tasks.md",
+                                research_file: str = "example_research.md") -> bool:
+        """Stream the report into output_file; returns False if its content was unchanged."""
+        chunks = self.iter_validation_report(requirements_file, tasks_file, research_file)
+        return write_if_changed(self.base_path / output_file, itertools.chain(chunks, ["\n"]))
+
+    def iter_validation_report(self, requirements_file: str = "requirements.md",
+                               tasks_file: str = "tasks.md",
+                               research_file: str = "example_research.md") -> Iterator[str]:
+        """Yield the validation report piece by piece, one matrix row at a time."""
+        result = self.validate(requirements_file, tasks_file, research_file)
+        with self.profiler.phase("render"):
+            yield from result.text()
 
     def _get_all_criteria(self) -> Set[str]:
         """Get all acceptance criteria references."""
-        all_criteria = set()
-        for req_num, req_data in self.requirements.items():
-            for ac_ref in req_data["acceptance_criteria"]:
-                all_criteria.add(ac_ref)
-        return all_criteria
+        return set(self.index.all_criteria)
 
     def _get_covered_criteria(self) -> Set[str]:
         """Get all covered acceptance criteria references."""
-        covered_criteria = set()
-        all_criteria = self._get_all_criteria()
-
-        for task in self.tasks:
-            for req_ref in task["requirement_references"]:
-                if req_ref in all_criteria:
-                    covered_criteria.add(req_ref)
-
-        return covered_criteria
+        return set(self.index.covered)
 
 if __name__ == "__main__":
     import argparse
+    from result_writers import WRITERS
 
     parser = argparse.ArgumentParser(description="Validate specification architect traceability")
     parser.add_argument("--path", default=".", help="Base path containing specification files")
     parser.add_argument("--requirements", default="requirements.md", help="Requirements file name")
     parser.add_argument("--tasks", default="tasks.md", help="Tasks file name")
     parser.add_argument("--research", default="example_research.md", help="Research file name")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="text",
+                        help="Report format: the markdown report (text), json, ndjson or junit")
+    parser.add_argument("--cache-dir", default=None, help="Reuse parsed documents cached in this directory")
+    parser.add_argument("--verbose", action="store_true", help="Print parse cache statistics")
+    parser.add_argument("--profile", action="store_true", help="Print time and allocations per phase and file to stderr")
+    parser.add_argument("--trace-file", default=None, help="Write a Chrome trace-event JSON profile to this file")
+    parser.add_argument("--verify-sources", action="store_true", help="Check that every Browsed Sources URL resolves")
+    parser.add_argument("--source-cache", default=None,
+                        help="Source check cache file (default: source-checks.json in --cache-dir, "
+                             "else in the user cache directory)")
+    # Unset source options keep source_verifier's defaults; it is imported only for --verify-sources
+    parser.add_argument("--source-ttl", type=float, default=None,
+                        help="Seconds a cached source check stays fresh (default: one day)")
+    parser.add_argument("--source-workers", type=int, default=None, help="Concurrent source checks (default: 8)")
+    parser.add_argument("--source-rate", type=float, default=None,
+                        help="Requests per second per host, 0 for no limit (default: 2)")
+    parser.add_argument("--source-timeout", type=float, default=None, help="Seconds per request (default: 10)")
 
     args = parser.parse_args()
-
+    profiler = Profiler(args.profile or bool(args.trace_file))
+    verifier = None
+    if args.verify_sources:
+        from source_verifier import SourceCache, SourceVerifier, default_cache_path
+        cache_file = args.source_cache or (Path(args.cache_dir) / "source-checks.json" if args.cache_dir
+                                           else default_cache_path())
+        ttl = {} if args.source_ttl is None else {"ttl": args.source_ttl}
+        options = {name: value for name, value in (("workers", args.source_workers), ("rate", args.source_rate),
+                                                    ("timeout", args.source_timeout)) if value is not None}
+        verifier = SourceVerifier(SourceCache(cache_file, **ttl), **options)
+
+    # Messages stay off stdout when it carries a machine-readable report
+    messages = sys.stdout if args.format == "text" else sys.stderr
     try:
-        validator = TraceabilityValidator(args.path)
-        report = validator.generate_validation_report(args.requirements, args.tasks, args.research)
-        print(report)
+        validator = TraceabilityValidator(args.path, ParseCache(args.cache_dir, profiler=profiler), verifier)
+        result = validator.validate(args.requirements, args.tasks, args.research)
+        with profiler.phase("render"):
+            WRITERS[args.format](result, sys.stdout)
+        if args.format == "text":
+            print()
+
+        if args.verbose:
+            print(f"\n{validator.cache.stats()}", file=messages)
+            if verifier:
+                print(f"Source checks: {verifier.requests} requests, {verifier.cache_hits} cached", file=messages)
+        if args.profile:
+            print(f"\n{profiler.report()}", file=sys.stderr)
+        if args.trace_file:
+            profiler.write_chrome_trace(args.trace_file)
 
         # Exit with error code if validation fails
-        validation_result, missing, invalid = validator.validate_traceability()
-        research_validation = validator.validate_research_evidence(args.research)
-
-        requirements_valid = validation_result['coverage_percentage'] == 100 and not invalid
-        research_valid = research_validation['valid']
-
-        if not requirements_valid or not research_valid:
-            sys.exit(1)
-        else:
-            sys.exit(0)
+        sys.exit(0 if result.valid else 1)
 
     except FileNotFoundError as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=messages)
         sys.exit(1)
     except Exception as e:
-        print(f"Unexpected error: {e}")
-        sys.exit(1)
\ No newline at end of file
+        print(f"Unexpected error: {e}", file=messages)
+        sys.exit(1)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Immutable results of one validation run.
+A validator computes its result once; every output format in
+result_writers.py serializes that same object through the hooks below
+(text, to_dict, records, test_cases), so choosing or adding a format never
+re-reads a document or re-runs a check.
+"""
+
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from spec_parser import Claim
+
+# A JUnit test case: (class name, test name, failure message or None when it passes, system-out or None)
+TestCase = Tuple[str, str, Optional[str], Optional[str]]
+MAX_LISTED_CLAIMS = 5
+
+
+def _iter_list(items) -> Iterator[str]:
+    """Yield the repr of a list of strings without building it in memory."""
+    yield "["
+    for i, item in enumerate(items):
+        yield f", {item!r}" if i else repr(item)
+    yield "]"
+
+
+def _criterion_key(c: str):
+    return tuple(map(int, c.split('.')))
+
+
+class ResearchResult(NamedTuple):
+    """Citation and evidence findings for one research document."""
+    file: str
+    valid: bool
+    total_sources: int
+    total_citations: int
+    citation_errors: Tuple[str, ...]
+    citation_warnings: Tuple[str, ...]  # the citation errors that do not fail validation
+    uncited_claims: Tuple[Claim, ...]
+    unreachable_sources: Optional[Tuple[str, ...]]  # None unless sources were verified
+    error: Optional[str]  # set when the document could not be read
+
+    @classmethod
+    def from_dict(cls, file: str, research: Dict) -> "ResearchResult":
+        """Freeze a TraceabilityValidator.validate_research_evidence() dict."""
+        unreachable = research.get("unreachable_sources")
+        return cls(file, research["valid"], research["total_sources"], research["total_citations"],
+                   tuple(research["citation_errors"]), tuple(research.get("citation_warnings", ())),
+                   tuple(research["uncited_claims"]),
+                   None if unreachable is None else tuple(unreachable), research.get("error"))
+
+    def to_dict(self) -> Dict:
+        return {
+            "file": self.file,
+            "valid": self.valid,
+            "total_sources": self.total_sources,
+            "total_citations": self.total_citations,
+            "citation_errors": list(self.citation_errors),
+            "citation_warnings": list(self.citation_warnings),
+            "uncited_claims": [claim._asdict() for claim in self.uncited_claims],
+            "unreachable_sources": None if self.unreachable_sources is None else list(self.unreachable_sources),
+            "error": self.error,
+        }
+
+
+class TraceabilityResult(NamedTuple):
+    """Everything traceability_validator.py reports about one spec directory."""
+    spec: str
+    matrix: Tuple[Tuple[str, str, Tuple[str, ...]], ...]  # (requirement, criterion, task IDs), document order
+    total: int
+    covered: Tuple[str, ...]
+    missing: Tuple[str, ...]
+    invalid: Tuple[str, ...]
+    coverage: float
+    research: ResearchResult
+
+    @property
+    def requirements_valid(self) -> bool:
+        return self.coverage == 100 and not self.invalid
+
+    @property
+    def valid(self) -> bool:
+        return self.requirements_valid and self.research.valid
+
+    def text(self) -> Iterator[str]:
+        """validation.md, piece by piece, one matrix row at a time."""
+        yield """# Validation Report
+
+## 1. Requirements to Tasks Traceability Matrix
+
+| Requirement | Acceptance Criterion | Implementing Task(s) | Status |
+|---|---|---|---|"""
+
+        for req_num, ac_ref, task_ids in self.matrix:
+            status = "Covered" if task_ids else "Missing"
+            tasks_str = ", ".join(f"Task {task_id}" for task_id in task_ids) if task_ids else "None"
+            yield f"\n| {req_num} | {ac_ref} | {tasks_str} | {status} |"
+
+        yield f"""
+
+## 2. Coverage Analysis
+
+### Summary
+- **Total Acceptance Criteria**: {self.total}
+- **Criteria Covered by Tasks**: {len(self.covered)}
+- **Coverage Percentage**: {self.coverage:.1f}%
+
+### Detailed Status
+- **Covered Criteria**: """
+        yield from _iter_list(self.covered)
+        yield "\n- **Missing Criteria**: "
+        if self.missing:
+            yield from _iter_list(self.missing)
+        else:
+            yield "None"
+        yield "\n- **Invalid References**: "
+        if self.invalid:
+            yield from _iter_list(self.invalid)
+        else:
+            yield "None"
+
+        research = self.research
+        yield f"""
+
+## 3. Research Evidence Validation
+
+### Summary
+- **Total Sources**: {research.total_sources}
+- **Total Citations**: {research.total_citations}
+- **Research Validation**: {'PASSED' if research.valid else 'FAILED'}
+
+### Evidence Quality
+- **Citation Errors**: {len(research.citation_errors)}
+- **Uncited Claims**: {len(research.uncited_claims)}
+"""
+        if research.unreachable_sources is not None:
+            yield f"- **Unreachable Sources**: {len(research.unreachable_sources)}\n"
+
+        if research.citation_errors:
+            yield "\n#### Citation Issues:\n"
+            for error in research.citation_errors:
+                yield f"- {error}\n"
+
+        if research.uncited_claims:
+            yield "\n#### Uncited Factual Claims:\n"
+            for claim in research.uncited_claims[:MAX_LISTED_CLAIMS]:
+                yield f"- Line {claim.line}, column {claim.column}: {' '.join(claim.text.split())}\n"
+            if len(research.uncited_claims) > MAX_LISTED_CLAIMS:
+                yield f"- ... and {len(research.uncited_claims) - MAX_LISTED_CLAIMS} more\n"
+
+        yield """
+
+## 4. Final Validation
+"""
+
+        missing, invalid = len(self.missing), len(self.invalid)
+        errors, claims = len(research.citation_errors), len(research.uncited_claims)
+        if self.requirements_valid and research.valid:
+            yield f"[PASS] **VALIDATION PASSED**\n\nAll {self.total} acceptance criteria are fully traced to implementation tasks AND all research claims are properly cited with verifiable sources. The plan is validated and ready for execution."
+        elif research.valid:
+            yield f"[FAIL] **VALIDATION FAILED** - Requirements Issues\n\n{missing} criteria not covered, {invalid} invalid references. Research evidence is properly cited, but requirements traceability needs attention."
+        elif self.requirements_valid:
+            yield f"[FAIL] **VALIDATION FAILED** - Research Evidence Issues\n\nRequirements traceability is complete, but research evidence has {errors} citation errors and {claims} uncited claims. This violates the evidence-based protocol and prevents professional use."
+        else:
+            yield f"[FAIL] **VALIDATION FAILED** - Multiple Issues\n\nRequirements: {missing} criteria not covered, {invalid} invalid references. Research: {errors} citation errors, {claims} uncited claims."
+
+    def to_dict(self) -> Dict:
+        return {
+            "path": self.spec,
+            "total_criteria": self.total,
+            "covered_criteria": len(self.covered),
+            "coverage_percentage": self.coverage,
+            "missing": list(self.missing),
+            "invalid_references": list(self.invalid),
+            "matrix": [{"requirement": requirement, "criterion": criterion, "tasks": list(tasks)}
+                       for requirement, criterion, tasks in self.matrix],
+            "research": self.research.to_dict(),
+            "requirements_valid": self.requirements_valid,
+            "valid": self.valid,
+        }
+
+    def records(self) -> Iterator[Dict]:
+        for requirement, criterion, tasks in self.matrix:
+            yield {"event": "criterion", "requirement": requirement, "criterion": criterion,
+                   "tasks": list(tasks), "covered": bool(tasks)}
+        for reference in self.invalid:
+            yield {"event": "invalid_reference", "reference": reference}
+        warnings = set(self.research.citation_warnings)
+        for error in self.research.citation_errors:
+            yield {"event": "citation_error", "message": error, "fatal": error not in warnings}
+        for claim in self.research.uncited_claims:
+            yield {"event": "uncited_claim", **claim._asdict()}
+        yield {"event": "summary", "path": self.spec, "total_criteria": self.total,
+               "covered_criteria": len(self.covered), "coverage_percentage": self.coverage,
+               "invalid_references": len(self.invalid), "research_valid": self.research.valid,
+               "valid": self.valid}
+
+    def test_cases(self) -> Iterator[TestCase]:
+        # Failing cases mirror `valid` exactly; citation warnings go to the passing case's
+        # system-out, and other findings (uncited claims) only to text and records
+        for _, criterion, tasks in self.matrix:
+            yield "traceability", criterion, None if tasks else f"Criterion {criterion} is not covered by any task", None
+        for reference in self.invalid:
+            yield "traceability", f"reference {reference}", f"Reference {reference} names no criterion", None
+        if not self.requirements_valid and not self.missing and not self.invalid:
+            yield "traceability", "criteria", "No acceptance criteria found", None
+        warnings = self.research.citation_warnings
+        fatal = [error for error in self.research.citation_errors if error not in warnings]
+        for error in fatal:
+            yield "research", error, error, None
+        if not fatal:
+            yield "research", "citations", None, "\n".join(warnings) or None
+
+
+class CoverageResult(NamedTuple):
+    """Everything validate_specifications.py reports about one spec directory."""
+    spec: str
+    total: int
+    covered: Tuple[str, ...]  # criterion order
+    missing: Tuple[str, ...]
+    coverage: float
+    valid: bool
+    errors: Tuple[str, ...]
+    completed: bool  # validation got past its early exits, so the report is printed
+    graph: Optional[Mapping]  # TraceabilityGraph.summary()
+    since: Optional[Mapping]  # {"ref": ..., "newly_missing": [...], ...} for --since runs
+    duplicates: Optional[Tuple]  # criteria_similarity.SimilarCluster tuples for --duplicates runs
+    duplicate_threshold: Optional[float]
+
+    @classmethod
+    def create(cls, spec: str, result, completed: bool, graph: Optional[Dict] = None,
+               since: Optional[Dict] = None, duplicates: Optional[List] = None,
+               duplicate_threshold: Optional[float] = None) -> "CoverageResult":
+        """Freeze a validate_specifications.Result and the optional findings of the same run."""
+        return cls(spec, result.total, tuple(sorted(result.covered, key=_criterion_key)),
+                   tuple(sorted(result.missing, key=_criterion_key)), result.coverage, result.valid,
+                   tuple(result.errors), completed, None if graph is None else MappingProxyType(graph),
+                   None if since is None else MappingProxyType(since),
+                   None if duplicates is None else tuple(duplicates), duplicate_threshold)
+
+    def text(self) -> Iterator[str]:
+        if self.completed:
+            yield from self._report()
+            if self.since is not None:
+                yield from self._report_changes()
+            elif self.graph is not None:
+                yield from self._report_graph()
+        if self.duplicates is not None:
+            yield from self._report_similar()
+
+    def _report(self) -> Iterator[str]:
+        yield "\n" + "="*80 + "\n"
+        yield "SPECIFICATION VALIDATION REPORT\n"
+        yield "="*80 + "\n\n"
+
+        yield "SUMMARY\n"
+        yield "-"*80 + "\n"
+        yield f"Total Criteria:        {self.total}\n"
+        yield f"Covered by Tasks:      {len(self.covered)}\n"
+        yield f"Coverage:              {self.coverage:.1f}%\n\n"
+
+        if self.missing:
+            yield "MISSING CRITERIA\n"
+            yield "-"*80 + "\n"
+            for c in self.missing:
+                yield f"  - {c}\n"
+            yield "\n"
+
+        yield "VALIDATION STATUS\n"
+        yield "-"*80 + "\n"
+        if self.valid:
+            yield "✅ PASSED - All criteria covered\n\n"
+        else:
+            yield f"❌ FAILED - {len(self.missing)} uncovered\n\n"
+
+        yield "="*80 + "\n\n"
+
+    def _report_graph(self) -> Iterator[str]:
+        graph = self.graph
+        yield "TRACEABILITY GRAPH\n"
+        yield "-"*80 + "\n"
+        yield f"Design Sections:       {graph['design_sections']}\n"
+        yield f"Design Members:        {graph['design_members']}\n"
+        for label, key in (("Orphan components", "orphan_components"),
+                           ("Orphan designs", "orphan_design_sections"),
+                           ("Undefined components", "undefined_components"),
+                           ("Undesigned criteria", "criteria_without_design"),
+                           ("Invalid design refs", "invalid_design_references")):
+            items = graph[key]
+            yield f"{label + ':':<23}{', '.join(items) if items else 'None'}\n"
+        yield "\n"
+
+    def _report_changes(self) -> Iterator[str]:
+        yield f"CHANGES SINCE {self.since['ref']}\n"
+        yield "-"*80 + "\n"
+        for key, label in (("newly_missing", "Newly missing criteria"),
+                           ("newly_invalid", "Newly invalid references"),
+                           ("newly_covered", "Newly covered criteria"),
+                           ("no_longer_invalid", "Fixed invalid references")):
+            items = self.since[key]
+            yield f"{label + ':':<27}{', '.join(items) if items else 'None'}\n"
+        yield "\n"
+
+    def _report_similar(self, limit: int = 20) -> Iterator[str]:
+        clusters = self.duplicates
+        yield f"SIMILAR CRITERIA (shingle similarity >= {self.duplicate_threshold:.0%})\n"
+        yield "-"*80 + "\n"
+        if not clusters:
+            yield "None\n\n"
+            return
+        conflicts = sum(c.conflict for c in clusters)
+        yield f"Clusters:              {len(clusters)} ({conflicts} conflicting)\n"
+        for c in clusters[:limit]:
+            kind = "conflict" if c.conflict else "duplicate"
+            yield f"  - {c.component}: {', '.join(c.criteria)} ({kind}, {c.similarity:.0%})\n"
+        if len(clusters) > limit:
+            yield f"  ... and {len(clusters) - limit} more\n"
+        yield "\n"
+
+    def to_dict(self) -> Dict:
+        summary = {
+            "total": self.total,
+            "covered": len(self.covered),
+            "missing": list(self.missing),
+            "coverage": self.coverage,
+            "valid": self.valid,
+        }
+        if self.graph is not None:
+            summary["graph"] = dict(self.graph)
+        if self.since is not None:
+            summary["since"] = dict(self.since)
+        if self.duplicates is not None:
+            summary["duplicates"] = [c._asdict() for c in self.duplicates]
+        summary["path"] = self.spec
+        summary["errors"] = list(self.errors)
+        return summary
+
+    def records(self) -> Iterator[Dict]:
+        covered = set(self.covered)
+        for criterion in sorted(covered.union(self.missing), key=_criterion_key):
+            yield {"event": "criterion", "criterion": criterion, "covered": criterion in covered}
+        for error in self.errors:
+            yield {"event": "error", "message": error}
+        if self.graph is not None:
+            yield {"event": "graph", **self.graph}
+        if self.since is not None:
+            yield {"event": "since", **self.since}
+        for cluster in self.duplicates or ():
+            yield {"event": "duplicate", **cluster._asdict()}
+        yield {"event": "summary", "path": self.spec, "total": self.total, "covered": len(self.covered),
+               "coverage": self.coverage, "valid": self.valid}
+
+    def test_cases(self) -> Iterator[TestCase]:
+        # Failing cases mirror `valid` exactly; an early exit fails the case of its reason
+        for error in self.errors:
+            yield "files", error, error, None
+        covered = set(self.covered)
+        for criterion in sorted(covered.union(self.missing), key=_criterion_key):
+            failure = None if criterion in covered else f"Criterion {criterion} is not covered by any task"
+            yield "coverage", criterion, failure, None
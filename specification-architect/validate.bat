@@ -6,6 +6,8 @@ set SCRIPT_DIR=%~dp0
 set SPEC_DIR=.
 set VERBOSE=
 set GENERATE=
+set BATCH=
+set SINCE=
 
 :parse_args
 if "%1"=="" goto run
@@ -15,10 +17,14 @@ if "%1"=="-v" (set VERBOSE=--verbose & shift & goto parse_args)
 if "%1"=="--verbose" (set VERBOSE=--verbose & shift & goto parse_args)
 if "%1"=="-g" (set GENERATE=--generate-validation & shift & goto parse_args)
 if "%1"=="--generate" (set GENERATE=--generate-validation & shift & goto parse_args)
+if "%1"=="-b" (set BATCH=--batch & shift & goto parse_args)
+if "%1"=="--batch" (set BATCH=--batch & shift & goto parse_args)
+if "%1"=="-s" (set SINCE=--since %2 & shift & shift & goto parse_args)
+if "%1"=="--since" (set SINCE=--since %2 & shift & shift & goto parse_args)
 shift
 goto parse_args
 
 :run
 echo Running specification validation...
-python "%SCRIPT_DIR%validate_specifications.py" --path "%SPEC_DIR%" %VERBOSE% %GENERATE%
+python "%SCRIPT_DIR%validate_specifications.py" --path "%SPEC_DIR%" %VERBOSE% %GENERATE% %BATCH% %SINCE%
 exit /b %ERRORLEVEL%
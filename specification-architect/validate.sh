@@ -5,6 +5,8 @@ SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 SPEC_DIR="."
 VERBOSE=""
 GENERATE=""
+BATCH=""
+SINCE=""
 
 while [[ $# -gt 0 ]]; do
     case $1 in
@@ -20,12 +22,22 @@ while [[ $# -gt 0 ]]; do
             GENERATE="--generate-validation"
             shift
             ;;
+        -b|--batch)
+            BATCH="--batch"
+            shift
+            ;;
+        -s|--since)
+            SINCE="--since $2"
+            shift 2
+            ;;
         -h|--help)
             echo "Usage: ./validate.sh [options]"
             echo "Options:"
             echo "  -p, --path DIR         Path to spec directory"
             echo "  -v, --verbose          Verbose output"
             echo "  -g, --generate         Generate validation.md"
+            echo "  -b, --batch            Validate every spec directory under the path"
+            echo "  -s, --since REF        Validate incrementally from the git diff against REF"
             exit 0
             ;;
         *)
@@ -34,5 +46,5 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
-python3 "$SCRIPT_DIR/validate_specifications.py" --path "$SPEC_DIR" $VERBOSE $GENERATE
+python3 "$SCRIPT_DIR/validate_specifications.py" --path "$SPEC_DIR" $VERBOSE $GENERATE $BATCH $SINCE
 exit $?
@@ -1,46 +1,148 @@
 #!/usr/bin/env python3
-"""Specification Architect Validation Script"""
-import re, sys, json, argparse
+"""Specification Architect Validation Script
+
+Startup matters for hooks that run it on every commit: modules only some
+options need (argparse, json, git diffing, the process pool, the research
+validator) are imported where they are used.
+"""
+import os, sys, time, itertools
+from types import SimpleNamespace
 from pathlib import Path
-from dataclasses import dataclass, field
 from typing import Dict, Set, List
 
-@dataclass
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from spec_parser import (Criterion, design_rows, parse_components, parse_task_model, parse_task_model_file,
+                         parse_task_references, parse_task_references_file, requirement_rows,
+                         tokens_from_rows)
+from parse_cache import ParseCache
+from profiler import Profiler
+from result_writers import WRITERS, write_text
+from spec_archive import archive_spec_dirs, in_archive, spec_path, split_location
+from traceability_graph import TraceabilityGraph
+from traceability_index import CriterionTable
+from validation_result import CoverageResult
+
 class Result:
-    total: int = 0
-    covered: Set[str] = field(default_factory=set)
-    missing: Set[str] = field(default_factory=set)
-    coverage: float = 0.0
-    valid: bool = False
-    errors: List[str] = field(default_factory=list)
+    def __init__(self):
+        self.total: int = 0
+        self.covered: Set[str] = set()
+        self.missing: Set[str] = set()
+        self.coverage: float = 0.0
+        self.valid: bool = False
+        self.errors: List[str] = []
 
 class Validator:
-    def __init__(self, spec_dir: str, verbose=False):
-        self.dir = Path(spec_dir)
+    def __init__(self, spec_dir: str, verbose=False, cache: ParseCache = None, parse_workers: int = None):
+        """`spec_dir` may also name a directory inside a zip archive, e.g. `bundle.zip/spec`.
+        
+        With `parse_workers`, requirements.md is parsed in that many chunks on a process pool.
+        """
+        self.dir = spec_path(spec_dir)
         self.verbose = verbose
+        self.parse_workers = parse_workers
+        self.cache = cache or ParseCache()
+        self.profiler = self.cache.profiler
         self.result = Result()
         self.components = set()
         self.requirements = {}
         self.task_reqs = set()
+        self.changes = None
+        self.since = None
+        self.completed = False
+        self.graph_summary = None
+        self._component_names = None
+        self._requirement_rows = None
+        self._graph = None
     
     def log(self, msg, level="INFO"):
         if self.verbose or level=="ERROR":
             print(f"[{level}] {msg}")
     
-    def validate(self) -> Result:
+    def validate(self, report=True, graph=None) -> Result:
+        """Check coverage; with `graph` (default: `report`) also build the traceability graph.
+        
+        With `report` the console report is printed once validation completes.
+        """
+        if graph is None:
+            graph = report
         self.log("Starting validation...")
+        profile = self.profiler
         
-        if not self._files_exist():
+        with profile.phase("files"):
+            if not self._files_exist():
+                return self.result
+        with profile.phase("components"):
+            if not self._extract_components():
+                return self.result
+        with profile.phase("requirements"):
+            if not self._extract_requirements():
+                return self.result
+        with profile.phase("tasks"):
+            if not self._extract_tasks(graph):
+                return self.result
+        
+        with profile.phase("coverage"):
+            self._calculate()
+        self.completed = True
+        if graph:
+            try:
+                self.graph_summary = self.graph.summary()
+            except Exception as e:
+                self.log(f"Error building traceability graph: {e}", "ERROR")
+        if self.cache.dir:
+            self.log(self.cache.stats())
+        if report:
+            with profile.phase("report"):
+                write_text(self.coverage_result(), sys.stdout)
+        return self.result
+    
+    def validate_since(self, ref: str, report=True) -> Result:
+        """Same result as validate(), computed from `ref`'s snapshot and the git diff since it."""
+        from incremental import GitError, validate_since
+        self.since = ref
+        self.log(f"Starting validation since {ref}...")
+        
+        with self.profiler.phase("files"):
+            if not self._files_exist():
+                return self.result
+        if in_archive(self.dir):
+            self.result.errors.append("git: specs inside an archive have no git history")
+            self.log(f"Cannot diff against {ref}: {self.dir} is inside an archive", "ERROR")
+            return self.result
+        try:
+            state, self.changes = validate_since(self.dir, ref, self.cache)
+        except GitError as e:
+            self.result.errors.append(f"git: {e}")
+            self.log(f"Cannot diff against {ref}: {e}", "ERROR")
             return self.result
-        if not self._extract_components():
+        
+        # Mirror validate()'s early exits so both modes return the same Result
+        self.components = set(state.components)
+        if not self.components:
+            self.result.errors.append("No components found")
+            self.log("No components found", "WARNING")
             return self.result
-        if not self._extract_requirements():
+        self.result.total = state.total
+        self.log(f"Found {self.result.total} criteria")
+        if not self.result.total:
+            self.result.errors.append("No acceptance criteria with a component found")
             return self.result
-        if not self._extract_tasks():
+        if not state.refs:
+            self.result.errors.append("No requirement tags found")
+            self.log("No requirement tags found", "WARNING")
             return self.result
         
-        self._calculate()
-        self._report()
+        self.result.covered = state.covered
+        self.result.missing = state.missing
+        if state.criteria:
+            self.result.coverage = (len(state.covered) / len(state.criteria)) * 100
+        self.result.valid = self.result.coverage == 100.0
+        self.completed = True
+        if self.cache.dir:
+            self.log(self.cache.stats())
+        if report:
+            with self.profiler.phase("report"):
+                write_text(self.coverage_result(), sys.stdout)
         return self.result
     
     def _files_exist(self) -> bool:
@@ -51,112 +153,369 @@ class Validator:
     
     def _extract_components(self) -> bool:
         try:
-            content = (self.dir / "blueprint.md").read_text()
-            self.components = set(re.findall(r'\|\s*\*\*([A-Za-z0-9_]+)\*\*\s*\|', content))
+            self._component_names = self.cache.load(self.dir / "blueprint.md", "components", parse_components)
+            self.components = set(self._component_names)
             if not self.components:
+                self.result.errors.append("No components found")
                 self.log("No components found", "WARNING")
                 return False
             self.log(f"Found {len(self.components)} components")
+            self.profiler.count("components", len(self.components))
             return True
         except Exception as e:
+            self.result.errors.append(f"blueprint.md: {e}")
             self.log(f"Error: {e}", "ERROR")
             return False
     
     def _extract_requirements(self) -> bool:
         try:
-            content = (self.dir / "requirements.md").read_text()
-            for match in re.finditer(r'### Requirement (\d+):', content):
-                req_num = match.group(1)
-                start = match.end()
-                end = len(content)
-                text = content[start:end]
-                
-                criteria = [f"{req_num}.{c}" for c, _ in re.findall(
-                    r'(\d+)\.\s+WHEN.*?THE\s+\*\*([A-Za-z0-9_]+)\*\*\s+SHALL',
-                    text, re.DOTALL)]
-                if criteria:
-                    self.requirements[req_num] = criteria
+            rows = self.cache.load(self.dir / "requirements.md", "requirements", requirement_rows,
+                                   self._parse_requirements_chunked
+                                   if self.parse_workers and not in_archive(self.dir) else None)
+            self._requirement_rows = rows
+            for token in tokens_from_rows(rows):
+                if isinstance(token, Criterion) and token.component:
+                    self.requirements.setdefault(token.requirement, []).append(token.id)
             
             self.result.total = sum(len(v) for v in self.requirements.values())
             self.log(f"Found {self.result.total} criteria")
-            return self.result.total > 0
+            self.profiler.count("requirements", len(self.requirements))
+            self.profiler.count("criteria", self.result.total)
+            if not self.result.total:
+                self.result.errors.append("No acceptance criteria with a component found")
+                return False
+            return True
         except Exception as e:
+            self.result.errors.append(f"requirements.md: {e}")
             self.log(f"Error: {e}", "ERROR")
             return False
     
-    def _extract_tasks(self) -> bool:
+    def _parse_requirements_chunked(self, path: Path) -> List[List]:
+        from chunked_parser import parse_requirements_chunked
+        parsed = parse_requirements_chunked(path, self.parse_workers)
+        self.profiler.count("requirement chunks", parsed.chunks)
+        if parsed.duplicates:
+            self.log(f"Duplicate requirement numbers: {', '.join(parsed.duplicates)}", "WARNING")
+        return parsed.rows
+    
+    def _extract_tasks(self, model=False) -> bool:
+        """With `model`, tasks.md is parsed whole so the graph reuses the same parse."""
         try:
-            content = (self.dir / "tasks.md").read_text()
-            for match in re.findall(r'_Requirements:\s*([\d., ]+)_', content):
-                for c in match.split(','):
-                    self.task_reqs.add(c.strip())
+            if model:
+                references = self.cache.load(self.dir / "tasks.md", "task-model", parse_task_model,
+                                             parse_task_model_file)["references"]
+            else:
+                references = self.cache.load(self.dir / "tasks.md", "task-references", parse_task_references,
+                                             parse_task_references_file)
+            self.task_reqs = set(references)
             if not self.task_reqs:
+                self.result.errors.append("No requirement tags found")
                 self.log("No requirement tags found", "WARNING")
                 return False
             self.log(f"Found {len(self.task_reqs)} covered criteria")
+            self.profiler.count("task references", len(self.task_reqs))
             return True
         except Exception as e:
+            self.result.errors.append(f"tasks.md: {e}")
             self.log(f"Error: {e}", "ERROR")
             return False
     
     def _calculate(self):
-        all_crit = set()
-        for crit_list in self.requirements.values():
-            all_crit.update(crit_list)
+        table = CriterionTable(itertools.chain.from_iterable(self.requirements.values()))
+        covered = table.mask(self.task_reqs)
         
-        self.result.covered = self.task_reqs & all_crit
-        self.result.missing = all_crit - self.task_reqs
+        self.result.covered = set(table.select(covered))
+        self.result.missing = set(table.select(table.all & ~covered))
         
-        if all_crit:
-            self.result.coverage = (len(self.result.covered) / len(all_crit)) * 100
+        if len(table):
+            self.result.coverage = (len(self.result.covered) / len(table)) * 100
         
         self.result.valid = self.result.coverage == 100.0
     
-    def _report(self):
-        print("\n" + "="*80)
-        print("SPECIFICATION VALIDATION REPORT")
-        print("="*80 + "\n")
-        
-        print("SUMMARY")
-        print("-"*80)
-        print(f"Total Criteria:        {self.result.total}")
-        print(f"Covered by Tasks:      {len(self.result.covered)}")
-        print(f"Coverage:              {self.result.coverage:.1f}%\n")
-        
-        if self.result.missing:
-            print("MISSING CRITERIA")
-            print("-"*80)
-            for c in sorted(self.result.missing, key=lambda x: tuple(map(int, x.split('.')))):
-                print(f"  - {c}")
-            print()
+    @property
+    def graph(self) -> TraceabilityGraph:
+        """Component -> criterion -> design member -> task graph, built on first use.
         
-        print("VALIDATION STATUS")
-        print("-"*80)
-        if self.result.valid:
-            print("✅ PASSED - All criteria covered\n")
+        Documents already loaded by validate() are reused; design.md is optional.
+        """
+        if self._graph is None:
+            with self.profiler.phase("graph"):
+                load = self.cache.load
+                design = self.dir / "design.md"
+                self._graph = TraceabilityGraph(
+                    self._component_names or load(self.dir / "blueprint.md", "components", parse_components),
+                    tokens_from_rows(self._requirement_rows
+                                     or load(self.dir / "requirements.md", "requirements", requirement_rows)),
+                    tokens_from_rows(load(design, "design", design_rows)) if design.exists() else (),
+                    load(self.dir / "tasks.md", "task-model", parse_task_model, parse_task_model_file)["tasks"])
+            self.profiler.count("design members", len(self._graph.method_criteria))
+        return self._graph
+    
+    def similar_criteria(self, threshold: float):
+        """Clusters of near-duplicate or conflicting criteria per component (see criteria_similarity)."""
+        from criteria_similarity import find_similar_criteria
+        with self.profiler.phase("similar criteria"):
+            rows = self._requirement_rows or self.cache.load(
+                self.dir / "requirements.md", "requirements", requirement_rows)
+            clusters = find_similar_criteria(
+                (t for t in tokens_from_rows(rows) if isinstance(t, Criterion)), threshold)
+        self.profiler.count("similar clusters", len(clusters))
+        return clusters
+    
+    def coverage_result(self, duplicates=None, duplicate_threshold=None) -> CoverageResult:
+        """The immutable result of this run, for any of the result_writers formats."""
+        return CoverageResult.create(
+            str(self.dir), self.result, self.completed, self.graph_summary,
+            None if self.changes is None else {"ref": self.since, **self.changes},
+            duplicates, duplicate_threshold)
+
+SPEC_FILES = ("blueprint.md", "requirements.md", "tasks.md")
+
+def generate_validation(spec_dir, cache: ParseCache = None) -> bool:
+    """Stream validation.md into spec_dir; the file is only replaced when its content changes."""
+    from traceability_validator import TraceabilityValidator
+    if split_location(spec_dir) is not None:
+        print(f"[ERROR] Cannot generate validation.md: {spec_dir} is inside an archive")
+        return False
+    try:
+        validator = TraceabilityValidator(spec_dir, cache)
+        with validator.profiler.phase("generate validation"):
+            changed = validator.write_validation_report(
+                "validation.md", "requirements.md", "tasks.md", "research.md")
+    except FileNotFoundError as e:
+        print(f"[ERROR] Cannot generate validation.md: {e}")
+        return False
+    target = Path(spec_dir) / "validation.md"
+    print(f"[INFO] {'Wrote' if changed else 'Unchanged'}: {target}")
+    return changed
+
+def export_index(db, root, batch=False, cache: ParseCache = None, quiet=False):
+    """Upsert the spec directory `root` into the SQLite index at `db` (see scripts/spec_index.py).
+
+    With `batch`, every spec directory under `root` is upserted and indexed
+    directories below it that no longer exist are dropped.
+    """
+    from spec_index import SpecIndex
+    locations = discover_spec_dirs(root) if batch else [root]
+    index = SpecIndex(db, cache)
+    try:
+        for location in locations:
+            index.update(location)
+        removed = index.prune(locations, root) if batch else 0
+    finally:
+        index.close()
+    print(f"[INFO] Index {db}: {index.updated} updated, {index.unchanged} unchanged, {removed} removed",
+          file=sys.stderr if quiet else sys.stdout)
+
+def _criterion_key(c):
+    return tuple(map(int, c.split('.')))
+
+def discover_spec_dirs(root) -> List[Path]:
+    """Recursively find directories holding any spec document, in sorted order.
+    
+    Under a zip archive the directories are returned as `archive.zip/inner` location strings.
+    """
+    if split_location(root) is not None:
+        return archive_spec_dirs(root, SPEC_FILES)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        if any(name in filenames for name in SPEC_FILES):
+            found.append(Path(dirpath))
+    return sorted(found)
+
+def validate_dir(spec_dir, cache_dir=None) -> Dict:
+    """Validate one directory without printing; returns a JSON-ready summary."""
+    start = time.perf_counter()
+    result = Validator(spec_dir, cache=ParseCache(cache_dir)).validate(report=False)
+    return {
+        "path": str(spec_dir),
+        "total": result.total,
+        "covered": len(result.covered),
+        "missing": sorted(result.missing, key=_criterion_key),
+        "coverage": result.coverage,
+        "valid": result.valid,
+        "errors": result.errors,
+        "seconds": round(time.perf_counter() - start, 6),
+    }
+
+def run_batch(root, workers=None, as_json=False, cache_dir=None) -> bool:
+    """Validate every spec directory under root on a process pool.
+    
+    One line is streamed per directory as it finishes; the closing summary is
+    sorted by path so it does not depend on the worker count or scheduling.
+    """
+    import json
+    start = time.perf_counter()
+    dirs = discover_spec_dirs(root)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(dirs) or 1))
+    results = []
+    
+    def emit(entry):
+        results.append(entry)
+        if as_json:
+            print(json.dumps({"event": "result", **entry}), flush=True)
         else:
-            print(f"❌ FAILED - {len(self.result.missing)} uncovered\n")
-        
+            status = "PASS" if entry["valid"] else "FAIL"
+            detail = "; ".join(entry["errors"]) or f"{entry['coverage']:.1f}% coverage"
+            print(f"[{status}] {entry['path']} ({detail})", flush=True)
+    
+    if workers == 1:
+        for d in dirs:
+            emit(validate_dir(d, cache_dir))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(validate_dir, d, cache_dir) for d in dirs]):
+                emit(future.result())
+    
+    results.sort(key=lambda entry: entry["path"])
+    wall = time.perf_counter() - start
+    passed = sum(1 for entry in results if entry["valid"])
+    summary = {
+        "directories": len(results),
+        "passed": passed,
+        "failed": len(results) - passed,
+        "workers": workers,
+        "wall_seconds": round(wall, 6),
+        "throughput_per_second": round(len(results) / wall, 2) if wall else 0.0,
+    }
+    
+    if as_json:
+        print(json.dumps({"event": "summary", **summary, "results": results}), flush=True)
+    else:
+        print("\n" + "="*80)
+        print("BATCH VALIDATION SUMMARY")
+        print("="*80)
+        print(f"Directories:           {summary['directories']}")
+        print(f"Passed:                {summary['passed']}")
+        print(f"Failed:                {summary['failed']}")
+        print(f"Workers:               {workers}")
+        print(f"Wall time:             {wall:.2f}s")
+        print(f"Throughput:            {summary['throughput_per_second']} dirs/s")
         print("="*80 + "\n")
+    
+    return bool(results) and summary["failed"] == 0
 
-def main():
+# (flag, argparse keyword arguments); shared by the fast path and argparse
+OPTIONS = (
+    ("--path", dict(default=".", help="Spec directory")),
+    ("--verbose", dict(action="store_true", help="Verbose")),
+    ("--json", dict(action="store_true", help="JSON output (same as --format json)")),
+    ("--format", dict(default="text", choices=("text", "json", "ndjson", "junit"),
+                      help="Output format; with --batch, json and ndjson both stream one JSON line per directory")),
+    ("--batch", dict(action="store_true", help="Validate every spec directory under --path")),
+    ("--workers", dict(type=int, default=None, help="Batch worker processes (default: CPU count)")),
+    ("--cache-dir", dict(default=None, help="Reuse parsed documents cached in this directory")),
+    ("--generate-validation", dict(action="store_true", help="Write validation.md into the spec directory")),
+    ("--since", dict(default=None, metavar="REF",
+                     help="Validate incrementally from the git diff against REF (use with --cache-dir)")),
+    ("--parse-workers", dict(type=int, default=None,
+                             help="Parse requirements.md in chunks on this many processes (for very large files)")),
+    ("--duplicates", dict(action="store_true",
+                          help="Report near-duplicate and conflicting acceptance criteria per component")),
+    ("--duplicate-threshold", dict(type=float, default=0.7,
+                                   help="Word-shingle Jaccard similarity for --duplicates (default: 0.7)")),
+    ("--export-index", dict(default=None, metavar="DB",
+                            help="Upsert the parsed specs into this SQLite index (query with scripts/spec_index.py)")),
+    ("--profile", dict(action="store_true", help="Print time and allocations per phase and file to stderr")),
+    ("--trace-file", dict(default=None, help="Write a Chrome trace-event JSON profile to this file")),
+)
+
+def build_parser():
+    import argparse
     parser = argparse.ArgumentParser(description="Validate specifications")
-    parser.add_argument("--path", default=".", help="Spec directory")
-    parser.add_argument("--verbose", action="store_true", help="Verbose")
-    parser.add_argument("--json", action="store_true", help="JSON output")
-    args = parser.parse_args()
+    for flag, kwargs in OPTIONS:
+        parser.add_argument(flag, **kwargs)
+    return parser
+
+def parse_args_fast(argv: List[str]):
+    """Parse argv of exact `--flag [value]` options without argparse, or return None.
+
+    Building an ArgumentParser costs more than validating a small spec, so
+    hooks skip it; anything else (help, abbreviations, `--flag=value`, bad
+    values) returns None and gets argparse's full handling and messages.
+    """
+    options = dict(OPTIONS)
+    values = {flag[2:].replace("-", "_"): kwargs.get("default", False) for flag, kwargs in OPTIONS}
+    i = 0
+    while i < len(argv):
+        kwargs = options.get(argv[i])
+        if kwargs is None:
+            return None
+        name = argv[i][2:].replace("-", "_")
+        if kwargs.get("action") == "store_true":
+            values[name] = True
+            i += 1
+            continue
+        if i + 1 == len(argv) or argv[i + 1].startswith("-"):
+            return None
+        try:
+            values[name] = kwargs.get("type", str)(argv[i + 1])
+        except ValueError:
+            return None
+        if "choices" in kwargs and values[name] not in kwargs["choices"]:
+            return None
+        i += 2
+    return SimpleNamespace(**values)
+
+def main():
+    args = parse_args_fast(sys.argv[1:]) or build_parser().parse_args()
+    if args.json:
+        args.format = "json"
     
-    v = Validator(args.path, args.verbose)
-    result = v.validate()
+    if args.batch and (args.profile or args.trace_file):
+        build_parser().error("--profile and --trace-file profile a single directory and cannot be used with --batch")
+    if args.batch and args.parse_workers:
+        build_parser().error("--parse-workers parses a single directory and cannot be used with --batch")
+    if args.batch and args.duplicates:
+        build_parser().error("--duplicates reports on a single directory and cannot be used with --batch")
+    if args.batch and args.format == "junit":
+        build_parser().error("--format junit reports on a single directory and cannot be used with --batch")
+    if not 0 < args.duplicate_threshold <= 1:
+        build_parser().error("--duplicate-threshold must be in (0, 1]")
+    if args.batch and args.since:
+        build_parser().error("--since validates a single directory and cannot be used with --batch")
+    if args.batch and args.generate_validation:
+        build_parser().error("--generate-validation writes into a single directory and cannot be used with --batch")
+    if args.batch and args.verbose:
+        build_parser().error("--verbose logs a single directory's extraction and cannot be used with --batch")
+    machine = args.format != "text"
+    if args.batch:
+        ok = run_batch(args.path, args.workers, machine, args.cache_dir)
+        if args.export_index:
+            export_index(args.export_index, args.path, True, ParseCache(args.cache_dir), machine)
+        sys.exit(0 if ok else 1)
     
-    if args.json:
-        print(json.dumps({
-            "total": result.total,
-            "covered": len(result.covered),
-            "missing": list(result.missing),
-            "coverage": result.coverage,
-            "valid": result.valid,
-        }, indent=2))
+    profiler = Profiler(args.profile or bool(args.trace_file))
+    # --generate-validation and --export-index reuse the documents validation parsed (and hashed)
+    cache = ParseCache(args.cache_dir, profiler=profiler, memo=True, digests=bool(args.export_index))
+    v = Validator(args.path, args.verbose, cache, args.parse_workers)
+    out = sys.stdout
+    if machine:
+        # Log lines go to stderr so stdout carries nothing but the result
+        sys.stdout = sys.stderr
+    try:
+        # Validated once; every format (and the exit code) comes from this one result
+        result = v.validate_since(args.since, report=False) if args.since else v.validate(report=False, graph=True)
+        similar = None
+        if args.duplicates and result.total:
+            similar = v.similar_criteria(args.duplicate_threshold)
+        with profiler.phase("report"):
+            WRITERS[args.format](v.coverage_result(similar, args.duplicate_threshold if args.duplicates else None),
+                                 out)
+        
+        if args.generate_validation:
+            generate_validation(args.path, cache)
+        if args.export_index:
+            export_index(args.export_index, args.path, cache=cache, quiet=machine)
+    finally:
+        sys.stdout = out
+    
+    if args.profile:
+        print(profiler.report(), file=sys.stderr)
+    if args.trace_file:
+        profiler.write_chrome_trace(args.trace_file)
     
     sys.exit(0 if result.valid else 1)
 